@@ -0,0 +1,158 @@
+"""Heartbeat latency under a synthetic error storm.
+
+Simulates the gateway heartbeat as a periodic task and measures how late it
+wakes up while the error handlers format tracebacks and write logs at a
+fixed rate. Every ``--deep-every``-th error carries a ``--deep-frames`` deep
+traceback. Compares four setups:
+
+* ``inline``: traceback formatting on the event loop, synchronous file sink.
+* ``enqueued``: inline formatting, ``enqueue=True`` sink.
+* ``offloaded``: every traceback formatted via ``asyncio.to_thread``,
+  ``enqueue=True`` sink.
+* ``current``: the bot's handler, which only offloads tracebacks deeper than
+  ``OFFLOAD_TRACEBACK_FRAMES``, with ``enqueue=True`` sinks.
+
+    python benchmarks/error_storm.py --rate 200 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger  # noqa: E402
+
+from main import _format_exception, _render_error_async  # noqa: E402
+
+HEARTBEAT_INTERVAL = 0.05
+
+
+def _nested_failure(depth: int) -> None:
+    if depth == 0:
+        raise RuntimeError("synthetic failure")
+    _nested_failure(depth - 1)
+
+
+def _make_error(depth: int) -> BaseException:
+    try:
+        _nested_failure(depth)
+    except RuntimeError as error:
+        return error
+    raise AssertionError("unreachable")
+
+
+def _configure_logger(log_path: Path, *, enqueue: bool) -> None:
+    logger.remove()
+    logger.add(
+        log_path,
+        rotation="7 days",
+        retention="30 days",
+        compression="zip",
+        encoding="UTF-8",
+        level="INFO",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+        enqueue=enqueue,
+    )
+
+
+async def _handle_inline(error: BaseException) -> None:
+    logger.error(f"guild/channel/user(1):{error}\n{_format_exception(error)}")
+
+
+async def _handle_offloaded(error: BaseException) -> None:
+    traceback_text = await asyncio.to_thread(_format_exception, error)
+    logger.error(f"guild/channel/user(1):{error}\n{traceback_text}")
+
+
+async def _handle_current(error: BaseException) -> None:
+    traceback_text, _, _ = await _render_error_async(error, {})
+    logger.error(f"guild/channel/user(1):{error}\n{traceback_text}")
+
+
+async def _heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_INTERVAL
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _storm(
+    handler,
+    rate: int,
+    duration: float,
+    deep_every: int,
+    deep_frames: int,
+) -> list[float]:
+    loop = asyncio.get_running_loop()
+    lags: list[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(lags, stop))
+    tasks: set[asyncio.Task[None]] = set()
+
+    tick = 0.01
+    per_tick = max(1, round(rate * tick))
+    deadline = loop.time() + duration
+    count = 0
+    while loop.time() < deadline:
+        for _ in range(per_tick):
+            count += 1
+            deep = deep_every > 0 and count % deep_every == 0
+            task = asyncio.create_task(handler(_make_error(deep_frames if deep else 25)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.sleep(tick)
+
+    stop.set()
+    await asyncio.gather(*tasks)
+    await heartbeat
+    await logger.complete()
+    return lags
+
+
+def _summarize(name: str, lags: list[float]) -> str:
+    ordered = sorted(lags)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"{name:<10} heartbeat lag p50={statistics.median(ordered) * 1000:7.2f}ms "
+        f"p99={p99 * 1000:7.2f}ms max={ordered[-1] * 1000:7.2f}ms "
+        f"samples={len(ordered)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=int, default=200, help="errors per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument(
+        "--deep-every",
+        type=int,
+        default=20,
+        help="every Nth error has a deep traceback; 0 disables them",
+    )
+    parser.add_argument("--deep-frames", type=int, default=500, help="frames in a deep traceback")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as directory:
+        for name, handler, enqueue in (
+            ("inline", _handle_inline, False),
+            ("enqueued", _handle_inline, True),
+            ("offloaded", _handle_offloaded, True),
+            ("current", _handle_current, True),
+        ):
+            _configure_logger(Path(directory) / f"{name}.log", enqueue=enqueue)
+            lags = asyncio.run(
+                _storm(handler, args.rate, args.duration, args.deep_every, args.deep_frames)
+            )
+            logger.remove()
+            print(_summarize(name, lags))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Offline dispatch benchmark for the Basic cog.
+
+Runs ``DiscordBot`` against an in-process fake gateway and a stubbed HTTP
+session, so no token or network is needed. Synthetic MESSAGE_CREATE and
+INTERACTION_CREATE payloads are fed straight into the connection state's
+parsers, and an event counts as handled when its reply reaches the fake
+HTTP layer.
+
+    python benchmarks/harness.py --events 2000 --concurrency 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import discord.utils  # noqa: E402
+from discord.user import ClientUser  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from main import DiscordBot  # noqa: E402
+
+APPLICATION_ID = 100000000000000001
+BOT_USER_ID = 100000000000000002
+AUTHOR_ID = 100000000000000003
+SCENARIOS = ("ping", "ping_hybrid", "ping_slash", "ping_hybrid_slash", "help")
+
+
+@dataclass(slots=True)
+class ScenarioResult:
+    scenario: str
+    events: int
+    seconds: float
+    events_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_bytes_per_event: float
+    retained_bytes_per_event: float
+
+    def describe(self) -> str:
+        return (
+            f"{self.scenario:<18} {self.events_per_second:9.0f} ev/s  "
+            f"p50={self.p50_ms:7.2f}ms  p99={self.p99_ms:7.2f}ms  "
+            f"peak={self.peak_bytes_per_event:8.0f}B/ev  "
+            f"retained={self.retained_bytes_per_event:8.0f}B/ev"
+        )
+
+
+class FakeResponse:
+    def __init__(self, status: int, payload: object) -> None:
+        self.status = status
+        self.reason = "OK"
+        self.headers = {"content-type": "application/json"}
+        self._text = json.dumps(payload)
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        del encoding
+        return self._text
+
+    async def __aenter__(self) -> FakeResponse:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+
+class FakeSession:
+    """Stand-in for ``aiohttp.ClientSession`` that answers REST calls locally."""
+
+    closed = False
+
+    def __init__(self, on_reply: Callable[[int], None]) -> None:
+        self.on_reply = on_reply
+        self.requests = 0
+
+    def request(self, method: str, url: object, **kwargs: Any) -> FakeResponse:
+        del kwargs
+        self.requests += 1
+        parts = str(url).split("?")[0].rstrip("/").split("/")
+        if method == "POST" and parts[-1] == "messages":
+            channel_id = int(parts[-2])
+            self.on_reply(channel_id)
+            return FakeResponse(200, _message_payload(channel_id, "Pong!", BOT_USER_ID))
+        if method == "POST" and parts[-1] == "callback":
+            interaction_id = int(parts[-3])
+            self.on_reply(interaction_id)
+            return FakeResponse(200, {"interaction": {"id": str(interaction_id), "type": 2}})
+        return FakeResponse(204, {})
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _user_payload(user_id: int, name: str, *, bot: bool = False) -> dict[str, Any]:
+    return {
+        "id": str(user_id),
+        "username": name,
+        "discriminator": "0",
+        "global_name": name,
+        "avatar": None,
+        "bot": bot,
+    }
+
+
+def _message_payload(channel_id: int, content: str, author_id: int) -> dict[str, Any]:
+    return {
+        "id": str(channel_id),
+        "channel_id": str(channel_id),
+        "author": _user_payload(author_id, "bench", bot=author_id == BOT_USER_ID),
+        "content": content,
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def _interaction_payload(interaction_id: int, command: str) -> dict[str, Any]:
+    return {
+        "id": str(interaction_id),
+        "application_id": str(APPLICATION_ID),
+        "type": 2,
+        "token": "fake-token",
+        "version": 1,
+        "channel_id": str(interaction_id),
+        "channel": {"id": str(interaction_id), "type": 1},
+        "user": _user_payload(AUTHOR_ID, "bench"),
+        "locale": "zh-TW",
+        "entitlements": [],
+        "attachment_size_limit": 26214400,
+        "authorizing_integration_owners": {},
+        "data": {"id": str(interaction_id), "name": command, "type": 1},
+    }
+
+
+class FakeGateway:
+    """Feed synthetic gateway events into a bot and wait for the replies."""
+
+    def __init__(self, bot: DiscordBot, *, raw_json: bool = False) -> None:
+        self.bot = bot
+        # Serialise each event and decode it with discord.py's JSON hook, as
+        # the real gateway does, so decoder changes show up in the numbers.
+        self.raw_json = raw_json
+        self._ids = itertools.count(200000000000000000)
+        self._started: dict[int, float] = {}
+        self._latencies: list[float] = []
+        self._done: dict[int, asyncio.Future[None]] = {}
+
+    def on_reply(self, key: int) -> None:
+        started = self._started.pop(key, None)
+        if started is not None:
+            self._latencies.append(time.perf_counter() - started)
+        future = self._done.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    def _payload(self, scenario: str, key: int) -> tuple[str, dict[str, Any]]:
+        match scenario:
+            case "ping" | "ping_hybrid" | "help":
+                return "MESSAGE_CREATE", _message_payload(key, f"!{scenario}", AUTHOR_ID)
+            case "ping_slash":
+                return "INTERACTION_CREATE", _interaction_payload(key, "ping_slash")
+            case "ping_hybrid_slash":
+                return "INTERACTION_CREATE", _interaction_payload(key, "ping_hybrid")
+        raise ValueError(f"未知的情境: {scenario}")
+
+    async def replay(self, scenario: str, events: int, concurrency: int) -> list[float]:
+        loop = asyncio.get_running_loop()
+        self._latencies = []
+        semaphore = asyncio.Semaphore(concurrency)
+        parsers = self.bot._connection.parsers
+
+        async def one() -> None:
+            async with semaphore:
+                key = next(self._ids)
+                event, payload = self._payload(scenario, key)
+                future = self._done[key] = loop.create_future()
+                if self.raw_json:
+                    frame = json.dumps({"op": 0, "t": event, "s": key, "d": payload})
+                self._started[key] = time.perf_counter()
+                if self.raw_json:
+                    message = discord.utils._from_json(frame)
+                    parsers[message["t"]](message["d"])
+                else:
+                    parsers[event](payload)
+                await asyncio.wait_for(future, timeout=10)
+
+        await asyncio.gather(*(one() for _ in range(events)))
+        return self._latencies
+
+
+async def build_offline_bot(*, raw_json: bool = False) -> tuple[DiscordBot, FakeGateway]:
+    bot = DiscordBot()
+    gateway = FakeGateway(bot, raw_json=raw_json)
+    await bot._async_setup_hook()
+    # Mirror what HTTPClient.static_login sets up, minus the network.
+    bot.http.token = "offline"
+    bot.http._HTTPClient__session = FakeSession(gateway.on_reply)
+    bot.http._global_over = asyncio.Event()
+    bot.http._global_over.set()
+    bot._connection.user = ClientUser(
+        state=bot._connection,
+        data=_user_payload(BOT_USER_ID, "benchmark-bot", bot=True),
+    )
+    bot._connection.application_id = APPLICATION_ID
+    await bot.load_extension("cogs.basic")
+    return bot, gateway
+
+
+async def run_benchmark(
+    scenarios: tuple[str, ...] = SCENARIOS,
+    *,
+    events: int = 1000,
+    concurrency: int = 50,
+    memory_events: int = 500,
+) -> list[ScenarioResult]:
+    bot, gateway = await build_offline_bot()
+    results = []
+    try:
+        for scenario in scenarios:
+            await gateway.replay(scenario, min(events, 50), concurrency)
+
+            started = time.perf_counter()
+            latencies = sorted(await gateway.replay(scenario, events, concurrency))
+            elapsed = time.perf_counter() - started
+
+            gc.collect()
+            tracemalloc.start()
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await gateway.replay(scenario, memory_events, concurrency)
+            gc.collect()
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results.append(
+                ScenarioResult(
+                    scenario=scenario,
+                    events=events,
+                    seconds=elapsed,
+                    events_per_second=events / elapsed,
+                    p50_ms=statistics.median(latencies) * 1000,
+                    p99_ms=latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+                    peak_bytes_per_event=(peak - baseline) / memory_events,
+                    retained_bytes_per_event=(retained - baseline) / memory_events,
+                )
+            )
+    finally:
+        await bot.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--memory-events", type=int, default=500)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument(
+        "--min-throughput",
+        type=float,
+        default=0.0,
+        help="exit with status 1 if any scenario falls below this many events/sec",
+    )
+    parser.add_argument("--log", action="store_true", help="keep loguru console output")
+    args = parser.parse_args()
+
+    if not args.log:
+        logger.remove()
+
+    results = asyncio.run(
+        run_benchmark(
+            tuple(args.scenario or SCENARIOS),
+            events=args.events,
+            concurrency=args.concurrency,
+            memory_events=args.memory_events,
+        )
+    )
+    for result in results:
+        print(result.describe())
+
+    if args.json is not None:
+        args.json.write_text(
+            json.dumps([asdict(result) for result in results], indent=4),
+            encoding="utf-8",
+        )
+
+    slow = [result for result in results if result.events_per_second < args.min_throughput]
+    if slow:
+        print(
+            "低於吞吐量門檻: " + ", ".join(result.scenario for result in slow),
+            file=sys.stderr,
+        )
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
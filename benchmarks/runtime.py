@@ -0,0 +1,135 @@
+"""Compare event loop and JSON runtime modes on the offline harness.
+
+Every mode replays the same gateway events through ``FakeGateway`` with
+``raw_json=True``, so each event is decoded by discord.py's JSON hook before
+dispatch. Modes without ``fast_json`` decode with the standard library even
+when discord.py would pick orjson on its own, so the baseline stays the same
+on every machine. Events per second and CPU time per event are reported per
+mode; modes whose optimisation is not installed are listed as unavailable.
+
+    python benchmarks/runtime.py --events 3000 --concurrency 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import discord.utils  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from benchmarks.harness import build_offline_bot  # noqa: E402
+from module.runtime import Runtime, RuntimeMode  # noqa: E402
+
+MODES = {
+    "default": RuntimeMode(),
+    "uvloop": RuntimeMode(uvloop=True),
+    "eager": RuntimeMode(eager_tasks=True),
+    "json": RuntimeMode(fast_json=True),
+    "performance": RuntimeMode.named("performance"),
+}
+DEFAULT_SCENARIOS = ("ping", "ping_slash")
+
+
+@dataclass(slots=True)
+class RuntimeResult:
+    mode: str
+    runtime: str
+    events: int
+    events_per_second: float
+    cpu_us_per_event: float
+
+    def describe(self) -> str:
+        return (
+            f"{self.mode:<12} {self.events_per_second:9.0f} events/s  "
+            f"{self.cpu_us_per_event:8.1f}µs CPU/event  ({self.runtime})"
+        )
+
+
+def _available(mode: RuntimeMode, runtime: Runtime) -> bool:
+    return (
+        (not mode.uvloop or runtime.loop_factory is not None)
+        and (not mode.eager_tasks or runtime.eager_tasks)
+        and (not mode.fast_json or runtime.json in ("orjson", "msgspec"))
+    )
+
+
+async def _replay(scenarios: tuple[str, ...], events: int, concurrency: int) -> tuple[float, float]:
+    bot, gateway = await build_offline_bot(raw_json=True)
+    try:
+        for scenario in scenarios:
+            await gateway.replay(scenario, min(events, 200), concurrency)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        for scenario in scenarios:
+            await gateway.replay(scenario, events, concurrency)
+        return time.perf_counter() - wall, time.process_time() - cpu
+    finally:
+        await bot.close()
+
+
+def run_runtime_benchmark(
+    modes: tuple[str, ...] = tuple(MODES),
+    *,
+    scenarios: tuple[str, ...] = DEFAULT_SCENARIOS,
+    events: int = 2000,
+    concurrency: int = 100,
+) -> tuple[list[RuntimeResult], list[str]]:
+    results, unavailable = [], []
+    for name in modes:
+        mode = MODES[name]
+        runtime = Runtime.prepare(mode)
+        if not _available(mode, runtime):
+            unavailable.append(name)
+            continue
+        if not mode.fast_json:
+            discord.utils._from_json, runtime.json = json.loads, "json"
+        wall, cpu = runtime.run(_replay(scenarios, events, concurrency))
+        total = events * len(scenarios)
+        results.append(
+            RuntimeResult(
+                mode=name,
+                runtime=runtime.describe(),
+                events=total,
+                events_per_second=total / wall,
+                cpu_us_per_event=cpu / total * 1_000_000,
+            )
+        )
+    Runtime.prepare(RuntimeMode())
+    return results, unavailable
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--mode", action="append", choices=tuple(MODES))
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    logger.remove()
+    results, unavailable = run_runtime_benchmark(
+        tuple(args.mode or MODES),
+        events=args.events,
+        concurrency=args.concurrency,
+    )
+    for result in results:
+        print(result.describe())
+    if unavailable:
+        print("未安裝或不支援，已略過: " + ", ".join(unavailable))
+
+    if args.json is not None:
+        args.json.write_text(
+            json.dumps([asdict(result) for result in results], indent=4),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Storage throughput under concurrent command load.
+
+Each simulated command reads one key and writes another through
+``module.storage.Storage``, the way a cog handling a command would. The run
+is repeated with group commit disabled (``max_batch=1``) for comparison.
+
+    python benchmarks/storage.py --commands 5000 --concurrency 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from module.storage import Storage  # noqa: E402
+
+
+@dataclass(slots=True)
+class StorageResult:
+    max_batch: int
+    commands: int
+    seconds: float
+    reads_per_second: float
+    writes_per_second: float
+    batches: int
+
+    def describe(self) -> str:
+        return (
+            f"max_batch={self.max_batch:<4} {self.reads_per_second:9.0f} reads/s  "
+            f"{self.writes_per_second:9.0f} writes/s  "
+            f"{self.commands / max(self.batches, 1):6.1f} writes/commit"
+        )
+
+
+async def run_storage_benchmark(
+    *,
+    commands: int = 2000,
+    concurrency: int = 50,
+    max_batch: int = 256,
+    readers: int = 4,
+    keys: int = 1000,
+) -> StorageResult:
+    with TemporaryDirectory() as directory:
+        async with Storage(
+            Path(directory) / "benchmark.sqlite3",
+            readers=readers,
+            max_batch=max_batch,
+        ) as storage:
+            async with storage.transaction() as transaction:
+                transaction.executemany(
+                    "INSERT INTO kv (namespace, key, value) VALUES ('bench', ?, '0')",
+                    ((str(key),) for key in range(keys)),
+                )
+            batches_before = storage.batches
+            semaphore = asyncio.Semaphore(concurrency)
+            randomizer = random.Random(0)
+
+            async def command() -> None:
+                async with semaphore:
+                    value = await storage.get("bench", str(randomizer.randrange(keys)), 0)
+                    await storage.set("bench", str(randomizer.randrange(keys)), value + 1)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(command() for _ in range(commands)))
+            elapsed = time.perf_counter() - started
+            batches = storage.batches - batches_before
+
+    return StorageResult(
+        max_batch=max_batch,
+        commands=commands,
+        seconds=elapsed,
+        reads_per_second=commands / elapsed,
+        writes_per_second=commands / elapsed,
+        batches=batches,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(
+            run_storage_benchmark(
+                commands=args.commands,
+                concurrency=args.concurrency,
+                max_batch=max_batch,
+                readers=args.readers,
+            )
+        )
+        for max_batch in (1, 256)
+    ]
+    for result in results:
+        print(result.describe())
+
+    if args.json is not None:
+        args.json.write_text(
+            json.dumps([asdict(result) for result in results], indent=4),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
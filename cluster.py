@@ -0,0 +1,58 @@
+"""Run the bot as several ``main.py`` worker processes, one per shard range.
+
+    python cluster.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from main import BASE_DIR, set_logger
+from module import ClusterSupervisor
+from module.cluster import recommended_shard_count
+from module.env import env_number
+
+
+async def run_cluster(token: str) -> None:
+    clusters = int(env_number("CLUSTER_COUNT", os.cpu_count() or 1))
+    shard_count = int(env_number("SHARD_COUNT", 0))
+    if shard_count < 1:
+        recommended = await recommended_shard_count(token)
+        if recommended is None:
+            logger.critical("[叢集] 無法取得 Discord 建議的分片數量，請設定 SHARD_COUNT 後再啟動")
+            raise SystemExit(1)
+        shard_count = recommended
+
+    supervisor = ClusterSupervisor(
+        BASE_DIR / "main.py",
+        shard_count,
+        clusters,
+        BASE_DIR / "data" / "cluster",
+    )
+    logger.info(
+        f"[叢集] 共 {shard_count} 個分片，分配到 {len(supervisor.workers)} 個叢集"
+    )
+    await supervisor.run()
+
+
+def main() -> None:
+    load_dotenv(BASE_DIR / ".env")
+    set_logger()
+
+    token = os.getenv("DISCORD_BOT_TOKEN", "").strip()
+    if not token:
+        logger.critical("DISCORD_BOT_TOKEN 尚未設定，請檢查 .env 或系統環境變數")
+        raise SystemExit(1)
+
+    try:
+        asyncio.run(run_cluster(token))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import io
+import math
 import os
-import sys
+from collections import Counter
+from pathlib import Path
 from typing import Literal
 
 import discord
@@ -9,10 +13,25 @@ from discord import app_commands
 from discord.ext import commands
 from loguru import logger
 
+from module.cache_policy import cache_usage
+from module.cluster import EXIT_RESTART, EXIT_ROLLING_RESTART, read_cluster_status
+from module.outbound import Priority, prioritize
+from module.rate_limiter import RateLimitPolicy
+from module.response_cache import interaction_key
+from module.startup_profiler import current_rss
+
 ExtensionAction = Literal["load", "unload", "reload"]
+LogLevelChoice = Literal["DEBUG", "INFO", "WARNING", "ERROR", "重設"]
+
+
+def _format_latency(latency: float) -> str:
+    return "未知" if math.isnan(latency) or math.isinf(latency) else f"{round(latency * 1000)}ms"
 
 
 class ManagementCommand(commands.Cog):
+    # Administrators must be able to manage the bot while others are being throttled.
+    rate_limits = RateLimitPolicy()
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
@@ -56,14 +75,15 @@ class ManagementCommand(commands.Cog):
         *,
         exclude_management: bool = False,
     ) -> list[app_commands.Choice[str]]:
-        current_folded = current.casefold()
-        names = (
-            name
-            for name in self.bot.discover_extension_names()
-            if current_folded in name.casefold()
-            and (not exclude_management or name != self.bot.management_name)
+        names = self.bot.extension_index.search(
+            current,
+            exclude=(
+                frozenset((self.bot.management_name,))
+                if exclude_management
+                else frozenset()
+            ),
         )
-        return [app_commands.Choice(name=name, value=name) for name in names][:25]
+        return [app_commands.Choice(name=name, value=name) for name in names]
 
     async def _extension_action(
         self,
@@ -74,6 +94,8 @@ class ManagementCommand(commands.Cog):
         if not await self._require_admin(interaction):
             return
 
+        if action == "load":
+            self.bot.extension_index.invalidate()
         full_path = self.bot.extension_path(extension)
         if full_path is None:
             await interaction.response.send_message(
@@ -99,24 +121,40 @@ class ManagementCommand(commands.Cog):
 
         zh_action = {"load": "載入", "unload": "卸載", "reload": "重新載入"}[action]
 
+        name = full_path.removeprefix(f"{self.bot.cogs_package}.")
+        lazy_extensions = self.bot.lazy_extensions
+
         try:
+            detail = ""
             match action:
+                case "load" | "reload" if name in lazy_extensions.pending:
+                    await lazy_extensions.materialize(name)
+                    detail = "延遲載入模組已實體化"
+                case "unload" if name in lazy_extensions.pending:
+                    lazy_extensions.discard(name)
                 case "load":
                     await self.bot.load_extension(full_path)
                 case "unload":
                     await self.bot.unload_extension(full_path)
                 case "reload":
-                    await self.bot.reload_extension(full_path)
+                    detail = (await self.bot.hot_reloader.reload(full_path)).describe()
+                    if name in lazy_extensions.configured:
+                        lazy_extensions.record(name)
+            # Hot reloads and lazy discards bypass the bot's extension methods.
+            self.bot.response_cache.invalidate()
 
             await interaction.response.send_message(
                 embed=discord.Embed(
                     title=f"已{zh_action}模組",
-                    description=f"`{extension}`",
+                    description=f"`{extension}`\n{detail}".strip(),
                     color=discord.Color.green(),
                 ),
                 ephemeral=True,
             )
-            logger.info(f"[管理指令] {zh_action}模組成功：{extension}")
+            logger.info(
+                f"[管理指令] {zh_action}模組成功：{extension}"
+                + (f"（{detail}）" if detail else "")
+            )
         except commands.ExtensionAlreadyLoaded:
             await interaction.response.send_message(
                 embed=discord.Embed(
@@ -175,6 +213,42 @@ class ManagementCommand(commands.Cog):
     async def reload(self, interaction: discord.Interaction, extension: str) -> None:
         await self._extension_action(interaction, "reload", extension)
 
+    def _status_static_fields(self) -> tuple[str, str, tuple[str, str] | None, str | None]:
+        """Fields of /機器人狀態 that only change with the extension lifecycle."""
+        command_count = (
+            f"前綴: `{len(self.bot.commands)}`\t"
+            f"斜線: `{len(self.bot.tree.get_commands())}`"
+        )
+
+        active_extensions = set(self.bot.extensions)
+        lazy_extensions = self.bot.lazy_extensions
+
+        def extension_state(name: str) -> str:
+            if name in lazy_extensions.pending:
+                return "延遲（尚未實體化）"
+            if self.bot.extension_path(name) not in active_extensions:
+                return "未載入"
+            if name in lazy_extensions.materialized:
+                return f"已實體化（首次使用，{lazy_extensions.materialized[name] * 1000:.0f}ms）"
+            return "已載入"
+
+        module_status = "\n".join(
+            f"- {name}: {extension_state(name)}"
+            for name in self.bot.discover_extension_names()
+        )
+
+        startup_field = None
+        startup_report = getattr(self.bot, "startup_report", None)
+        if startup_report is not None:
+            startup_field = (
+                f"啟動報告（{startup_report.elapsed * 1000:.0f}ms，{startup_report.waves} 批）",
+                "\n".join(startup_report.summary_lines())[:1024] or "（無）",
+            )
+
+        started_at = getattr(self.bot, "started_at", None)
+        uptime = None if started_at is None else f"<t:{int(started_at.timestamp())}:R>"
+        return command_count, module_status[:1024] or "（無）", startup_field, uptime
+
     @app_commands.command(name="機器人狀態", description="查看機器人目前狀態")
     @app_commands.guild_only()
     @app_commands.default_permissions(administrator=True)
@@ -182,51 +256,75 @@ class ManagementCommand(commands.Cog):
         if not await self._require_admin(interaction):
             return
 
-        latency = round(self.bot.latency * 1000)
+        shards = getattr(self.bot, "shards", {})
+        latencies = [shard.latency for shard in shards.values()] or [self.bot.latency]
+        worst_latency = max(
+            (latency for latency in latencies if not math.isnan(latency)),
+            default=math.nan,
+        )
         color = (
-            discord.Color.green()
-            if latency < 100
+            discord.Color.light_grey()
+            if math.isnan(worst_latency)
+            else discord.Color.green()
+            if worst_latency < 0.1
             else discord.Color.yellow()
-            if latency < 200
+            if worst_latency < 0.2
             else discord.Color.red()
         )
 
-        embed = discord.Embed(title="機器人狀態", color=color)
-        embed.add_field(name="延遲", value=f"{latency}ms", inline=True)
-        embed.add_field(
-            name="指令數量",
-            value=(
-                f"前綴: `{len(self.bot.commands)}`\t"
-                f"斜線: `{len(self.bot.tree.get_commands())}`"
-            ),
-            inline=True,
-        )
-        embed.add_field(
-            name="WebSocket",
-            value="已連接" if not self.bot.is_ws_ratelimited() else "受限",
-            inline=True,
-        )
+        static = self.bot.response_cache.get("status", interaction_key(interaction))
+        if static is None:
+            static = self._status_static_fields()
+            self.bot.response_cache.put("status", interaction_key(interaction), static)
+        command_count, module_status, startup_field, uptime = static
 
-        active_extensions = set(self.bot.extensions)
-        module_status = "\n".join(
-            f"- {name}: "
-            f"{'已載入' if self.bot.extension_path(name) in active_extensions else '未載入'}"
-            for name in self.bot.discover_extension_names()
+        embed = discord.Embed(title="機器人狀態", color=color)
+        embed.add_field(name="平均延遲", value=_format_latency(self.bot.latency), inline=True)
+        embed.add_field(name="指令數量", value=command_count, inline=True)
+
+        guild_counts = Counter(guild.shard_id for guild in self.bot.guilds)
+        shard_status = "\n".join(
+            f"- #{shard_id}: {_format_latency(shard.latency)}，"
+            f"{guild_counts[shard_id]} 個伺服器，"
+            + (
+                "已斷線"
+                if shard.is_closed()
+                else "受限"
+                if shard.is_ws_ratelimited()
+                else "正常"
+            )
+            for shard_id, shard in sorted(shards.items())
         )
         embed.add_field(
-            name="模組狀態",
-            value=module_status[:1024] or "（無）",
+            name=f"分片（共 {self.bot.shard_count or len(shards)} 個）",
+            value=shard_status[:1024] or "（尚未連線）",
             inline=False,
         )
-
-        started_at = getattr(self.bot, "started_at", None)
-        if started_at is not None:
+        embed.add_field(name="模組狀態", value=module_status, inline=False)
+
+        cluster_id = getattr(self.bot, "cluster_id", None)
+        cluster_status_directory = os.getenv("CLUSTER_STATUS_DIR", "").strip()
+        if cluster_id is not None and cluster_status_directory:
+            cluster_status = read_cluster_status(Path(cluster_status_directory)) or {}
+            cluster_lines = [
+                f"- #{cluster['cluster_id']}（分片 {cluster['shard_ids']}）："
+                f"{'執行中' if cluster['running'] else '已停止'}"
+                f"{'，就緒' if cluster['ready'] else ''}，"
+                f"{sum(shard['guilds'] for shard in cluster['shards'].values())}"
+                f" 個伺服器，重啟 {cluster.get('restarts', 0)} 次"
+                for cluster in cluster_status.get("clusters", [])
+            ]
             embed.add_field(
-                name="在線時間",
-                value=f"<t:{int(started_at.timestamp())}:R>",
+                name=f"叢集（目前為 #{cluster_id}）",
+                value="\n".join(cluster_lines)[:1024] or "（尚無叢集狀態）",
                 inline=False,
             )
 
+        if startup_field is not None:
+            embed.add_field(name=startup_field[0], value=startup_field[1], inline=False)
+        if uptime is not None:
+            embed.add_field(name="在線時間", value=uptime, inline=False)
+
         if self.bot.user is not None:
             embed.set_author(
                 name=self.bot.user.name,
@@ -235,10 +333,186 @@ class ManagementCommand(commands.Cog):
         embed.set_footer(text=f"Discord Bot 版本：{getattr(self.bot, 'version', '未知')}")
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @app_commands.command(name="指令統計", description="查看各指令的呼叫次數、錯誤與延遲")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    async def command_metrics(self, interaction: discord.Interaction) -> None:
+        if not await self._require_admin(interaction):
+            return
+
+        metrics = getattr(self.bot, "metrics", None)
+        top_commands = metrics.top(15) if metrics is not None else []
+        lines = [
+            f"`{command}` ({kind}) - {stats.invocations} 次，錯誤 {stats.errors}，"
+            f"平均 {stats.latency_sum / stats.invocations * 1000:.0f}ms，"
+            f"p50≤{stats.quantile(0.5) * 1000:.0f}ms，p99≤{stats.quantile(0.99) * 1000:.0f}ms"
+            for kind, command, stats in top_commands
+        ]
+        embed = discord.Embed(
+            title="指令統計",
+            description="\n".join(lines)[:4096] or "目前尚無指令紀錄",
+            color=discord.Color.blurple(),
+        )
+        counters = getattr(self.bot, "counters", None)
+        if counters is not None and counters.storage.is_open:
+            guild_total = await counters.get("guild_commands", interaction.guild_id)
+            embed.add_field(name="本伺服器累計指令", value=f"{guild_total} 次", inline=False)
+        response_cache = getattr(self.bot, "response_cache", None)
+        if response_cache is not None and (cache_lines := response_cache.summary_lines()):
+            embed.add_field(
+                name=f"回應快取（整體命中率 {response_cache.hit_ratio():.0%}）",
+                value="\n".join(cache_lines)[:1024],
+                inline=False,
+            )
+        jobs = getattr(self.bot, "jobs", None)
+        if jobs is not None and (job_lines := jobs.summary_lines()):
+            embed.add_field(name="工作佇列", value="\n".join(job_lines)[:1024], inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="快取用量", description="估算各類快取佔用的記憶體")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    async def cache_memory(self, interaction: discord.Interaction) -> None:
+        if not await self._require_admin(interaction):
+            return
+
+        extra = {}
+        resolver = getattr(self.bot, "user_resolver", None)
+        if resolver is not None:
+            extra["user_resolver"] = (len(resolver), list(resolver._users.values()))
+        usage = cache_usage(self.bot, extra)
+        total = sum(item.approximate_bytes for item in usage)
+        lines = [
+            f"`{item.category}` - {item.count} 筆，約 {item.approximate_bytes / 1048576:.2f}MB"
+            for item in sorted(usage, key=lambda item: item.approximate_bytes, reverse=True)
+        ]
+        embed = discord.Embed(
+            title="快取用量",
+            description="\n".join(lines),
+            color=discord.Color.blurple(),
+        )
+        rss = current_rss()
+        embed.add_field(name="快取合計（估計）", value=f"{total / 1048576:.2f}MB")
+        embed.add_field(
+            name="行程 RSS",
+            value="未知" if rss is None else f"{rss / 1048576:.1f}MB",
+        )
+        policy = getattr(self.bot, "cache_policy", None)
+        if policy is not None:
+            embed.add_field(name="快取設定", value=policy.describe(), inline=False)
+        embed.set_footer(text="每類抽樣最多 200 筆估算，不含共用物件")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="事件追蹤", description="列出佔用事件迴圈最久的事件處理器與阻塞紀錄")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    async def dispatch_trace(self, interaction: discord.Interaction) -> None:
+        if not await self._require_admin(interaction):
+            return
+
+        tracer = getattr(self.bot, "dispatch_tracer", None)
+        if tracer is None:
+            await interaction.response.send_message(
+                "事件追蹤未啟用（未設定 SLOW_HANDLER_THRESHOLD）。",
+                ephemeral=True,
+            )
+            return
+
+        lines = [
+            f"`{name}` - 最長 {stats.longest * 1000:.1f}ms，"
+            f"平均 {stats.held / stats.calls * 1000:.2f}ms，{stats.calls} 次"
+            for name, stats in tracer.slowest(10)
+        ]
+        embed = discord.Embed(
+            title="事件追蹤",
+            description="\n".join(lines)[:4096] or "目前尚無紀錄",
+            color=discord.Color.blurple(),
+        )
+        findings = list(tracer.findings)[-10:]
+        if findings:
+            embed.add_field(
+                name=f"超過 {tracer.threshold * 1000:.0f}ms 的紀錄（共 {tracer.flagged} 筆）",
+                value="\n".join(
+                    f"{discord.utils.format_dt(finding.at, 'T')} "
+                    f"{'阻塞' if finding.kind == 'stall' else '處理器'} "
+                    f"`{finding.name[:120]}` {finding.seconds * 1000:.0f}ms"
+                    for finding in reversed(findings)
+                )[:1024],
+                inline=False,
+            )
+        embed.add_field(name="事件迴圈延遲", value=f"{tracer.loop_lag * 1000:.1f}ms")
+
+        stacks = "\n\n".join(
+            f"[{finding.at.isoformat()}] {finding.name} ({finding.seconds * 1000:.0f}ms)\n{finding.stack}"
+            for finding in tracer.findings
+            if finding.stack
+        )
+        files = []
+        if stacks:
+            files.append(discord.File(io.BytesIO(stacks.encode()), filename="dispatch-trace.txt"))
+        await interaction.response.send_message(embed=embed, files=files, ephemeral=True)
+
+    @app_commands.command(name="日誌等級", description="查看或調整各模組的日誌等級，不需重啟")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        target="Cog 名稱或模組路徑（例如 basic、module.outbound）；留空代表預設等級",
+        level="新的等級；「重設」會移除該模組的覆寫",
+    )
+    @app_commands.rename(target="模組", level="等級")
+    @app_commands.autocomplete(target=extension_autocomplete)
+    async def log_level(
+        self,
+        interaction: discord.Interaction,
+        target: str | None = None,
+        level: LogLevelChoice | None = None,
+    ) -> None:
+        if not await self._require_admin(interaction):
+            return
+
+        policy = getattr(self.bot, "log_policy", None)
+        if policy is None:
+            await interaction.response.send_message("日誌設定尚未初始化。", ephemeral=True)
+            return
+
+        if level is not None:
+            if target:
+                # Re-adding sinks waits for loguru's queue to drain.
+                await asyncio.to_thread(
+                    policy.set_level,
+                    target.strip(),
+                    None if level == "重設" else level,
+                )
+            elif level == "重設":
+                await interaction.response.send_message(
+                    "預設等級無法重設，請直接指定等級。",
+                    ephemeral=True,
+                )
+                return
+            else:
+                await asyncio.to_thread(policy.set_default_level, level)
+            logger.info(f"[日誌] {interaction.user} 將 {target or '預設'} 的日誌等級設為 {level}")
+
+        await interaction.response.send_message(
+            f"{policy.describe()}\n已抽樣略過 {policy.dropped} 筆日誌。"
+            "\nWARNING 以上的日誌一律保留。",
+            ephemeral=True,
+        )
+
     @app_commands.command(name="重啟機器人", description="重新啟動機器人（僅限擁有者）")
     @app_commands.guild_only()
     @app_commands.default_permissions(administrator=True)
-    async def restart(self, interaction: discord.Interaction) -> None:
+    @app_commands.describe(
+        force_sync="重啟後略過指令雜湊比對，強制同步斜線指令",
+        rolling="叢集模式下輪流重啟所有叢集，而不只是目前這個",
+    )
+    @app_commands.rename(force_sync="強制同步指令", rolling="輪流重啟全部叢集")
+    async def restart(
+        self,
+        interaction: discord.Interaction,
+        force_sync: bool = False,
+        rolling: bool = False,
+    ) -> None:
         if not await self.bot.is_owner(interaction.user):
             await interaction.response.send_message(
                 "你不是機器人擁有者，無法使用此指令。",
@@ -248,7 +522,12 @@ class ManagementCommand(commands.Cog):
 
         await interaction.response.send_message(
             "您確定要重新啟動機器人嗎？",
-            view=RestartConfirmView(self.bot, interaction),
+            view=RestartConfirmView(
+                self.bot,
+                interaction,
+                force_sync=force_sync,
+                rolling=rolling,
+            ),
             ephemeral=True,
         )
 
@@ -259,10 +538,15 @@ class RestartConfirmView(discord.ui.View):
         bot: commands.Bot,
         interaction: discord.Interaction,
         timeout: int = 120,
+        *,
+        force_sync: bool = False,
+        rolling: bool = False,
     ):
         super().__init__(timeout=timeout)
         self.bot = bot
         self.interaction = interaction
+        self.force_sync = force_sync
+        self.rolling = rolling
         self.has_interacted = False
 
     def disable_all_buttons(self) -> None:
@@ -276,10 +560,11 @@ class RestartConfirmView(discord.ui.View):
 
         self.disable_all_buttons()
         try:
-            await self.interaction.edit_original_response(
-                content="重啟操作已過期，請重新執行指令。",
-                view=self,
-            )
+            with prioritize(Priority.OPS):
+                await self.interaction.edit_original_response(
+                    content="重啟操作已過期，請重新執行指令。",
+                    view=self,
+                )
         except discord.HTTPException as error:
             logger.warning(f"[重啟按鈕] 更新逾時狀態失敗：{error}")
 
@@ -301,7 +586,7 @@ class RestartConfirmView(discord.ui.View):
         self.disable_all_buttons()
         await interaction.response.edit_message(content="正在重啟機器人...", view=self)
         logger.info("[重啟指令] Bot 正在重啟...")
-        await restart_program(self.bot)
+        await restart_program(self.bot, force_sync=self.force_sync, rolling=self.rolling)
 
     @discord.ui.button(
         label="取消",
@@ -323,10 +608,21 @@ class RestartConfirmView(discord.ui.View):
         logger.info("[重啟指令] 已取消")
 
 
-async def restart_program(bot: commands.Bot) -> None:
-    await bot.close()
-    python = sys.executable
-    os.execl(python, python, *sys.argv)
+async def restart_program(
+    bot: commands.Bot,
+    *,
+    force_sync: bool = False,
+    rolling: bool = False,
+) -> None:
+    if force_sync:
+        bot.command_sync.request_force()
+
+    # Exit with a restart code and let the restart policy bring the bot back:
+    # the cluster supervisor, a container restart policy (RESTART_MODE=exit)
+    # or main() itself.
+    clustered = getattr(bot, "cluster_id", None) is not None
+    bot.exit_code = EXIT_ROLLING_RESTART if rolling and clustered else EXIT_RESTART
+    await bot.close_for_resume()
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,50 +1,155 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
 import sys
+import time
 import traceback
+from dataclasses import asdict
 from datetime import UTC, datetime
 from pathlib import Path
 
 import discord
+import yarl
 from discord import app_commands
 from discord.ext import commands
+from discord.ext.commands.hybrid import HybridAppCommand
 from dotenv import load_dotenv
 from loguru import logger
 
+from module import (
+    CachePolicy,
+    CacheSweeper,
+    ClusterStatusWriter,
+    CommandSyncManager,
+    CommandKind,
+    CounterBuffer,
+    DispatchTracer,
+    ErrorReporter,
+    ExtensionIndex,
+    ExtensionLoader,
+    HelpIndex,
+    HelpListing,
+    HelpPaginator,
+    HotReloader,
+    JobQueue,
+    JobRejected,
+    LazyExtensionFailed,
+    LazyExtensionRegistry,
+    LazyPrefixCommand,
+    LogPolicy,
+    MetricsRegistry,
+    MetricsServer,
+    OutboundScheduler,
+    Priority,
+    RateLimit,
+    RateLimited,
+    RateLimiter,
+    RateLimitPolicy,
+    ResponseCache,
+    ResumeSnapshot,
+    ResumeStore,
+    Runtime,
+    RuntimeMode,
+    ShardConfig,
+    StartupProfiler,
+    Storage,
+    StartupReport,
+    UserResolver,
+)
+from module.cluster import EXIT_RESTART
+from module.discord_compat import (
+    connect_resumed,
+    inject_ready,
+    shard_event_queue,
+    shard_registry,
+    start_shard,
+    stop_shard_reader,
+    version_mismatch,
+)
+from module.env import env_flag, env_number
+from module.help_index import render_page
+from module.log_policy import command_context, log_source
+from module.outbound import prioritize
+from module.response_cache import context_key
+from module.startup_profiler import parse_import_times
+
 BASE_DIR = Path(__file__).resolve().parent
 BOT_VERSION = "v1.1"
 EMBED_DESCRIPTION_LIMIT = 4096
 EMBED_FIELD_LIMIT = 1024
+# Tracebacks with more frames than this are formatted in a worker thread;
+# shallower ones cost less to format inline than to hand off to a thread.
+OFFLOAD_TRACEBACK_FRAMES = 50
 
 
 class CustomHelpCommand(commands.HelpCommand):
+    def _index(self) -> HelpIndex:
+        bot = self.context.bot
+        generation = bot.response_cache.generation
+        if bot.help_index is None or bot.help_index.generation != generation:
+            bot.help_index = HelpIndex.build(bot, generation=generation)
+        return bot.help_index
+
+    async def _listing(self) -> HelpListing:
+        ctx = self.context
+        # What a caller may run only changes with the command set (extension
+        # lifecycle) and with their locale, permissions and ownership, so
+        # command checks run once per such combination, not once per call.
+        is_owner = ctx.author.id == ctx.bot.owner_id or ctx.author.id in ctx.bot.owner_ids
+        key = (*context_key(ctx), ctx.clean_prefix, is_owner)
+        listing = ctx.bot.response_cache.get("help", key)
+        if listing is None:
+            index = self._index()
+            visible = await self.filter_commands(ctx.bot.walk_commands())
+            listing = index.listing({command.qualified_name for command in visible})
+            ctx.bot.response_cache.put("help", key, listing)
+        return listing
+
+    def _set_author(self, embed: discord.Embed) -> None:
+        me = self.context.me
+        if me is not None:
+            embed.set_author(name=me.name, icon_url=me.display_avatar.url)
+
     async def send_bot_help(self, mapping) -> None:
-        embed = discord.Embed(
-            title="指令總覽",
-            description="以下是目前可用的指令列表",
-            color=discord.Color.blue(),
-        )
-        for cog, commands_list in mapping.items():
-            filtered = await self.filter_commands(commands_list, sort=True)
-            if not filtered:
-                continue
-
-            name = cog.qualified_name if cog else "未分類"
-            value = "\n".join(
-                f"`{self.context.clean_prefix}{command.name}` - {command.short_doc}"
-                for command in filtered
+        del mapping
+        listing = await self._listing()
+        destination = self.get_destination()
+        if len(listing.pages) <= 1:
+            embed = render_page(
+                listing.pages[0] if listing.pages else (),
+                prefix=self.context.clean_prefix,
+                footer=f"輸入 {self.context.clean_prefix}help 指令名稱 查看詳細說明",
             )
-            embed.add_field(name=name, value=value[:EMBED_FIELD_LIMIT], inline=False)
+            self._set_author(embed)
+            await destination.send(embed=embed)
+            return
 
-        embed.set_footer(
-            text=f"輸入 {self.context.clean_prefix}help 指令名稱 查看詳細說明"
+        view = HelpPaginator(
+            listing,
+            author_id=self.context.author.id,
+            prefix=self.context.clean_prefix,
+            decorate=self._set_author,
         )
-        if self.context.me is not None:
-            embed.set_author(
-                name=self.context.me.name,
-                icon_url=self.context.me.display_avatar.url,
-            )
+        view.message = await destination.send(embed=view.embed(), view=view)
+
+    async def command_callback(self, ctx: commands.Context, /, *, command: str | None = None):
+        if command is None or ctx.bot.get_command(command) is not None or ctx.bot.get_cog(command):
+            return await super().command_callback(ctx, command=command)
+
+        await self.prepare_help_command(ctx, command)
+        listing = await self._listing()
+        results = self._index().search(command, visible=listing.visible)
+        if not results:
+            return await self.send_error_message(f"找不到與「{command}」相符的指令")
+        embed = render_page(
+            results,
+            prefix=ctx.clean_prefix,
+            title=f"搜尋結果：{command}"[:256],
+            footer=f"輸入 {ctx.clean_prefix}help 指令名稱 查看詳細說明",
+        )
+        self._set_author(embed)
         await self.get_destination().send(embed=embed)
 
     async def send_command_help(self, command) -> None:
@@ -70,51 +175,326 @@ class CustomHelpCommand(commands.HelpCommand):
         await self.get_destination().send(embed=embed)
 
 
-class DiscordBot(commands.Bot):
+def _command_kind(command: object) -> CommandKind:
+    if isinstance(command, (commands.HybridCommand, commands.HybridGroup, HybridAppCommand)):
+        return "hybrid"
+    if isinstance(command, (app_commands.Command, app_commands.Group, app_commands.ContextMenu)):
+        return "slash"
+    return "prefix"
+
+
+class BotCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        await self.client.hot_reloader.wait_idle()
+        extension = self.client.lazy_extensions.extension_for(interaction)
+        if extension is not None:
+            await self.client.lazy_extensions.materialize(extension)
+        if interaction.type is discord.InteractionType.application_command:
+            self.client.metrics.start(interaction.id)
+            self.client.check_rate_limit(
+                interaction.command,
+                interaction.user.id,
+                interaction.guild_id,
+            )
+        return True
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        if interaction.type is not discord.InteractionType.application_command:
+            return await super()._call(interaction)
+        name = interaction.data.get("name", "?")
+        module = getattr(interaction.command, "module", None)
+        with command_context(name, module and log_source(module), interaction.guild_id):
+            tracer = self.client.dispatch_tracer
+            if tracer is None:
+                await super()._call(interaction)
+            else:
+                await tracer.run(f"/{name}", super()._call(interaction))
+
+    async def on_error(
+        self,
+        interaction: discord.Interaction,
+        error: app_commands.AppCommandError,
+    ) -> None:
+        await _handle_app_command_error(interaction, error)
+
+
+class DiscordBot(commands.AutoShardedBot):
     cogs_package = "cogs"
     cogs_directory = BASE_DIR / cogs_package
     management_name = "management"
     management_extension = f"{cogs_package}.{management_name}"
+    extension_index = ExtensionIndex(cogs_directory, cogs_package)
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        cache_policy: CachePolicy | None = None,
+        startup_profiler: StartupProfiler | None = None,
+    ) -> None:
+        cache_policy = cache_policy or CachePolicy()
         intents = discord.Intents.default()
         intents.message_content = True
+        if cache_policy.members_intent:
+            intents.members = True
 
         super().__init__(
             command_prefix=commands.when_mentioned_or("!"),
             intents=intents,
             help_command=CustomHelpCommand(),
+            tree_cls=BotCommandTree,
+            shard_count=1,
+            member_cache_flags=cache_policy.member_cache_flags(intents),
+            chunk_guilds_at_startup=cache_policy.chunk_guilds,
+            max_messages=cache_policy.max_messages,
         )
+        self.startup_profiler = startup_profiler or StartupProfiler()
+        self.log_policy: LogPolicy | None = None
         self.version = BOT_VERSION
         self.started_at = datetime.now(UTC)
         self.maintainer_id: int | None = None
+        self.lazy_extensions = LazyExtensionRegistry(
+            self,
+            BASE_DIR / "data" / "extension_manifest.json",
+            self.extension_path,
+            lambda name: self.cogs_directory / f"{name}.py",
+        )
+        self.command_sync = CommandSyncManager(
+            self.tree,
+            BASE_DIR / "data" / "command_sync.json",
+            extra_payloads=self.lazy_extensions.app_command_payloads,
+        )
+        self.startup_report: StartupReport | None = None
+        self.error_reporter: ErrorReporter | None = None
+        self.user_resolver = UserResolver(
+            self,
+            ttl=cache_policy.user_ttl,
+            max_size=cache_policy.user_max,
+        )
+        self.hot_reloader = HotReloader(self)
+        self.shard_config = ShardConfig()
+        self.cache_policy = cache_policy
+        self.cache_sweeper: CacheSweeper | None = None
+        self.response_cache = ResponseCache()
+        self.help_index: HelpIndex | None = None
+        self.storage: Storage | None = None
+        self.counters: CounterBuffer | None = None
+        self.dispatch_tracer: DispatchTracer | None = None
+        self.jobs = JobQueue()
+        cluster_id = os.getenv("CLUSTER_ID", "").strip()
+        self.cluster_id: int | None = int(cluster_id) if cluster_id.isdigit() else None
+        self.cluster_status: ClusterStatusWriter | None = None
+        self.exit_code = 0
+        self.gateway_resume = ResumeStore(
+            BASE_DIR
+            / "data"
+            / (
+                "gateway_resume.json"
+                if self.cluster_id is None
+                else f"gateway_resume-{self.cluster_id}.json"
+            )
+        )
+        self._resume_snapshot: ResumeSnapshot | None = None
+        self.rate_limiter = RateLimiter(RateLimitPolicy())
+        self.add_check(self._check_prefix_rate_limit, call_once=True)
+        self.outbound = OutboundScheduler()
+        self.outbound.install(self.http)
+        self.metrics = MetricsRegistry()
+        self.metrics_server: MetricsServer | None = None
+        self.metrics.register_gauge(
+            "gateway_latency_seconds",
+            "Gateway heartbeat latency.",
+            lambda: self.latency,
+        )
+        self.metrics.register_gauge(
+            "error_reports_pending",
+            "Error reports waiting to be coalesced.",
+            lambda: self.error_reporter.pending if self.error_reporter else 0,
+        )
+        self.metrics.register_counter(
+            "error_reports_dropped_total",
+            "Error reports dropped because the queue was full.",
+            lambda: self.error_reporter.dropped if self.error_reporter else 0,
+        )
+        for priority in Priority:
+            self.metrics.register_gauge(
+                f"outbound_queue_depth_{priority.name.lower()}",
+                f"REST requests of priority {priority.name.lower()} waiting for a slot.",
+                functools.partial(self.outbound.depth, priority),
+            )
+        self.metrics.register_gauge(
+            "outbound_in_flight",
+            "REST requests currently being sent.",
+            lambda: self.outbound.active,
+        )
+        self.metrics.register_counter(
+            "outbound_coalesced_edits_total",
+            "Message edits merged into an already queued edit.",
+            lambda: self.outbound.coalesced,
+        )
+        self.metrics.register_gauge(
+            "cached_messages",
+            "Messages held in the discord.py message cache.",
+            lambda: len(self.cached_messages),
+        )
+        self.metrics.register_counter(
+            "cache_expired_messages_total",
+            "Cached messages dropped by the message TTL since start-up.",
+            lambda: self.cache_sweeper.expired if self.cache_sweeper else 0,
+        )
+        self.metrics.register_counter(
+            "response_cache_hits_total",
+            "Idempotent command responses served from the response cache.",
+            lambda: self.response_cache.hits.total(),
+        )
+        self.metrics.register_counter(
+            "response_cache_misses_total",
+            "Idempotent command responses rendered because of a cache miss.",
+            lambda: self.response_cache.misses.total(),
+        )
+        self.metrics.register_gauge(
+            "storage_write_queue_depth",
+            "Storage writes waiting for the writer thread.",
+            lambda: self.storage.pending if self.storage else 0,
+        )
+        self.metrics.register_counter(
+            "storage_write_batches_total",
+            "Storage write transactions committed since start-up.",
+            lambda: self.storage.batches if self.storage else 0,
+        )
+        self.metrics.register_counter(
+            "storage_writes_total",
+            "Storage writes committed since start-up.",
+            lambda: self.storage.writes if self.storage else 0,
+        )
+        self.metrics.register_gauge(
+            "counter_pending",
+            "Buffered counter deltas waiting for the next flush.",
+            lambda: self.counters.pending if self.counters else 0,
+        )
+        self.metrics.register_gauge(
+            "counter_flush_seconds",
+            "Duration of the most recent counter flush.",
+            lambda: self.counters.last_flush_seconds if self.counters else 0,
+        )
+        self.metrics.register_counter(
+            "counter_flushes_total",
+            "Counter flushes written to storage since start-up.",
+            lambda: self.counters.flushes if self.counters else 0,
+        )
+        self.metrics.register_gauge(
+            "event_loop_lag_seconds",
+            "How late the most recent event loop heartbeat fired.",
+            lambda: self.dispatch_tracer.loop_lag if self.dispatch_tracer else 0,
+        )
+        self.metrics.register_counter(
+            "slow_handlers_flagged_total",
+            "Handlers and loop stalls that exceeded the slow handler threshold.",
+            lambda: self.dispatch_tracer.flagged if self.dispatch_tracer else 0,
+        )
+        self.metrics.register_gauge(
+            "rate_limit_buckets",
+            "Command rate limit buckets currently tracked.",
+            lambda: len(self.rate_limiter),
+        )
+        self.metrics.register_counter(
+            "rate_limited_commands_total",
+            "Commands rejected by the rate limiter since start-up.",
+            lambda: self.rate_limiter.rejected,
+        )
+        self.metrics.register_gauge(
+            "jobs_waiting",
+            "Job commands waiting for a concurrency slot.",
+            lambda: self.jobs.waiting,
+        )
+        self.metrics.register_gauge(
+            "jobs_running",
+            "Job commands currently running.",
+            lambda: self.jobs.running,
+        )
+        self.metrics.register_counter(
+            "jobs_rejected_total",
+            "Job commands rejected because their queue was full.",
+            lambda: self.jobs.rejected,
+        )
+        self.metrics.register_counter(
+            "jobs_auto_deferred_total",
+            "Interactions deferred because their job outlasted the defer threshold.",
+            lambda: self.jobs.deferred,
+        )
+        self.metrics.register_collector(self.jobs.render_prometheus)
+
+    def apply_shard_config(self, config: ShardConfig) -> None:
+        """Apply shard settings; must run before the gateway connects."""
+        self.shard_config = config
+        self.shard_count = config.shard_count
+        self.shard_ids = config.shard_ids
 
     @classmethod
     def discover_extension_names(cls) -> tuple[str, ...]:
         """Return loadable top-level Cog module names in deterministic order."""
-        return tuple(
-            path.stem
-            for path in sorted(
-                cls.cogs_directory.glob("*.py"),
-                key=lambda item: item.name.casefold(),
-            )
-            if path.stem != "__init__" and path.stem.isidentifier()
-        )
+        return cls.extension_index.names()
 
     @classmethod
     def extension_path(cls, name: str) -> str | None:
         """Resolve a user-provided Cog name against the discovered allowlist."""
-        normalized_name = name.strip()
-        if normalized_name == "__init__" or not normalized_name.isidentifier():
-            return None
+        return cls.extension_index.resolve(name)
+
+    def check_rate_limit(
+        self,
+        command: commands.Command | app_commands.Command | app_commands.ContextMenu | None,
+        user_id: int,
+        guild_id: int | None,
+    ) -> None:
+        """Consume a token for ``command`` under its cog's policy or raise ``RateLimited``."""
+        if command is None:
+            return
+        if isinstance(command, commands.Command):
+            cog = command.cog
+        else:
+            cog = getattr(command, "binding", None)
+        self.rate_limiter.hit(
+            command.qualified_name,
+            user_id,
+            guild_id,
+            self.rate_limiter.policy_for(cog),
+        )
 
-        candidate = cls.cogs_directory / f"{normalized_name}.py"
-        if not candidate.is_file():
-            return None
-        return f"{cls.cogs_package}.{normalized_name}"
+    async def _check_prefix_rate_limit(self, ctx: commands.Context) -> bool:
+        # Hybrid commands invoked as slash commands were already counted by the tree.
+        if ctx.interaction is None:
+            self.check_rate_limit(
+                ctx.command,
+                ctx.author.id,
+                None if ctx.guild is None else ctx.guild.id,
+            )
+        return True
+
+    async def load_extension(self, name: str, *, package: str | None = None) -> None:
+        try:
+            await super().load_extension(name, package=package)
+        finally:
+            self.response_cache.invalidate()
+
+    async def unload_extension(self, name: str, *, package: str | None = None) -> None:
+        try:
+            await super().unload_extension(name, package=package)
+        finally:
+            self.response_cache.invalidate()
+
+    async def reload_extension(self, name: str, *, package: str | None = None) -> None:
+        try:
+            await super().reload_extension(name, package=package)
+        finally:
+            self.response_cache.invalidate()
+
+    async def login(self, token: str) -> None:
+        with self.startup_profiler.phase("login+setup_hook"):
+            await super().login(token)
 
     async def setup_hook(self) -> None:
-        application = self.application or await self.application_info()
+        profiler = self.startup_profiler
+        with profiler.phase("application_info"):
+            application = self.application or await self.application_info()
 
         configured_maintainer_id = os.getenv("MAINTAINER_ID", "").strip()
         if configured_maintainer_id:
@@ -141,33 +521,326 @@ class DiscordBot(commands.Bot):
                 in (discord.TeamMemberRole.admin, discord.TeamMemberRole.developer)
             }
 
-        logger.info("[初始化] 載入核心管理模組")
-        await self.load_extension(self.management_extension)
+        self.user_resolver.prime(application.owner)
+        with profiler.phase("maintainer_warmup"):
+            await self.user_resolver.warm(self.maintainer_id or self.owner_id, dm=True)
 
-        for extension_name in self.discover_extension_names():
-            full_path = self.extension_path(extension_name)
-            if full_path is None or full_path == self.management_extension:
-                continue
+        error_queue_size = int(env_number("ERROR_REPORT_QUEUE_SIZE", 1000))
+        if error_queue_size < 1:
+            logger.warning("[初始化] ERROR_REPORT_QUEUE_SIZE 必須大於 0，使用預設值 1000")
+            error_queue_size = 1000
+        self.error_reporter = ErrorReporter(
+            functools.partial(_send_error_to_maintainer, self),
+            window=env_number("ERROR_REPORT_WINDOW", 10.0),
+            max_queue=error_queue_size,
+        )
+        self.error_reporter.start()
+        self.outbound.concurrency = max(1, int(env_number("OUTBOUND_CONCURRENCY", 8)))
+        self.jobs.thread_workers = max(1, int(env_number("JOB_THREAD_WORKERS", 4)))
+        self.jobs.process_workers = max(0, int(env_number("JOB_PROCESS_WORKERS", 2)))
+        self.rate_limiter.default = RateLimitPolicy(
+            user=RateLimit.parse(os.getenv("RATE_LIMIT_USER", "5/10")),
+            guild=RateLimit.parse(os.getenv("RATE_LIMIT_GUILD", "30/10")),
+        )
 
+        metrics_port = int(env_number("METRICS_PORT", 0))
+        if metrics_port:
+            self.metrics_server = MetricsServer(
+                self.metrics,
+                os.getenv("METRICS_HOST", "127.0.0.1").strip() or "127.0.0.1",
+                metrics_port,
+            )
             try:
-                logger.info(f"[初始化] 載入 Extension: {extension_name}")
-                await self.load_extension(full_path)
-            except Exception as error:
-                logger.opt(exception=error).error(
-                    f"[初始化] Extension 載入失敗: {extension_name}"
+                await self.metrics_server.start()
+            except OSError as error:
+                logger.warning(f"[效能指標] 無法啟動 Prometheus 端點: {error}")
+                self.metrics_server = None
+
+        if self.cache_policy.message_ttl is not None and self.cache_policy.max_messages:
+            self.cache_sweeper = CacheSweeper(
+                self,
+                self.cache_policy.message_ttl,
+                interval=min(60.0, max(self.cache_policy.message_ttl / 4, 1.0)),
+            )
+            self.cache_sweeper.start()
+
+        cluster_status_file = os.getenv("CLUSTER_STATUS_FILE", "").strip()
+        if cluster_status_file:
+            self.cluster_status = ClusterStatusWriter(self, Path(cluster_status_file))
+            self.cluster_status.start()
+
+        storage_path = os.getenv("STORAGE_PATH", "").strip()
+        if storage_path:
+            self.storage = Storage(
+                Path(storage_path),
+                readers=max(1, int(env_number("STORAGE_READERS", 4))),
+            )
+            with profiler.phase("storage_open"):
+                await self.storage.open()
+
+        counter_interval = env_number("COUNTER_FLUSH_INTERVAL", 0)
+        if counter_interval > 0:
+            if self.storage is None:
+                logger.warning("[初始化] COUNTER_FLUSH_INTERVAL 需要同時設定 STORAGE_PATH，計數器未啟用")
+            else:
+                self.counters = CounterBuffer(self.storage, interval=max(1.0, counter_interval))
+                await self.counters.start()
+
+        slow_threshold = env_number("SLOW_HANDLER_THRESHOLD", 0)
+        if slow_threshold > 0:
+            self.dispatch_tracer = DispatchTracer(threshold=slow_threshold)
+            self.dispatch_tracer.start()
+
+        profiler.begin("extensions")
+        logger.info("[初始化] 載入核心管理模組")
+        await self.load_extension(self.management_extension)
+
+        names = self.discover_extension_names()
+        configured_lazy = os.getenv("LAZY_EXTENSIONS", "").strip()
+        lazy_names = set()
+        if configured_lazy:
+            lazy_names = self.lazy_extensions.plan(
+                names,
+                (
+                    set(names)
+                    if configured_lazy == "*"
+                    else {name.strip() for name in configured_lazy.split(",")}
                 )
+                - {self.management_name},
+            )
+            lazy_names = {name for name in lazy_names if self.lazy_extensions.register(name)}
+            if lazy_names:
+                logger.info(f"[初始化] 延遲載入 Extension: {', '.join(sorted(lazy_names))}")
 
-        logger.info("[初始化] Extension 載入完畢")
+        loader = ExtensionLoader(
+            self,
+            self.extension_path,
+            lambda name: self.cogs_directory / f"{name}.py",
+        )
+        self.startup_report = await loader.load_all(
+            [name for name in names if name not in lazy_names],
+            preloaded=(self.management_name, *lazy_names),
+        )
+        for name, reason in self.startup_report.skipped.items():
+            logger.warning(f"[初始化] 略過 Extension {name}: {reason}")
+        for timing in self.startup_report.timings:
+            if timing.loaded and timing.name in self.lazy_extensions.configured:
+                self.lazy_extensions.record(timing.name)
+        profiler.end("extensions")
+        logger.info(
+            f"[初始化] Extension 載入完畢，共 {self.startup_report.waves} 批，"
+            f"耗時 {self.startup_report.elapsed * 1000:.0f}ms"
+        )
+        if self.cluster_id not in (None, 0):
+            logger.info("[初始化] 由叢集 #0 負責同步斜線指令，略過")
+            return
+
+        dry_run = env_flag("COMMAND_SYNC_DRY_RUN")
         logger.info("[初始化] 同步斜線指令")
-        slash_commands = await self.tree.sync()
-        logger.info(f"[初始化] 已同步 {len(slash_commands)} 個斜線指令")
+        with profiler.phase("command_sync"):
+            result = await self.command_sync.sync(
+                self.application_id,
+                force=env_flag("COMMAND_SYNC_FORCE"),
+                dry_run=dry_run,
+            )
+        if dry_run:
+            logger.info(f"[初始化] (dry-run) {len(result.changes)} 個範圍需要同步")
+        elif result.synced:
+            logger.info(
+                "[初始化] 已同步斜線指令: "
+                + ", ".join(f"{scope}={count}" for scope, count in result.synced.items())
+            )
+        else:
+            logger.info("[初始化] 斜線指令未變更，略過同步")
+
+    async def get_context(self, origin, /, *, cls=commands.Context):
+        context = await super().get_context(origin, cls=cls)
+        if isinstance(context.command, LazyPrefixCommand):
+            await self.lazy_extensions.materialize(context.command.extension)
+            context = await super().get_context(origin, cls=cls)
+        return context
+
+    async def process_commands(self, message: discord.Message) -> None:
+        await self.hot_reloader.wait_idle()
+        await super().process_commands(message)
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs) -> None:
+        tracer = self.dispatch_tracer
+        if tracer is None:
+            return await super()._run_event(coro, event_name, *args, **kwargs)
+
+        name = f"{event_name}:{getattr(coro, '__qualname__', coro)}"
+
+        async def traced(*args, **kwargs):
+            await tracer.run(name, coro(*args, **kwargs))
+
+        await super()._run_event(traced, event_name, *args, **kwargs)
+
+    async def invoke(self, ctx: commands.Context) -> None:
+        started = time.perf_counter()
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        with command_context(
+            ctx.command.qualified_name,
+            log_source(ctx.command.module),
+            ctx.guild and ctx.guild.id,
+        ):
+            if self.dispatch_tracer is not None:
+                await self.dispatch_tracer.run(f"!{ctx.command.qualified_name}", super().invoke(ctx))
+            else:
+                await super().invoke(ctx)
+        if ctx.command is not None:
+            self.metrics.observe(
+                _command_kind(ctx.command),
+                ctx.command.qualified_name,
+                time.perf_counter() - started,
+                failed=ctx.command_failed,
+            )
+            if not ctx.command_failed:
+                self.record_usage(ctx.author.id, ctx.guild)
+
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        command: app_commands.Command | app_commands.ContextMenu,
+    ) -> None:
+        self.metrics.finish(
+            interaction.id,
+            _command_kind(command),
+            command.qualified_name,
+        )
+        self.record_usage(interaction.user.id, interaction.guild)
+
+    async def on_command_error(
+        self,
+        ctx: commands.Context,
+        error: commands.CommandError,
+    ) -> None:
+        await _handle_command_error(ctx, error)
+
+    def record_usage(self, user_id: int, guild: discord.Guild | None) -> None:
+        if self.counters is None:
+            return
+        self.counters.increment("user_commands", user_id)
+        if guild is not None:
+            self.counters.increment("guild_commands", guild.id)
+
+    async def close(self) -> None:
+        if self.error_reporter is not None:
+            await self.error_reporter.close()
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+        if self.cluster_status is not None:
+            await self.cluster_status.close()
+        if self.cache_sweeper is not None:
+            await self.cache_sweeper.close()
+        await self.jobs.close()
+        if self.counters is not None:
+            await self.counters.close()
+        if self.storage is not None:
+            await self.storage.close()
+        if self.dispatch_tracer is not None:
+            await self.dispatch_tracer.close()
+        await super().close()
+
+    async def launch_shards(self) -> None:
+        self.startup_profiler.begin("gateway_until_ready")
+        self._resume_snapshot = self.gateway_resume.load(
+            application_id=self.application_id,
+            shard_count=self.shard_count,
+        )
+        if self._resume_snapshot is not None:
+            self.shard_count = self._resume_snapshot.shard_count
+            logger.info(
+                f"[工作階段恢復] 載入 {len(self._resume_snapshot.guilds)} 個伺服器快照，"
+                f"嘗試恢復 {len(self._resume_snapshot.sessions)} 個分片的工作階段"
+            )
+        try:
+            await super().launch_shards()
+        finally:
+            self._resume_snapshot = None
+
+    async def launch_shard(
+        self,
+        gateway: yarl.URL,
+        shard_id: int,
+        *,
+        initial: bool = False,
+    ) -> None:
+        snapshot = self._resume_snapshot
+        session = None if snapshot is None else snapshot.sessions.pop(shard_id, None)
+        if session is None:
+            return await super().launch_shard(gateway, shard_id, initial=initial)
+
+        # Resolved before touching the cache so an incompatible discord.py
+        # fails here instead of after a synthetic READY.
+        events = shard_event_queue(self)
+        shard_registry(self)
+        # Warm the cache with a synthetic READY; a failed RESUME falls back to
+        # IDENTIFY and the real READY simply replaces it.
+        inject_ready(self, snapshot.ready_payload(session))
+        try:
+            ws = await asyncio.wait_for(
+                connect_resumed(
+                    self,
+                    shard_id,
+                    gateway=session.resume_url,
+                    session_id=session.session_id,
+                    sequence=session.sequence,
+                    initial=initial,
+                ),
+                timeout=self.shard_connect_timeout,
+            )
+        except Exception as error:
+            logger.warning(f"[工作階段恢復] 分片 {shard_id} 無法恢復，改為重新登入: {error}")
+            return await super().launch_shard(gateway, shard_id, initial=initial)
+
+        start_shard(self, shard_id, ws, events)
+
+    async def close_for_resume(self) -> None:
+        """Close without invalidating gateway sessions so the next boot can RESUME."""
+        shards = list(shard_registry(self).values())
+        for shard in shards:
+            stop_shard_reader(shard)
+        snapshot = self.gateway_resume.capture(self)
+        # Any close code other than 1000/1001 keeps the session resumable.
+        await asyncio.gather(*(shard.ws.close(code=4000) for shard in shards))
+        if snapshot is not None and snapshot.sessions:
+            await asyncio.to_thread(self.gateway_resume.save, snapshot)
+            logger.info(f"[工作階段恢復] 已保存 {len(snapshot.sessions)} 個分片的工作階段")
+        await self.close()
 
     async def on_ready(self) -> None:
         await self.change_presence(activity=discord.CustomActivity(name="無所事事中...."))
         logger.info(f"[初始化] {self.user} | Ready!")
+        if not self.startup_profiler.finished:
+            await self.write_startup_profile()
+
+    async def write_startup_profile(self) -> None:
+        profiler = self.startup_profiler
+        profiler.end("gateway_until_ready")
+        if not env_flag("STARTUP_PROFILE"):
+            profiler.finished = True
+            return
 
+        extra: dict[str, object] = {
+            "version": self.version,
+            "shards": self.shard_count,
+            "guilds": len(self.guilds),
+        }
+        if self.startup_report is not None:
+            extra["extensions"] = [asdict(timing) for timing in self.startup_report.timings]
+        if env_flag("STARTUP_PROFILE_IMPORTS"):
+            extra["imports"] = await _profile_imports()
 
-bot = DiscordBot()
+        path, report = await asyncio.to_thread(profiler.write, BASE_DIR / "logs", **extra)
+        for line in profiler.summary_lines(report):
+            logger.info(f"[啟動分析] {line}")
+        for item in extra.get("imports", [])[:10]:
+            logger.info(
+                f"[啟動分析] import {item['module']:<24} {item['cumulative_ms']:9.1f}ms"
+            )
+        logger.info(f"[啟動分析] 已寫入 {path.relative_to(BASE_DIR)}")
 
 
 def _truncate(value: object, limit: int) -> str:
@@ -181,6 +854,43 @@ def _format_exception(error: BaseException) -> str:
     ).rstrip()
 
 
+def _render_error(
+    error: BaseException,
+    fields: dict[str, object],
+) -> tuple[str, str, dict[str, str]]:
+    """Format the traceback and truncated embed text."""
+    return (
+        _format_exception(error),
+        _truncate(error, EMBED_DESCRIPTION_LIMIT),
+        {name: _truncate(value, EMBED_FIELD_LIMIT) for name, value in fields.items()},
+    )
+
+
+def _traceback_frames(error: BaseException, limit: int) -> int:
+    """Count traceback frames across the exception chain, stopping past ``limit``."""
+    frames = 0
+    seen: set[int] = set()
+    current: BaseException | None = error
+    while current is not None and id(current) not in seen and frames <= limit:
+        seen.add(id(current))
+        tb = current.__traceback__
+        while tb is not None and frames <= limit:
+            frames += 1
+            tb = tb.tb_next
+        current = current.__cause__ or current.__context__
+    return frames
+
+
+async def _render_error_async(
+    error: BaseException,
+    fields: dict[str, object],
+) -> tuple[str, str, dict[str, str]]:
+    """Render inline, or in a worker thread when the traceback is deep."""
+    if _traceback_frames(error, OFFLOAD_TRACEBACK_FRAMES) > OFFLOAD_TRACEBACK_FRAMES:
+        return await asyncio.to_thread(_render_error, error, fields)
+    return _render_error(error, fields)
+
+
 def _channel_description(guild: discord.Guild | None, channel: object) -> str:
     if guild is None:
         return "私人訊息"
@@ -191,79 +901,117 @@ def _channel_description(guild: discord.Guild | None, channel: object) -> str:
     return f"{guild.name}/{channel_name}"
 
 
-async def _get_maintainer() -> discord.User | None:
+async def _send_error_to_maintainer(bot: DiscordBot, embed: discord.Embed) -> None:
     maintainer_id = bot.maintainer_id or bot.owner_id
     if maintainer_id is None:
         logger.error("[錯誤回報] 無法取得 maintainer ID")
-        return None
-
-    maintainer = bot.get_user(maintainer_id)
-    if maintainer is not None:
-        return maintainer
+        return
 
-    try:
-        return await bot.fetch_user(maintainer_id)
-    except discord.HTTPException as error:
-        logger.warning(f"[錯誤回報] 無法取得 maintainer: {error}")
-        return None
+    # Error DMs yield to user-facing replies when REST slots are scarce.
+    with prioritize(Priority.OPS):
+        channel = await bot.user_resolver.dm_channel(maintainer_id)
+        if channel is None:
+            return
 
+        try:
+            await channel.send(embed=embed)
+        except discord.Forbidden as error:
+            bot.user_resolver.invalidate(maintainer_id)
+            logger.warning(f"[錯誤回報] 無法私訊 maintainer: {error}")
+        except discord.HTTPException as error:
+            logger.warning(f"[錯誤回報] 無法私訊 maintainer: {error}")
 
-async def _send_error_to_maintainer(embed: discord.Embed) -> None:
-    maintainer = await _get_maintainer()
-    if maintainer is None:
-        return
 
-    try:
-        await maintainer.send(embed=embed)
-    except discord.HTTPException as error:
-        logger.warning(f"[錯誤回報] 無法私訊 maintainer: {error}")
+async def _report_error(
+    bot: DiscordBot,
+    error: BaseException,
+    embed: discord.Embed,
+    channel_description: str,
+) -> None:
+    if bot.error_reporter is None:
+        await _send_error_to_maintainer(bot, embed)
+    else:
+        bot.error_reporter.report(error, embed, channel_description)
 
 
-@bot.event
-async def on_command_error(
+async def _handle_command_error(
     ctx: commands.Context,
     error: commands.CommandError,
 ) -> None:
+    bot: DiscordBot = ctx.bot
+    if ctx.interaction is not None and ctx.command is not None:
+        bot.metrics.finish(
+            ctx.interaction.id,
+            "hybrid",
+            ctx.command.qualified_name,
+            failed=True,
+        )
     if isinstance(error, commands.CommandNotFound):
         return
+    if isinstance(error, RateLimited):
+        logger.debug(f"[限流] {ctx.author.id} 觸發 {ctx.command} 的限流")
+        # Only answer the first rejection per bucket so spam cannot turn into REST calls.
+        if error.notify:
+            await ctx.send(str(error), delete_after=max(error.retry_after, 5.0))
+        return
+    if isinstance(error, JobRejected):
+        logger.debug(f"[工作佇列] {ctx.author.id} 的 {ctx.command} 因排隊已滿被拒絕")
+        await ctx.send(str(error), delete_after=10)
+        return
     if isinstance(error, (commands.UserInputError, commands.CheckFailure)):
         logger.warning(f"[前綴指令] 使用者輸入或權限錯誤: {error}")
         return
 
     actual_error = error.original if isinstance(error, commands.CommandInvokeError) else error
     channel_description = _channel_description(ctx.guild, ctx.channel)
+    traceback_text, description, fields = await _render_error_async(
+        actual_error,
+        {
+            "訊息內容": getattr(ctx.message, "content", None),
+            "頻道": channel_description,
+        },
+    )
     logger.error(
         f"{channel_description}/{ctx.author.name}({ctx.author.id}):{actual_error}\n"
-        f"{_format_exception(actual_error)}"
+        f"{traceback_text}"
     )
 
     embed = discord.Embed(
         title="前綴指令錯誤",
-        description=_truncate(actual_error, EMBED_DESCRIPTION_LIMIT),
+        description=description,
         color=discord.Color.red(),
     )
     embed.set_author(
         name=_truncate(ctx.author.name, 256),
         icon_url=ctx.author.display_avatar.url,
     )
-    embed.add_field(
-        name="訊息內容",
-        value=_truncate(getattr(ctx.message, "content", None), EMBED_FIELD_LIMIT),
-        inline=False,
-    )
-    embed.add_field(
-        name="頻道",
-        value=_truncate(channel_description, EMBED_FIELD_LIMIT),
-        inline=False,
-    )
-    await _send_error_to_maintainer(embed)
+    for name, value in fields.items():
+        embed.add_field(name=name, value=value, inline=False)
+    await _report_error(bot, actual_error, embed, channel_description)
 
 
-@bot.tree.error
-async def on_app_command_error(
+async def _handle_app_command_error(
     interaction: discord.Interaction,
     error: app_commands.AppCommandError,
 ) -> None:
+    bot: DiscordBot = interaction.client
+    if interaction.command is not None:
+        bot.metrics.finish(
+            interaction.id,
+            _command_kind(interaction.command),
+            interaction.command.qualified_name,
+            failed=True,
+        )
+    if isinstance(error, RateLimited):
+        logger.debug(f"[限流] {interaction.user.id} 觸發 {interaction.command} 的限流")
+        if not interaction.response.is_done():
+            await interaction.response.send_message(str(error), ephemeral=True)
+        return
+    if isinstance(error, JobRejected):
+        logger.debug(f"[工作佇列] {interaction.user.id} 的 {interaction.command} 因排隊已滿被拒絕")
+        if not interaction.response.is_done():
+            await interaction.response.send_message(str(error), ephemeral=True)
+        return
     if isinstance(error, (app_commands.CheckFailure, app_commands.TransformerError)):
         logger.warning(f"[斜線指令] 使用者輸入或權限錯誤: {error}")
         if not interaction.response.is_done():
@@ -271,13 +1019,11 @@ async def on_app_command_error(
         return
 
     actual_error = (
-        error.original if isinstance(error, app_commands.CommandInvokeError) else error
+        error.original
+        if isinstance(error, (app_commands.CommandInvokeError, LazyExtensionFailed))
+        else error
     )
     channel_description = _channel_description(interaction.guild, interaction.channel)
-    logger.error(
-        f"{channel_description}/{interaction.user.name}({interaction.user.id}):"
-        f"{actual_error}\n{_format_exception(actual_error)}"
-    )
 
     if not interaction.response.is_done():
         try:
@@ -288,47 +1034,99 @@ async def on_app_command_error(
         except discord.HTTPException as response_error:
             logger.warning(f"[錯誤回報] 無法回覆 interaction: {response_error}")
 
+    traceback_text, description, fields = await _render_error_async(
+        actual_error,
+        {"指令資料": interaction.data, "頻道": channel_description},
+    )
+    logger.error(
+        f"{channel_description}/{interaction.user.name}({interaction.user.id}):"
+        f"{actual_error}\n{traceback_text}"
+    )
+
     embed = discord.Embed(
         title="斜線指令錯誤",
-        description=_truncate(actual_error, EMBED_DESCRIPTION_LIMIT),
+        description=description,
         color=discord.Color.red(),
     )
     embed.set_author(
         name=_truncate(f"{interaction.user.name} ({interaction.user.id})", 256),
         icon_url=interaction.user.display_avatar.url,
     )
-    embed.add_field(
-        name="指令資料",
-        value=_truncate(interaction.data, EMBED_FIELD_LIMIT),
-        inline=False,
-    )
-    embed.add_field(
-        name="頻道",
-        value=_truncate(channel_description, EMBED_FIELD_LIMIT),
-        inline=False,
-    )
-    await _send_error_to_maintainer(embed)
+    for name, value in fields.items():
+        embed.add_field(name=name, value=value, inline=False)
+    await _report_error(bot, actual_error, embed, channel_description)
 
 
-def set_logger() -> None:
+def set_logger() -> LogPolicy:
     logger.remove()
-    debug_mode = os.getenv("DEBUG", "false").strip().lower() in ("true", "1", "yes")
-
-    logger.add(sys.stdout, level="DEBUG" if debug_mode else "INFO", colorize=True)
-    logger.add(
-        BASE_DIR / "logs" / "system.log",
-        rotation="7 days",
-        retention="30 days",
-        compression="zip",
-        encoding="UTF-8",
-        level="INFO",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+    debug_mode = env_flag("DEBUG")
+    try:
+        policy = LogPolicy.from_env(debug=debug_mode)
+        policy_error = None
+    except ValueError as error:
+        policy = LogPolicy(level="DEBUG" if debug_mode else "INFO")
+        policy_error = error
+
+    cluster_id = os.getenv("CLUSTER_ID", "").strip()
+    log_name = f"cluster-{cluster_id}.log" if cluster_id else "system.log"
+    # enqueue=True moves sink writes, rotation and zip compression to loguru's
+    # background thread so an error storm cannot stall the gateway heartbeat.
+    policy.install(
+        [
+            {
+                "sink": sys.stdout,
+                "level": "TRACE",
+                "colorize": True,
+                "enqueue": True,
+            },
+            {
+                "sink": BASE_DIR / "logs" / log_name,
+                "enqueue": True,
+                "rotation": "7 days",
+                "retention": "30 days",
+                "compression": "zip",
+                "encoding": "UTF-8",
+                "level": "INFO",
+                "format": "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+            },
+        ]
     )
+    if policy_error is not None:
+        logger.critical(f"日誌設定錯誤: {policy_error}")
+        raise SystemExit(1)
+    return policy
+
+
+async def _profile_imports() -> list[dict[str, object]]:
+    """Import ``main`` in a child ``python -X importtime`` and rank its slowest imports."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-X",
+        "importtime",
+        "-c",
+        "import main",
+        cwd=BASE_DIR,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode:
+        logger.warning(f"[啟動分析] 匯入分析子行程結束代碼 {process.returncode}")
+    return parse_import_times(stderr.decode("utf-8", errors="replace"), root="main")
 
 
 def main() -> None:
-    load_dotenv(BASE_DIR / ".env")
-    set_logger()
+    # Built here rather than at import time so that importing main (job
+    # process workers, cluster.py, the import profiler) stays cheap, and only
+    # once the cache policy is known since discord.py takes it as Client kwargs.
+    profiler = StartupProfiler()
+    with profiler.phase("load_dotenv"):
+        load_dotenv(BASE_DIR / ".env")
+    with profiler.phase("set_logger"):
+        log_policy = set_logger()
+    mismatch = version_mismatch()
+    if mismatch is not None:
+        logger.warning(f"[初始化] {mismatch}")
 
     token = os.getenv("DISCORD_BOT_TOKEN", "").strip()
     if not token:
@@ -336,11 +1134,48 @@ def main() -> None:
         raise SystemExit(1)
 
     try:
-        bot.run(token)
+        shard_config = ShardConfig.from_env()
+    except ValueError as error:
+        logger.critical(f"分片設定錯誤: {error}")
+        raise SystemExit(1) from error
+
+    try:
+        cache_policy = CachePolicy.from_env()
+    except ValueError as error:
+        logger.critical(f"快取設定錯誤: {error}")
+        raise SystemExit(1) from error
+
+    bot = DiscordBot(cache_policy=cache_policy, startup_profiler=profiler)
+    bot.log_policy = log_policy
+    bot.apply_shard_config(shard_config)
+    logger.info(f"[初始化] 分片模式: {shard_config.describe()}")
+    logger.info(f"[初始化] 快取設定: {cache_policy.describe()}")
+
+    try:
+        runtime = Runtime.prepare(RuntimeMode.from_env())
+    except ValueError as error:
+        logger.critical(f"執行環境設定錯誤: {error}")
+        raise SystemExit(1) from error
+    logger.info(f"[初始化] 執行環境: {runtime.describe()}")
+
+    try:
+        runtime.run_client(bot, token)
     except Exception as error:
         logger.opt(exception=error).critical("無法啟動 Discord Bot")
         raise SystemExit(1) from error
 
+    logger.complete()
+    if (
+        bot.exit_code == EXIT_RESTART
+        and bot.cluster_id is None
+        and os.getenv("RESTART_MODE", "").strip().lower() != "exit"
+    ):
+        # Nothing outside will restart this process, so replace it once the
+        # bot has shut down completely.
+        os.execv(sys.executable, [sys.executable, *sys.argv])
+    if bot.exit_code:
+        raise SystemExit(bot.exit_code)
+
 
 if __name__ == "__main__":
     main()
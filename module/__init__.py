@@ -13,4 +13,76 @@ Discord Bot 模組區
 
 在其他檔案中：
     from module import some_function
-"""
\ No newline at end of file
+"""
+from .cache_policy import CachePolicy, CacheSweeper, CacheUsage
+from .cluster import ClusterStatusWriter, ClusterSupervisor
+from .command_sync import CommandSyncManager
+from .counters import CounterBuffer
+from .dispatch_trace import DispatchTracer, SlowFinding
+from .error_reporter import ErrorReporter
+from .extension_index import ExtensionIndex
+from .extension_loader import ExtensionLoader, StartupReport
+from .gateway_resume import ResumeSnapshot, ResumeStore
+from .help_index import HelpEntry, HelpIndex, HelpListing, HelpPaginator
+from .hot_reload import HotReloader, ReloadReport
+from .jobs import JobQueue, JobRejected, JobSpec
+from .lazy_extensions import LazyExtensionFailed, LazyExtensionRegistry, LazyPrefixCommand
+from .log_policy import LogPolicy
+from .metrics import CommandKind, MetricsRegistry, MetricsServer
+from .outbound import OutboundScheduler, Priority
+from .rate_limiter import RateLimit, RateLimited, RateLimiter, RateLimitPolicy
+from .response_cache import ResponseCache
+from .runtime import Runtime, RuntimeMode
+from .sharding import ShardConfig
+from .startup_profiler import StartupProfiler
+from .storage import Storage, Transaction, WriteResult
+from .user_resolver import UserResolver
+
+__all__ = [
+    "CachePolicy",
+    "CacheSweeper",
+    "CacheUsage",
+    "ClusterStatusWriter",
+    "ClusterSupervisor",
+    "CommandKind",
+    "CommandSyncManager",
+    "CounterBuffer",
+    "DispatchTracer",
+    "ErrorReporter",
+    "ExtensionIndex",
+    "ExtensionLoader",
+    "HelpEntry",
+    "HelpIndex",
+    "HelpListing",
+    "HelpPaginator",
+    "HotReloader",
+    "JobQueue",
+    "JobRejected",
+    "JobSpec",
+    "LazyExtensionFailed",
+    "LazyExtensionRegistry",
+    "LazyPrefixCommand",
+    "LogPolicy",
+    "MetricsRegistry",
+    "MetricsServer",
+    "OutboundScheduler",
+    "Priority",
+    "RateLimit",
+    "RateLimitPolicy",
+    "RateLimited",
+    "RateLimiter",
+    "ReloadReport",
+    "ResponseCache",
+    "ResumeSnapshot",
+    "ResumeStore",
+    "Runtime",
+    "RuntimeMode",
+    "ShardConfig",
+    "SlowFinding",
+    "StartupProfiler",
+    "StartupReport",
+    "Storage",
+    "Transaction",
+    "UserResolver",
+    "WriteResult",
+]
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import itertools
+import os
+import sys
+import weakref
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any
+
+import discord
+from discord.http import HTTPClient
+from discord.state import ConnectionState
+from discord.user import BaseUser
+from loguru import logger
+
+from .env import env_flag, env_number
+
+MEMBER_CACHE_FLAGS = ("voice", "joined")
+MEMORY_SAMPLE_SIZE = 200
+
+# Objects owned by another cache category (or by nobody) end the size walk.
+_BOUNDARY_TYPES = (
+    ConnectionState,
+    HTTPClient,
+    discord.Client,
+    discord.Guild,
+    discord.abc.GuildChannel,
+    discord.abc.PrivateChannel,
+    discord.Thread,
+    discord.Member,
+    BaseUser,
+    discord.Role,
+    discord.Message,
+    discord.Emoji,
+    discord.GuildSticker,
+    asyncio.AbstractEventLoop,
+    enum.Enum,
+    type,
+    ModuleType,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodType,
+    weakref.ref,
+)
+_ATOMIC_TYPES = (str, bytes, int, float, complex, bool, type(None))
+_slot_names: dict[type, tuple[str, ...]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class CachePolicy:
+    """How much of the gateway state discord.py should keep in memory.
+
+    ``member_flags`` of ``None`` keeps discord.py's default, derived from the
+    intents; ``message_ttl`` of ``None`` keeps messages until ``max_messages``
+    pushes them out.
+    """
+
+    max_messages: int | None = 1000
+    message_ttl: float | None = None
+    member_flags: tuple[str, ...] | None = None
+    members_intent: bool = False
+    chunk_guilds: bool = False
+    user_ttl: float = 3600.0
+    user_max: int = 1000
+
+    @classmethod
+    def from_env(cls) -> CachePolicy:
+        max_messages = int(env_number("CACHE_MAX_MESSAGES", 1000, strict=True))
+        if max_messages < 0:
+            raise ValueError("CACHE_MAX_MESSAGES 不可小於 0")
+        message_ttl = env_number("CACHE_MESSAGE_TTL", 0, strict=True)
+
+        raw_flags = os.getenv("CACHE_MEMBER_FLAGS", "").strip().lower()
+        member_flags = None
+        if raw_flags == "none":
+            member_flags = ()
+        elif raw_flags:
+            member_flags = tuple(flag.strip() for flag in raw_flags.split(",") if flag.strip())
+            unknown = set(member_flags) - set(MEMBER_CACHE_FLAGS)
+            if unknown:
+                raise ValueError(
+                    f"CACHE_MEMBER_FLAGS 只能包含 {', '.join(MEMBER_CACHE_FLAGS)} 或 none"
+                )
+
+        members_intent = env_flag("CACHE_MEMBERS_INTENT")
+        chunk_guilds = env_flag("CACHE_CHUNK_GUILDS")
+        if not members_intent and (chunk_guilds or "joined" in (member_flags or ())):
+            raise ValueError(
+                "CACHE_CHUNK_GUILDS 與 CACHE_MEMBER_FLAGS=joined 需要開啟 CACHE_MEMBERS_INTENT"
+            )
+
+        user_max = int(env_number("CACHE_USER_MAX", 1000, strict=True))
+        if user_max < 1:
+            raise ValueError("CACHE_USER_MAX 必須大於 0")
+
+        return cls(
+            max_messages=max_messages or None,
+            message_ttl=message_ttl if message_ttl > 0 else None,
+            member_flags=member_flags,
+            members_intent=members_intent,
+            chunk_guilds=chunk_guilds,
+            user_ttl=env_number("CACHE_USER_TTL", 3600.0, strict=True),
+            user_max=user_max,
+        )
+
+    def member_cache_flags(self, intents: discord.Intents) -> discord.MemberCacheFlags:
+        if self.member_flags is None:
+            return discord.MemberCacheFlags.from_intents(intents)
+        return discord.MemberCacheFlags(
+            **{flag: flag in self.member_flags for flag in MEMBER_CACHE_FLAGS}
+        )
+
+    def describe(self) -> str:
+        messages = "停用" if self.max_messages is None else f"{self.max_messages} 則"
+        if self.max_messages is not None and self.message_ttl is not None:
+            messages += f"（{self.message_ttl:g} 秒過期）"
+        if self.member_flags is None:
+            members = "預設"
+        else:
+            members = ", ".join(self.member_flags) or "不快取"
+        return (
+            f"訊息快取 {messages}，成員快取 {members}，"
+            f"啟動時分塊載入成員 {'開啟' if self.chunk_guilds else '關閉'}，"
+            f"使用者快取上限 {self.user_max} 筆"
+        )
+
+
+def _slots(cls: type) -> tuple[str, ...]:
+    names = _slot_names.get(cls)
+    if names is None:
+        collected: list[str] = []
+        for klass in cls.__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            collected.extend((slots,) if isinstance(slots, str) else slots)
+        names = _slot_names[cls] = tuple(
+            name for name in dict.fromkeys(collected) if name not in ("__dict__", "__weakref__")
+        )
+    return names
+
+
+def deep_sizeof(root: object) -> int:
+    """Approximate bytes owned by ``root``, not following other cached entities."""
+    seen: set[int] = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if obj is not root and isinstance(obj, _BOUNDARY_TYPES):
+            continue
+
+        total += sys.getsizeof(obj)
+        if isinstance(obj, _ATOMIC_TYPES):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        else:
+            attributes = getattr(obj, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for name in _slots(type(obj)):
+                value = getattr(obj, name, None)
+                if value is not None:
+                    stack.append(value)
+    return total
+
+
+@dataclass(frozen=True, slots=True)
+class CacheUsage:
+    category: str
+    count: int
+    approximate_bytes: int
+
+
+def _estimate(category: str, count: int, items: Iterable[Any]) -> CacheUsage:
+    sample = list(itertools.islice(items, MEMORY_SAMPLE_SIZE))
+    if not sample:
+        return CacheUsage(category, count, 0)
+    average = sum(map(deep_sizeof, sample)) / len(sample)
+    return CacheUsage(category, count, round(average * count))
+
+
+def cache_usage(
+    client: discord.Client,
+    extra: dict[str, tuple[int, Iterable[Any]]] | None = None,
+) -> list[CacheUsage]:
+    """Estimate memory per cache category by sizing a sample and extrapolating."""
+    state = client._connection
+    guilds = list(state._guilds.values())
+    messages = state._messages or ()
+    categories: dict[str, tuple[int, Iterable[Any]]] = {
+        "guilds": (len(guilds), guilds),
+        "channels": (
+            sum(len(guild._channels) + len(guild._threads) for guild in guilds),
+            itertools.chain.from_iterable(
+                itertools.chain(guild._channels.values(), guild._threads.values())
+                for guild in guilds
+            ),
+        ),
+        "roles": (
+            sum(len(guild._roles) for guild in guilds),
+            itertools.chain.from_iterable(guild._roles.values() for guild in guilds),
+        ),
+        "members": (
+            sum(len(guild._members) for guild in guilds),
+            itertools.chain.from_iterable(guild._members.values() for guild in guilds),
+        ),
+        "users": (len(state._users), list(state._users.values())),
+        # Newest messages are the most representative of what stays cached.
+        "messages": (len(messages), reversed(messages)),
+        "private_channels": (
+            len(state._private_channels),
+            state._private_channels.values(),
+        ),
+        "emojis_stickers": (
+            len(state._emojis) + len(state._stickers),
+            itertools.chain(state._emojis.values(), state._stickers.values()),
+        ),
+    }
+    categories.update(extra or {})
+    return [
+        _estimate(category, count, items)
+        for category, (count, items) in categories.items()
+    ]
+
+
+class CacheSweeper:
+    """Drop cached messages older than the policy's TTL at a fixed interval.
+
+    discord.py appends to its message deque as messages arrive, so expired
+    messages are always at the left end and each sweep only touches them.
+    """
+
+    def __init__(self, client: discord.Client, ttl: float, interval: float = 60.0) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.interval = interval
+        self.expired = 0
+        self._task: asyncio.Task[None] | None = None
+
+    def sweep(self) -> int:
+        messages = self.client._connection._messages
+        if not messages:
+            return 0
+        cutoff = discord.utils.utcnow() - timedelta(seconds=self.ttl)
+        removed = 0
+        while messages and messages[0].created_at < cutoff:
+            messages.popleft()
+            removed += 1
+        self.expired += removed
+        return removed
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="cache-sweeper")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            removed = self.sweep()
+            if removed:
+                logger.debug(f"[快取] 已清除 {removed} 則過期訊息")
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import discord
+from loguru import logger
+
+EXIT_RESTART = 75
+EXIT_ROLLING_RESTART = 76
+READY_TIMEOUT = 300.0
+MAX_BACKOFF = 60.0
+STABLE_UPTIME = 120.0
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+
+
+def split_shards(shard_count: int, clusters: int) -> list[list[int]]:
+    """Split ``range(shard_count)`` into contiguous, evenly sized chunks."""
+    clusters = max(1, min(clusters, shard_count))
+    base, extra = divmod(shard_count, clusters)
+    chunks = []
+    start = 0
+    for index in range(clusters):
+        size = base + (1 if index < extra else 0)
+        chunks.append(list(range(start, start + size)))
+        start += size
+    return chunks
+
+
+def _write_json(path: Path, payload: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix(".tmp")
+    temporary_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    temporary_path.replace(path)
+
+
+def read_cluster_status(directory: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads((directory / "status.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+class ClusterStatusWriter:
+    """Periodically publish this worker's shard health for the supervisor."""
+
+    def __init__(self, bot: discord.AutoShardedClient, path: Path, interval: float = 10.0) -> None:
+        self.bot = bot
+        self.path = path
+        self.interval = interval
+        self._task: asyncio.Task[None] | None = None
+
+    def snapshot(self) -> dict[str, Any]:
+        guild_counts: dict[int, int] = {}
+        for guild in self.bot.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+        return {
+            "pid": os.getpid(),
+            "ready": self.bot.is_ready(),
+            "updated_at": time.time(),
+            "shards": {
+                str(shard_id): {
+                    "latency": None if math.isnan(shard.latency) else shard.latency,
+                    "guilds": guild_counts.get(shard_id, 0),
+                    "ratelimited": shard.is_ws_ratelimited(),
+                    "closed": shard.is_closed(),
+                }
+                for shard_id, shard in self.bot.shards.items()
+            },
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="cluster-status")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(_write_json, self.path, self.snapshot())
+            except OSError as error:
+                logger.warning(f"[叢集] 無法寫入狀態檔: {error}")
+            await asyncio.sleep(self.interval)
+
+
+@dataclass(slots=True)
+class Worker:
+    cluster_id: int
+    shard_ids: list[int]
+    process: asyncio.subprocess.Process | None = None
+    started_at: float = 0.0
+    restarts: int = 0
+    backoff: float = 1.0
+    stopping: bool = False
+    waiter: asyncio.Task[None] | None = field(default=None, repr=False)
+
+    @property
+    def shard_label(self) -> str:
+        if len(self.shard_ids) == 1:
+            return str(self.shard_ids[0])
+        return f"{self.shard_ids[0]}-{self.shard_ids[-1]}"
+
+
+class ClusterSupervisor:
+    """Run one ``main.py`` worker per shard range and restart them when they exit.
+
+    Workers exit with :data:`EXIT_RESTART` to be restarted on their own, or
+    :data:`EXIT_ROLLING_RESTART` to restart every cluster one at a time.
+    Any other non-zero exit is treated as a crash and restarted with
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        entry_point: Path,
+        shard_count: int,
+        clusters: int,
+        status_directory: Path,
+    ) -> None:
+        self.entry_point = entry_point
+        self.shard_count = shard_count
+        self.status_directory = status_directory
+        self.workers = [
+            Worker(cluster_id, shard_ids)
+            for cluster_id, shard_ids in enumerate(split_shards(shard_count, clusters))
+        ]
+        self._stopping = asyncio.Event()
+        self._rolling_lock = asyncio.Lock()
+        self._rolling_task: asyncio.Task[None] | None = None
+
+    def _status_path(self, worker: Worker) -> Path:
+        return self.status_directory / f"cluster-{worker.cluster_id}.json"
+
+    async def _spawn(self, worker: Worker) -> None:
+        self._status_path(worker).unlink(missing_ok=True)
+        environment = os.environ | {
+            "SHARD_MODE": "range",
+            "SHARD_COUNT": str(self.shard_count),
+            "SHARD_IDS": worker.shard_label,
+            "CLUSTER_ID": str(worker.cluster_id),
+            "CLUSTER_STATUS_FILE": str(self._status_path(worker)),
+            "CLUSTER_STATUS_DIR": str(self.status_directory),
+        }
+        worker.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(self.entry_point),
+            env=environment,
+        )
+        worker.started_at = time.monotonic()
+        worker.stopping = False
+        worker.waiter = asyncio.create_task(self._watch(worker))
+        logger.info(
+            f"[叢集] 啟動叢集 #{worker.cluster_id}（分片 {worker.shard_label}，"
+            f"PID {worker.process.pid}）"
+        )
+
+    async def _stop(self, worker: Worker) -> None:
+        process = worker.process
+        if process is None or process.returncode is not None:
+            return
+
+        worker.stopping = True
+        if sys.platform == "win32":
+            process.terminate()
+        else:
+            process.send_signal(signal.SIGINT)
+        try:
+            await asyncio.wait_for(process.wait(), timeout=30)
+        except TimeoutError:
+            logger.warning(f"[叢集] 叢集 #{worker.cluster_id} 未在時限內結束，強制終止")
+            process.kill()
+            await process.wait()
+
+    async def _wait_ready(self, worker: Worker) -> bool:
+        deadline = time.monotonic() + READY_TIMEOUT
+        while time.monotonic() < deadline and not self._stopping.is_set():
+            try:
+                status = json.loads(self._status_path(worker).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                status = {}
+            if status.get("ready"):
+                return True
+            await asyncio.sleep(2)
+        return False
+
+    async def _watch(self, worker: Worker) -> None:
+        assert worker.process is not None
+        return_code = await worker.process.wait()
+        if self._stopping.is_set() or worker.stopping:
+            return
+
+        if return_code == 0:
+            logger.info(f"[叢集] 叢集 #{worker.cluster_id} 已正常結束，不再重啟")
+            return
+
+        worker.restarts += 1
+        if return_code == EXIT_RESTART:
+            logger.info(f"[叢集] 叢集 #{worker.cluster_id} 要求重啟")
+            worker.backoff = 1.0
+            await self._spawn(worker)
+            return
+
+        if return_code == EXIT_ROLLING_RESTART:
+            logger.info(f"[叢集] 叢集 #{worker.cluster_id} 要求輪流重啟所有叢集")
+            worker.backoff = 1.0
+            if self._rolling_task is not None and not self._rolling_task.done():
+                logger.warning("[叢集] 已有輪流重啟進行中，只重啟此叢集")
+                await self._spawn(worker)
+            else:
+                self.start_rolling_restart(first=worker)
+            return
+
+        if time.monotonic() - worker.started_at > STABLE_UPTIME:
+            worker.backoff = 1.0
+        delay = worker.backoff
+        worker.backoff = min(worker.backoff * 2, MAX_BACKOFF)
+        logger.error(
+            f"[叢集] 叢集 #{worker.cluster_id} 異常結束（代碼 {return_code}），"
+            f"{delay:.0f} 秒後重啟"
+        )
+        await asyncio.sleep(delay)
+        if not self._stopping.is_set():
+            await self._spawn(worker)
+
+    def start_rolling_restart(self, *, first: Worker | None = None) -> None:
+        """Run :meth:`rolling_restart` in the background; :meth:`close` cancels it."""
+        self._rolling_task = asyncio.create_task(
+            self.rolling_restart(first=first),
+            name="cluster-rolling-restart",
+        )
+        self._rolling_task.add_done_callback(self._rolling_restart_done)
+
+    @staticmethod
+    def _rolling_restart_done(task: asyncio.Task[None]) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.opt(exception=task.exception()).error("[叢集] 輪流重啟失敗")
+
+    async def rolling_restart(self, *, first: Worker | None = None) -> None:
+        """Restart clusters one at a time, waiting for each to become ready."""
+        async with self._rolling_lock:
+            ordered = self.workers
+            if first is not None:
+                ordered = [first, *(worker for worker in self.workers if worker is not first)]
+
+            for worker in ordered:
+                if self._stopping.is_set():
+                    return
+                if worker is not first:
+                    await self._stop(worker)
+                await self._spawn(worker)
+                if not await self._wait_ready(worker):
+                    logger.error(f"[叢集] 叢集 #{worker.cluster_id} 未就緒，停止輪流重啟")
+                    return
+                logger.info(f"[叢集] 叢集 #{worker.cluster_id} 已就緒")
+
+    def aggregate(self) -> dict[str, Any]:
+        clusters = []
+        for worker in self.workers:
+            try:
+                status = json.loads(self._status_path(worker).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                status = {}
+            running = worker.process is not None and worker.process.returncode is None
+            clusters.append(
+                {
+                    "cluster_id": worker.cluster_id,
+                    "shard_ids": worker.shard_label,
+                    "pid": status.get("pid"),
+                    "running": running,
+                    "ready": running and bool(status.get("ready")),
+                    "restarts": worker.restarts,
+                    "shards": status.get("shards", {}),
+                }
+            )
+        return {"shard_count": self.shard_count, "updated_at": time.time(), "clusters": clusters}
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        if sys.platform != "win32":
+            for signal_number in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signal_number, self._stopping.set)
+
+        for worker in self.workers:
+            await self._spawn(worker)
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=10)
+                except TimeoutError:
+                    pass
+                await asyncio.to_thread(
+                    _write_json,
+                    self.status_directory / "status.json",
+                    self.aggregate(),
+                )
+                if all(
+                    worker.process is not None
+                    and worker.process.returncode == 0
+                    for worker in self.workers
+                ):
+                    logger.info("[叢集] 所有叢集皆已結束")
+                    return
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        self._stopping.set()
+        if self._rolling_task is not None:
+            self._rolling_task.cancel()
+            await asyncio.gather(self._rolling_task, return_exceptions=True)
+            self._rolling_task = None
+        logger.info("[叢集] 正在停止所有叢集")
+        await asyncio.gather(*(self._stop(worker) for worker in self.workers))
+
+
+async def recommended_shard_count(token: str) -> int | None:
+    """Ask Discord for the recommended shard count via ``GET /gateway/bot``."""
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                GATEWAY_BOT_URL,
+                headers={"Authorization": f"Bot {token}"},
+            ) as response:
+                if response.status != 200:
+                    logger.warning(f"[叢集] 無法取得建議分片數量（HTTP {response.status}）")
+                    return None
+                return int((await response.json())["shards"])
+    except (aiohttp.ClientError, KeyError, ValueError) as error:
+        logger.warning(f"[叢集] 無法取得建議分片數量: {error}")
+        return None
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import discord
+from discord import app_commands
+from loguru import logger
+
+GLOBAL_SCOPE = "global"
+
+
+@dataclass(frozen=True, slots=True)
+class ScopeChange:
+    scope: str
+    digest: str
+    previous_digest: str | None
+    added: tuple[str, ...] = ()
+    removed: tuple[str, ...] = ()
+    modified: tuple[str, ...] = ()
+
+    @property
+    def guild_id(self) -> int | None:
+        return None if self.scope == GLOBAL_SCOPE else int(self.scope)
+
+    def describe(self) -> str:
+        parts = [
+            f"{label} {', '.join(names)}"
+            for label, names in (
+                ("新增", self.added),
+                ("移除", self.removed),
+                ("變更", self.modified),
+            )
+            if names
+        ]
+        return f"{self.scope}: {'; '.join(parts) or '內容變更'}"
+
+
+@dataclass(slots=True)
+class SyncResult:
+    changes: list[ScopeChange] = field(default_factory=list)
+    synced: dict[str, int] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    dry_run: bool = False
+
+
+class CommandSyncManager:
+    """Sync application commands only for scopes whose canonical payload changed."""
+
+    def __init__(
+        self,
+        tree: app_commands.CommandTree,
+        state_path: Path,
+        *,
+        extra_payloads: Callable[[], dict[str, dict[str, dict[str, Any]]]] | None = None,
+    ) -> None:
+        self.tree = tree
+        self.state_path = state_path
+        self.force_marker = state_path.with_suffix(".force")
+        # Payloads registered outside the tree (e.g. lazy extensions), keyed by scope.
+        self.extra_payloads = extra_payloads or dict
+
+    def request_force(self) -> None:
+        """Force a full sync on the next boot, even from another process."""
+        self.force_marker.parent.mkdir(parents=True, exist_ok=True)
+        self.force_marker.touch()
+
+    def scopes(self) -> list[str]:
+        """Return the global scope followed by every guild that owns commands."""
+        guild_ids = set(self.tree._guild_commands)
+        guild_ids.update(
+            guild_id
+            for (_, guild_id, _) in self.tree._context_menus
+            if guild_id is not None
+        )
+        guild_ids.update(int(scope) for scope in self.extra_payloads() if scope != GLOBAL_SCOPE)
+        return [GLOBAL_SCOPE, *(str(guild_id) for guild_id in sorted(guild_ids))]
+
+    def payload(self, scope: str) -> dict[str, dict[str, Any]]:
+        """Serialize one scope into a name-keyed mapping of command payloads."""
+        guild = None if scope == GLOBAL_SCOPE else discord.Object(id=int(scope))
+        payload = dict(self.extra_payloads().get(scope, {}))
+        payload.update(
+            (f"{command_payload.get('type', 1)}:{command_payload['name']}", command_payload)
+            for command_payload in (
+                command.to_dict(self.tree)
+                for command in self.tree._get_all_commands(guild=guild)
+            )
+        )
+        return payload
+
+    @staticmethod
+    def digest(payload: object) -> str:
+        canonical = json.dumps(
+            payload,
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def load_state(self, application_id: int | None) -> dict[str, dict[str, Any]]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logger.warning(f"[指令同步] 無法讀取同步狀態，將視為全部變更: {error}")
+            return {}
+
+        if state.get("application_id") != application_id:
+            return {}
+        return state.get("scopes", {})
+
+    def save_state(
+        self,
+        application_id: int | None,
+        scopes: dict[str, dict[str, Any]],
+    ) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.state_path.with_suffix(".tmp")
+        temporary_path.write_text(
+            json.dumps(
+                {"application_id": application_id, "scopes": scopes},
+                ensure_ascii=False,
+                indent=4,
+                sort_keys=True,
+            ),
+            encoding="utf-8",
+        )
+        temporary_path.replace(self.state_path)
+
+    def diff(
+        self,
+        application_id: int | None,
+        *,
+        force: bool = False,
+        previous_state: dict[str, dict[str, Any]] | None = None,
+    ) -> tuple[list[ScopeChange], dict[str, dict[str, Any]]]:
+        """Compare the live tree against the stored digests.
+
+        Returns the changed scopes and the complete state to persist after a
+        successful sync. Scopes that disappeared from the tree are reported
+        with an empty payload so their commands get cleared remotely.
+        ``previous_state`` defaults to :meth:`load_state`.
+        """
+        if previous_state is None:
+            previous_state = self.load_state(application_id)
+        current_state: dict[str, dict[str, Any]] = {}
+        changes: list[ScopeChange] = []
+
+        scopes = self.scopes()
+        scopes.extend(scope for scope in sorted(previous_state) if scope not in scopes)
+
+        for scope in scopes:
+            payload = self.payload(scope)
+            commands_digest = {
+                name: self.digest(command_payload)
+                for name, command_payload in payload.items()
+            }
+            scope_digest = self.digest(commands_digest)
+            previous = previous_state.get(scope, {})
+            if payload or previous:
+                current_state[scope] = {
+                    "digest": scope_digest,
+                    "commands": commands_digest,
+                }
+
+            if not force and previous.get("digest") == scope_digest:
+                continue
+            if not payload and not previous:
+                continue
+
+            previous_commands: dict[str, str] = previous.get("commands", {})
+            changes.append(
+                ScopeChange(
+                    scope=scope,
+                    digest=scope_digest,
+                    previous_digest=previous.get("digest"),
+                    added=tuple(sorted(set(commands_digest) - set(previous_commands))),
+                    removed=tuple(sorted(set(previous_commands) - set(commands_digest))),
+                    modified=tuple(
+                        sorted(
+                            name
+                            for name, command_digest in commands_digest.items()
+                            if name in previous_commands
+                            and previous_commands[name] != command_digest
+                        )
+                    ),
+                )
+            )
+
+        current_state = {
+            scope: value for scope, value in current_state.items() if value["commands"]
+        }
+        return changes, current_state
+
+    async def _sync_scope(self, application_id: int | None, change: ScopeChange) -> int:
+        if change.scope not in self.extra_payloads():
+            guild = None if change.guild_id is None else discord.Object(id=change.guild_id)
+            return len(await self.tree.sync(guild=guild))
+
+        # tree.sync() only knows the tree's own commands; upload the merged
+        # payload so commands registered elsewhere are not deleted remotely.
+        payload = list(self.payload(change.scope).values())
+        http = self.tree.client.http
+        if change.guild_id is None:
+            synced = await http.bulk_upsert_global_commands(application_id, payload=payload)
+        else:
+            synced = await http.bulk_upsert_guild_commands(
+                application_id,
+                change.guild_id,
+                payload=payload,
+            )
+        return len(synced)
+
+    async def sync(
+        self,
+        application_id: int | None,
+        *,
+        force: bool = False,
+        dry_run: bool = False,
+    ) -> SyncResult:
+        force_requested = self.force_marker.exists()
+        force = force or force_requested
+        previous_state = self.load_state(application_id)
+        changes, current_state = self.diff(
+            application_id,
+            force=force,
+            previous_state=previous_state,
+        )
+        result = SyncResult(changes=changes, dry_run=dry_run)
+        changed_scopes = {change.scope for change in changes}
+        result.skipped = [scope for scope in current_state if scope not in changed_scopes]
+
+        if dry_run:
+            for change in changes:
+                logger.info(f"[指令同步] (dry-run) {change.describe()}")
+            return result
+
+        persisted_state = {
+            scope: value
+            for scope, value in previous_state.items()
+            if scope not in changed_scopes
+        }
+        try:
+            for change in changes:
+                result.synced[change.scope] = await self._sync_scope(application_id, change)
+                if change.scope in current_state:
+                    persisted_state[change.scope] = current_state[change.scope]
+                logger.info(f"[指令同步] {change.describe()}")
+        finally:
+            self.save_state(application_id, persisted_state)
+        if force_requested:
+            self.force_marker.unlink(missing_ok=True)
+        return result
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from loguru import logger
+
+from .storage import Storage
+
+COUNTER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT NOT NULL,
+    subject INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (name, subject)
+) WITHOUT ROWID;
+"""
+
+UPSERT_COUNTER = (
+    "INSERT INTO counters (name, subject, value) VALUES (?, ?, ?) "
+    "ON CONFLICT (name, subject) DO UPDATE SET value = value + excluded.value"
+)
+
+
+class CounterBuffer:
+    """Write-behind counters keyed by a Discord ID.
+
+    :meth:`increment` only touches an in-memory dict, so it is cheap enough to
+    call on every command. Accumulated deltas are written to ``bot.storage``
+    as a single ``executemany`` every ``interval`` seconds and once more on
+    :meth:`close`. A failed flush puts its deltas back so nothing is lost.
+    """
+
+    def __init__(self, storage: Storage, *, interval: float = 10.0) -> None:
+        self.storage = storage
+        self.interval = interval
+        self.flushes = 0
+        self.flush_failures = 0
+        self.flushed_rows = 0
+        self.last_flush_seconds = 0.0
+        self._pending: dict[str, dict[int, int]] = {}
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return sum(len(deltas) for deltas in self._pending.values())
+
+    def increment(self, name: str, subject: int, amount: int = 1) -> None:
+        deltas = self._pending.get(name)
+        if deltas is None:
+            deltas = self._pending[name] = {}
+        deltas[subject] = deltas.get(subject, 0) + amount
+
+    def _restore(self, pending: dict[str, dict[int, int]]) -> None:
+        for name, deltas in pending.items():
+            for subject, amount in deltas.items():
+                self.increment(name, subject, amount)
+
+    async def _write_pending(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        rows = [
+            (name, subject, amount)
+            for name, deltas in pending.items()
+            for subject, amount in deltas.items()
+        ]
+        started = time.perf_counter()
+        try:
+            await self.storage.executemany(UPSERT_COUNTER, rows)
+        except Exception as error:
+            self._restore(pending)
+            self.flush_failures += 1
+            logger.warning(f"[計數器] 寫入 {len(rows)} 筆失敗，保留至下次寫入: {error}")
+            return 0
+        self.last_flush_seconds = time.perf_counter() - started
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+        return len(rows)
+
+    async def flush(self) -> int:
+        """Write every pending delta and return the number of rows written."""
+        async with self._lock:
+            return await self._write_pending()
+
+    async def get(self, name: str, subject: int) -> int:
+        # Wait out an in-flight flush so its deltas are not missed by both sides.
+        async with self._lock:
+            row = await self.storage.fetchone(
+                "SELECT value FROM counters WHERE name = ? AND subject = ?",
+                (name, subject),
+            )
+            stored = 0 if row is None else row[0]
+            return stored + self._pending.get(name, {}).get(subject, 0)
+
+    async def top(self, name: str, limit: int = 10) -> list[tuple[int, int]]:
+        await self.flush()
+        return await self.storage.fetchall(
+            "SELECT subject, value FROM counters WHERE name = ? ORDER BY value DESC LIMIT ?",
+            (name, limit),
+        )
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.storage.executescript(COUNTER_SCHEMA)
+            self._task = asyncio.create_task(self._run(), name="counter-flush")
+
+    async def close(self) -> None:
+        """Stop the flush loop and write whatever is still pending."""
+        if self._task is None:
+            return
+        # Holding the lock means the loop is asleep, not halfway through a write.
+        async with self._lock:
+            self._task.cancel()
+            self._task = None
+            await self._write_pending()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
@@ -0,0 +1,328 @@
+"""discord.py internals that have no public API.
+
+Hot reload registers an extension module it imported itself. Gateway resume
+serializes the cache back into gateway payloads, replays them as a
+synthetic READY and launches shards on a websocket it opened itself. Every
+private attribute, private method and undocumented class those features
+touch is used from this module only; a missing one raises ``RuntimeError``
+naming the discord.py version this code was checked against, instead of
+an ``AttributeError`` deep inside a reload or a restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, ParamSpec, TypeVar
+
+import discord
+import yarl
+from discord.ext import commands
+from discord.gateway import DiscordWebSocket
+from discord.shard import Shard
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Keep in sync with the pin in requirements.txt.
+TESTED_DISCORD_VERSION = "2.7.1"
+
+
+def version_mismatch() -> str | None:
+    """Describe the mismatch when the installed discord.py is not the tested one."""
+    if discord.__version__ == TESTED_DISCORD_VERSION:
+        return None
+    return (
+        f"已安裝 discord.py {discord.__version__}，"
+        f"熱重載與工作階段恢復僅在 {TESTED_DISCORD_VERSION} 驗證過"
+    )
+
+
+def _unsupported(attribute: str) -> RuntimeError:
+    return RuntimeError(
+        f"discord.py {discord.__version__} 已沒有 {attribute}，"
+        f"此功能僅在 discord.py {TESTED_DISCORD_VERSION} 驗證過"
+    )
+
+
+def _private(obj: object, attribute: str) -> Any:
+    try:
+        return getattr(obj, attribute)
+    except AttributeError as error:
+        raise _unsupported(attribute) from error
+
+
+def _reads_internals(func: Callable[P, T]) -> Callable[P, T]:
+    """Report a private field that disappeared like :func:`_private` does."""
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        try:
+            return func(*args, **kwargs)
+        except AttributeError as error:
+            raise _unsupported(error.name or str(error)) from error
+
+    return wrapper
+
+
+def extension_registry(bot: commands.Bot) -> dict[str, ModuleType]:
+    """Return the mutable mapping behind the read-only ``bot.extensions``."""
+    return _private(bot, "_BotBase__extensions")
+
+
+@dataclass(frozen=True, slots=True)
+class ExtensionInternals:
+    """The private ``BotBase`` pieces a hot reload needs, resolved together."""
+
+    extensions: dict[str, ModuleType]
+    remove_module_references: Callable[[str], Awaitable[None]]
+    call_module_finalizers: Callable[[ModuleType, str], Awaitable[None]]
+
+
+def extension_internals(bot: commands.Bot) -> ExtensionInternals:
+    """Resolve everything a reload touches before it starts tearing anything down."""
+    return ExtensionInternals(
+        extensions=extension_registry(bot),
+        remove_module_references=_private(bot, "_remove_module_references"),
+        call_module_finalizers=_private(bot, "_call_module_finalizers"),
+    )
+
+
+def shard_registry(client: discord.AutoShardedClient) -> dict[int, Shard]:
+    """Return the live ``Shard`` objects; ``client.shards`` only exposes ``ShardInfo``."""
+    return _private(client, "_AutoShardedClient__shards")
+
+
+def shard_event_queue(client: discord.AutoShardedClient) -> asyncio.Queue[Any]:
+    """Return the queue a ``Shard`` reports reconnects and closes to."""
+    return _private(client, "_AutoShardedClient__queue")
+
+
+def inject_ready(client: discord.Client, payload: dict[str, Any]) -> None:
+    """Run a synthetic READY through the connection state's parser."""
+    _private(client, "_connection").parsers["READY"](payload)
+
+
+async def connect_resumed(
+    client: discord.AutoShardedClient,
+    shard_id: int,
+    *,
+    gateway: str,
+    session_id: str,
+    sequence: int,
+    initial: bool = False,
+) -> DiscordWebSocket:
+    """Open a shard websocket that sends RESUME instead of IDENTIFY."""
+    return await DiscordWebSocket.from_client(
+        client,
+        initial=initial,
+        gateway=yarl.URL(gateway),
+        shard_id=shard_id,
+        session=session_id,
+        sequence=sequence,
+        resume=True,
+    )
+
+
+def start_shard(
+    client: discord.AutoShardedClient,
+    shard_id: int,
+    ws: DiscordWebSocket,
+    events: asyncio.Queue[Any],
+) -> Shard:
+    """Register and start a ``Shard`` around an already connected websocket."""
+    shard = Shard(ws, client, events.put_nowait)
+    shard_registry(client)[shard_id] = shard
+    shard.launch()
+    return shard
+
+
+def stop_shard_reader(shard: Shard) -> None:
+    """Stop a shard's read loop without closing its websocket."""
+    _private(shard, "_cancel_task")()
+
+
+@_reads_internals
+def user_payload(user: discord.abc.User) -> dict[str, Any]:
+    return {
+        "id": str(user.id),
+        "username": user.name,
+        "discriminator": user.discriminator,
+        "global_name": user.global_name,
+        "avatar": user._avatar,
+        "bot": user.bot,
+        "system": user.system,
+        "public_flags": user._public_flags,
+    }
+
+
+@_reads_internals
+def role_payload(role: discord.Role) -> dict[str, Any]:
+    payload: dict[str, Any] = {
+        "id": str(role.id),
+        "name": role.name,
+        "permissions": str(role._permissions),
+        "position": role.position,
+        "colors": {
+            "primary_color": role._colour,
+            "secondary_color": role._secondary_colour,
+            "tertiary_color": role._tertiary_colour,
+        },
+        "hoist": role.hoist,
+        "icon": role._icon,
+        "unicode_emoji": role.unicode_emoji,
+        "managed": role.managed,
+        "mentionable": role.mentionable,
+        "flags": role._flags,
+    }
+    if role.tags is not None:
+        tags: dict[str, Any] = {}
+        if role.tags.bot_id is not None:
+            tags["bot_id"] = str(role.tags.bot_id)
+        if role.tags.integration_id is not None:
+            tags["integration_id"] = str(role.tags.integration_id)
+        if role.tags.is_premium_subscriber():
+            tags["premium_subscriber"] = None
+        payload["tags"] = tags
+    return payload
+
+
+@_reads_internals
+def channel_payload(channel: discord.abc.GuildChannel) -> dict[str, Any] | None:
+    """Rebuild a channel payload from the cache, or ``None`` for unsupported types."""
+    if not isinstance(
+        channel,
+        (
+            discord.TextChannel,
+            discord.VoiceChannel,
+            discord.StageChannel,
+            discord.CategoryChannel,
+            discord.ForumChannel,
+        ),
+    ):
+        return None
+
+    payload: dict[str, Any] = {
+        "id": str(channel.id),
+        "type": channel.type.value,
+        "name": channel.name,
+        "position": channel.position,
+        "parent_id": None if channel.category_id is None else str(channel.category_id),
+        "permission_overwrites": [overwrite._asdict() for overwrite in channel._overwrites],
+        "nsfw": channel.nsfw,
+    }
+    if isinstance(channel, (discord.TextChannel, discord.ForumChannel)):
+        payload |= {
+            "topic": channel.topic,
+            "rate_limit_per_user": channel.slowmode_delay,
+            "default_auto_archive_duration": channel.default_auto_archive_duration,
+            "default_thread_rate_limit_per_user": channel.default_thread_slowmode_delay,
+        }
+    if isinstance(channel, discord.TextChannel):
+        payload["last_message_id"] = channel.last_message_id
+    if isinstance(channel, discord.ForumChannel):
+        payload |= {
+            "flags": channel._flags,
+            "available_tags": [tag.to_dict() for tag in channel.available_tags],
+            "default_forum_layout": channel.default_layout.value,
+            "default_sort_order": (
+                None if channel.default_sort_order is None else channel.default_sort_order.value
+            ),
+        }
+    if isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+        payload |= {
+            "bitrate": channel.bitrate,
+            "user_limit": channel.user_limit,
+            "rtc_region": channel.rtc_region,
+            "video_quality_mode": channel.video_quality_mode.value,
+            "rate_limit_per_user": channel.slowmode_delay,
+        }
+    if isinstance(channel, discord.StageChannel):
+        payload["topic"] = channel.topic
+    return payload
+
+
+@_reads_internals
+def member_payload(member: discord.Member) -> dict[str, Any]:
+    return {
+        "user": user_payload(member._user),
+        "roles": [str(role_id) for role_id in member._roles],
+        "joined_at": None if member.joined_at is None else member.joined_at.isoformat(),
+        "premium_since": (
+            None if member.premium_since is None else member.premium_since.isoformat()
+        ),
+        "nick": member.nick,
+        "pending": member.pending,
+        "avatar": member._avatar,
+        "banner": member._banner,
+        "flags": member._flags,
+        "communication_disabled_until": (
+            None if member.timed_out_until is None else member.timed_out_until.isoformat()
+        ),
+    }
+
+
+@_reads_internals
+def guild_payload(guild: discord.Guild) -> dict[str, Any]:
+    """Serialize the cached parts of a guild into a GUILD_CREATE-shaped payload.
+
+    Threads, emojis, stickers, voice states and presences are left out; they
+    are either refetched lazily or resent by the gateway.
+    """
+    return {
+        "id": str(guild.id),
+        "name": guild.name,
+        "icon": None if guild.icon is None else guild.icon.key,
+        "banner": None if guild.banner is None else guild.banner.key,
+        "splash": None if guild.splash is None else guild.splash.key,
+        "discovery_splash": (
+            None if guild.discovery_splash is None else guild.discovery_splash.key
+        ),
+        "description": guild.description,
+        "owner_id": None if guild.owner_id is None else str(guild.owner_id),
+        "member_count": guild._member_count,
+        "large": guild._large,
+        "features": list(guild.features),
+        "afk_timeout": guild.afk_timeout,
+        "afk_channel_id": None if guild._afk_channel_id is None else str(guild._afk_channel_id),
+        "system_channel_id": (
+            None if guild._system_channel_id is None else str(guild._system_channel_id)
+        ),
+        "system_channel_flags": guild._system_channel_flags,
+        "rules_channel_id": (
+            None if guild._rules_channel_id is None else str(guild._rules_channel_id)
+        ),
+        "public_updates_channel_id": (
+            None
+            if guild._public_updates_channel_id is None
+            else str(guild._public_updates_channel_id)
+        ),
+        "verification_level": guild.verification_level.value,
+        "default_message_notifications": guild.default_notifications.value,
+        "explicit_content_filter": guild.explicit_content_filter.value,
+        "mfa_level": guild.mfa_level.value,
+        "nsfw_level": guild.nsfw_level.value,
+        "premium_tier": guild.premium_tier,
+        "premium_subscription_count": guild.premium_subscription_count,
+        "preferred_locale": str(guild.preferred_locale),
+        "vanity_url_code": guild.vanity_url_code,
+        "roles": [role_payload(role) for role in guild.roles],
+        "channels": [
+            payload
+            for payload in map(channel_payload, guild.channels)
+            if payload is not None
+        ],
+        "members": [member_payload(member) for member in guild.members],
+        "threads": [],
+        "emojis": [],
+        "stickers": [],
+        "voice_states": [],
+        "presences": [],
+        "stage_instances": [],
+        "guild_scheduled_events": [],
+        "soundboard_sounds": [],
+        "unavailable": False,
+    }
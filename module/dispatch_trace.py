@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import types
+from collections import deque
+from collections.abc import Coroutine
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from loguru import logger
+
+FindingKind = Literal["handler", "stall"]
+
+
+@dataclass(slots=True)
+class HandlerStats:
+    calls: int = 0
+    held: float = 0.0
+    longest: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class SlowFinding:
+    kind: FindingKind
+    name: str
+    seconds: float
+    at: datetime
+    stack: str = ""
+
+
+@dataclass(slots=True)
+class _Frame:
+    nested: float = 0.0
+
+
+@dataclass(slots=True)
+class _Stall:
+    started: float
+    stack: str = field(repr=False)
+
+
+_current_frame: ContextVar[_Frame | None] = ContextVar("dispatch_trace_frame", default=None)
+
+
+class DispatchTracer:
+    """Measure how long each event handler and command holds the event loop.
+
+    :meth:`run` drives a coroutine step by step and times every ``send``,
+    which is exactly the time the loop spent inside that handler between two
+    ``await`` points. Time spent in a traced coroutine nested inside another
+    (a command inside ``on_message``) is charged to the inner one only.
+
+    A watchdog thread complements this: when the loop has not ticked for
+    ``threshold`` seconds it captures the loop thread's stack via
+    ``sys._current_frames`` while the blocking call is still running.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.25,
+        capacity: int = 50,
+        max_stack_frames: int = 12,
+    ) -> None:
+        self.threshold = threshold
+        self.max_stack_frames = max_stack_frames
+        self.findings: deque[SlowFinding] = deque(maxlen=capacity)
+        self.stats: dict[str, HandlerStats] = {}
+        self.flagged = 0
+        self.loop_lag = 0.0
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._stall: _Stall | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+        self._heartbeat: asyncio.Task[None] | None = None
+
+    def _flag(self, finding: SlowFinding) -> None:
+        self.findings.append(finding)
+        self.flagged += 1
+        logger.warning(
+            f"[事件追蹤] {finding.name} 佔用事件迴圈 {finding.seconds * 1000:.0f}ms"
+        )
+
+    def record(self, name: str, steps: list[float]) -> None:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = HandlerStats()
+        longest = max(steps, default=0.0)
+        stats.calls += 1
+        stats.held += sum(steps)
+        stats.longest = max(stats.longest, longest)
+        if longest >= self.threshold:
+            self._flag(SlowFinding("handler", name, longest, datetime.now(UTC)))
+
+    def slowest(self, limit: int = 10) -> list[tuple[str, HandlerStats]]:
+        return sorted(self.stats.items(), key=lambda item: item[1].longest, reverse=True)[:limit]
+
+    @types.coroutine
+    def _drive(self, name: str, coro: Coroutine[Any, Any, Any]):
+        parent = _current_frame.get()
+        frame = _Frame()
+        steps: list[float] = []
+        value: Any = None
+        error: BaseException | None = None
+        try:
+            while True:
+                token = _current_frame.set(frame)
+                nested_before = frame.nested
+                started = time.perf_counter()
+                try:
+                    if error is None:
+                        yielded = coro.send(value)
+                    else:
+                        yielded = coro.throw(error)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    elapsed = time.perf_counter() - started
+                    _current_frame.reset(token)
+                    if parent is not None:
+                        parent.nested += elapsed
+                    steps.append(elapsed - (frame.nested - nested_before))
+                try:
+                    value, error = (yield yielded), None
+                except BaseException as thrown:
+                    value, error = None, thrown
+        finally:
+            coro.close()
+            self.record(name, steps)
+
+    async def run(self, name: str, coro: Coroutine[Any, Any, Any]) -> Any:
+        return await self._drive(name, coro)
+
+    # Loop watchdog ----------------------------------------------------------
+
+    def start(self, interval: float = 0.05) -> None:
+        if self._watchdog is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._beat(interval), name="dispatch-heartbeat")
+        self._watchdog = threading.Thread(
+            target=self._watch,
+            args=(interval,),
+            name="dispatch-watchdog",
+            daemon=True,
+        )
+        self._watchdog.start()
+
+    async def close(self) -> None:
+        if self._watchdog is None:
+            return
+        self._stop.set()
+        self._heartbeat.cancel()
+        self._heartbeat = None
+        await asyncio.to_thread(self._watchdog.join)
+        self._watchdog = None
+
+    async def _beat(self, interval: float) -> None:
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            self.loop_lag = max(0.0, now - expected)
+            self._last_tick = now
+            stall = self._stall
+            if stall is not None:
+                self._stall = None
+                self._flag(
+                    SlowFinding(
+                        "stall",
+                        _blocking_location(stall.stack),
+                        now - stall.started,
+                        datetime.now(UTC),
+                        stall.stack,
+                    )
+                )
+
+    def _capture_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame)[-self.max_stack_frames:])
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval / 2):
+            last_tick = self._last_tick
+            if self._stall is not None or time.monotonic() - last_tick < self.threshold + interval:
+                continue
+            # The loop has not ticked for longer than the threshold; the
+            # blocking call is still on the loop thread's stack right now.
+            self._stall = _Stall(last_tick + interval, self._capture_stack())
+
+
+def _blocking_location(stack: str) -> str:
+    """Summarise a captured stack as the innermost ``file:line in function``."""
+    lines = [line.strip() for line in stack.splitlines() if line.strip().startswith("File ")]
+    for line in reversed(lines):
+        if "/asyncio/" not in line and __file__ not in line:
+            return line.removeprefix("File ")
+    return lines[-1].removeprefix("File ") if lines else "未知位置"
@@ -0,0 +1,29 @@
+"""Environment variable parsing shared by ``main.py``, ``cluster.py`` and the config classes."""
+
+from __future__ import annotations
+
+import os
+
+from loguru import logger
+
+
+def env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in ("true", "1", "yes")
+
+
+def env_number(name: str, default: float, *, strict: bool = False) -> float:
+    """Read a number; an invalid value falls back to ``default`` unless ``strict``.
+
+    Strict callers get a ``ValueError`` instead, for settings where guessing
+    would be worse than refusing to start.
+    """
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as error:
+        if strict:
+            raise ValueError(f"{name} 不是有效的數字") from error
+        logger.warning(f"[初始化] {name} 不是有效的數字，使用預設值 {default}")
+        return default
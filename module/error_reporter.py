@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import traceback
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+import discord
+from loguru import logger
+
+EMBED_FIELD_LIMIT = 1024
+
+
+def fingerprint(error: BaseException) -> str:
+    """Identify an error by exception type plus the frame that raised it."""
+    error_type = f"{type(error).__module__}.{type(error).__qualname__}"
+    frames = traceback.extract_tb(error.__traceback__)
+    if not frames:
+        return error_type
+
+    frame = frames[-1]
+    return f"{error_type}@{frame.filename}:{frame.lineno}:{frame.name}"
+
+
+@dataclass(slots=True)
+class ErrorGroup:
+    embed: discord.Embed
+    first_seen: datetime
+    last_seen: datetime
+    count: int = 1
+    channels: list[str] = field(default_factory=list)
+
+
+class ErrorReporter:
+    """Coalesce maintainer error reports into one summary per fingerprint and window.
+
+    Reports go through a bounded queue; when it is full new reports are
+    counted as dropped instead of blocking the caller. A flush that has
+    started always runs to completion, even when :meth:`close` stops the
+    worker in the middle of it.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[discord.Embed], Awaitable[None]],
+        *,
+        window: float = 10.0,
+        max_queue: int = 1000,
+        sample_channels: int = 3,
+    ) -> None:
+        if max_queue < 1:
+            raise ValueError("錯誤回報佇列上限必須大於 0")
+        self.send = send
+        self.window = window
+        self.sample_channels = sample_channels
+        self.dropped = 0
+        self.reported = 0
+        self._dropped_since_flush = 0
+        self._queue: asyncio.Queue[tuple[str, discord.Embed, str, datetime]] = asyncio.Queue(
+            maxsize=max_queue
+        )
+        self._groups: dict[str, ErrorGroup] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._flushing: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="error-reporter")
+
+    def report(self, error: BaseException, embed: discord.Embed, channel: str) -> bool:
+        """Queue one error report; return ``False`` if it was dropped."""
+        try:
+            self._queue.put_nowait((fingerprint(error), embed, channel, datetime.now(UTC)))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._dropped_since_flush += 1
+            return False
+        self.reported += 1
+        return True
+
+    async def close(self) -> None:
+        """Stop the worker and send whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+            self._flushing = None
+
+        while True:
+            try:
+                self._add(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        await self._flush()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._add(await self._queue.get())
+            deadline = loop.time() + self.window
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    self._add(await asyncio.wait_for(self._queue.get(), remaining))
+                except TimeoutError:
+                    break
+            # Shielded so that close() can wait for this flush instead of
+            # cancelling it after the groups have already been swapped out.
+            self._flushing = asyncio.create_task(self._flush())
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    def _add(self, item: tuple[str, discord.Embed, str, datetime]) -> None:
+        key, embed, channel, occurred_at = item
+        group = self._groups.get(key)
+        if group is None:
+            self._groups[key] = ErrorGroup(embed, occurred_at, occurred_at, channels=[channel])
+            return
+
+        group.count += 1
+        group.last_seen = occurred_at
+        if channel not in group.channels and len(group.channels) < self.sample_channels:
+            group.channels.append(channel)
+
+    async def _flush(self) -> None:
+        groups, self._groups = self._groups, {}
+        dropped, self._dropped_since_flush = self._dropped_since_flush, 0
+        for group in groups.values():
+            try:
+                await self.send(self._summary_embed(group, dropped))
+            except Exception as error:
+                logger.opt(exception=error).warning("[錯誤回報] 彙整回報傳送失敗")
+            dropped = 0
+
+        if dropped:
+            logger.warning(f"[錯誤回報] 佇列已滿，丟棄 {dropped} 筆錯誤回報")
+
+    @staticmethod
+    def _summary_embed(group: ErrorGroup, dropped: int) -> discord.Embed:
+        if group.count == 1 and not dropped:
+            return group.embed
+
+        embed = group.embed.copy()
+        embed.add_field(name="發生次數", value=str(group.count), inline=True)
+        embed.add_field(
+            name="首次 / 最後發生",
+            value=(
+                f"<t:{int(group.first_seen.timestamp())}:T> / "
+                f"<t:{int(group.last_seen.timestamp())}:T>"
+            ),
+            inline=True,
+        )
+        embed.add_field(
+            name="頻道樣本",
+            value="\n".join(group.channels)[:EMBED_FIELD_LIMIT] or "（無）",
+            inline=False,
+        )
+        if dropped:
+            embed.add_field(name="佇列已滿而丟棄", value=str(dropped), inline=True)
+        return embed
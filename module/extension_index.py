@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+SEARCH_CACHE_SIZE = 512
+
+
+class ExtensionIndex:
+    """Cached allowlist of Cog modules, rebuilt when the directory mtime changes.
+
+    The directory is stat'ed at most once per ``poll_interval`` seconds, so
+    autocomplete keystrokes and status embeds never glob the filesystem.
+    """
+
+    def __init__(self, directory: Path, package: str, *, poll_interval: float = 1.0) -> None:
+        self.directory = directory
+        self.package = package
+        self.poll_interval = poll_interval
+        self._mtime_ns: int | None = None
+        self._checked_at = float("-inf")
+        self._names: tuple[str, ...] = ()
+        self._allowlist: frozenset[str] = frozenset()
+        self._folded_keys: list[str] = []
+        self._folded_names: list[str] = []
+        self._search_cache: dict[tuple[str, frozenset[str], int], tuple[str, ...]] = {}
+
+    def invalidate(self) -> None:
+        self._mtime_ns = None
+        self._checked_at = float("-inf")
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.poll_interval:
+            return
+        self._checked_at = now
+
+        try:
+            mtime_ns = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = -1
+        if mtime_ns == self._mtime_ns:
+            return
+
+        self._mtime_ns = mtime_ns
+        self._names = tuple(
+            path.stem
+            for path in sorted(
+                self.directory.glob("*.py"),
+                key=lambda item: item.name.casefold(),
+            )
+            if path.stem != "__init__" and path.stem.isidentifier()
+        )
+        self._allowlist = frozenset(self._names)
+        folded = sorted((name.casefold(), name) for name in self._names)
+        self._folded_keys = [key for key, _ in folded]
+        self._folded_names = [name for _, name in folded]
+        self._search_cache.clear()
+
+    def names(self) -> tuple[str, ...]:
+        """Return loadable top-level Cog module names in deterministic order."""
+        self._refresh()
+        return self._names
+
+    def resolve(self, name: str) -> str | None:
+        """Resolve a user-provided Cog name against the discovered allowlist."""
+        self._refresh()
+        normalized_name = name.strip()
+        if normalized_name not in self._allowlist:
+            return None
+        return f"{self.package}.{normalized_name}"
+
+    def search(
+        self,
+        current: str,
+        *,
+        exclude: frozenset[str] = frozenset(),
+        limit: int = 25,
+    ) -> tuple[str, ...]:
+        """Return prefix matches followed by substring matches, casefolded."""
+        self._refresh()
+        current_folded = current.casefold()
+        cache_key = (current_folded, exclude, limit)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        matches: list[str] = []
+        start = bisect_left(self._folded_keys, current_folded)
+        for index in range(start, len(self._folded_keys)):
+            if len(matches) >= limit or not self._folded_keys[index].startswith(current_folded):
+                break
+            if self._folded_names[index] not in exclude:
+                matches.append(self._folded_names[index])
+
+        if len(matches) < limit and current_folded:
+            for key, name in zip(self._folded_keys, self._folded_names):
+                if (
+                    current_folded in key
+                    and not key.startswith(current_folded)
+                    and name not in exclude
+                ):
+                    matches.append(name)
+                    if len(matches) >= limit:
+                        break
+
+        if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+            self._search_cache.clear()
+        result = self._search_cache[cache_key] = tuple(matches)
+        return result
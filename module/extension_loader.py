@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import ast
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from discord.ext import commands
+from loguru import logger
+
+DEPENDENCIES_ATTRIBUTE = "DEPENDENCIES"
+
+
+@dataclass(slots=True)
+class ExtensionTiming:
+    name: str
+    wave: int
+    elapsed: float
+    error: str | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.error is None
+
+
+@dataclass(slots=True)
+class StartupReport:
+    timings: list[ExtensionTiming] = field(default_factory=list)
+    skipped: dict[str, str] = field(default_factory=dict)
+    waves: int = 0
+    elapsed: float = 0.0
+
+    def summary_lines(self, limit: int = 10) -> list[str]:
+        """Render the slowest extensions first for status embeds."""
+        lines = [
+            f"- {timing.name}: {timing.elapsed * 1000:.0f}ms（第 {timing.wave} 批）"
+            + ("" if timing.loaded else " 失敗")
+            for timing in sorted(self.timings, key=lambda item: item.elapsed, reverse=True)
+        ][:limit]
+        lines.extend(f"- {name}: 略過（{reason}）" for name, reason in self.skipped.items())
+        return lines
+
+
+def read_dependencies(path: Path) -> tuple[str, ...]:
+    """Read a module-level ``DEPENDENCIES`` literal without importing the module."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError, ValueError) as error:
+        logger.warning(f"[Extension 載入] 無法解析相依資訊 {path.name}: {error}")
+        return ()
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+
+        if not any(
+            isinstance(target, ast.Name) and target.id == DEPENDENCIES_ATTRIBUTE
+            for target in targets
+        ):
+            continue
+
+        try:
+            value = ast.literal_eval(node.value)
+        except ValueError:
+            break
+        if isinstance(value, (tuple, list, set, frozenset)) and all(
+            isinstance(item, str) for item in value
+        ):
+            return tuple(sorted(value))
+        break
+    else:
+        return ()
+
+    logger.warning(
+        f"[Extension 載入] {path.name} 的 {DEPENDENCIES_ATTRIBUTE} 必須是字串常值序列"
+    )
+    return ()
+
+
+def plan_waves(
+    dependencies: dict[str, tuple[str, ...]],
+    *,
+    satisfied: Iterable[str] = (),
+) -> tuple[list[list[str]], dict[str, str]]:
+    """Group extensions into topological waves that can load concurrently.
+
+    Extensions with unknown dependencies or that take part in a cycle are
+    returned in the skipped mapping with a human-readable reason.
+    """
+    satisfied = set(satisfied)
+    skipped: dict[str, str] = {}
+    pending: dict[str, set[str]] = {}
+    for name, requirements in dependencies.items():
+        missing = [
+            requirement
+            for requirement in requirements
+            if requirement not in dependencies and requirement not in satisfied
+        ]
+        if missing:
+            skipped[name] = f"缺少相依模組 {', '.join(missing)}"
+        else:
+            pending[name] = {
+                requirement for requirement in requirements if requirement not in satisfied
+            }
+
+    changed = True
+    while changed:
+        changed = False
+        for name, requirements in list(pending.items()):
+            blocked = requirements & skipped.keys()
+            if blocked:
+                skipped[name] = f"相依模組無法載入 {', '.join(sorted(blocked))}"
+                del pending[name]
+                changed = True
+
+    waves: list[list[str]] = []
+    while pending:
+        ready = sorted(
+            (name for name, requirements in pending.items() if not requirements),
+            key=str.casefold,
+        )
+        if not ready:
+            for name in pending:
+                skipped[name] = "循環相依"
+            break
+
+        waves.append(ready)
+        for name in ready:
+            del pending[name]
+        for requirements in pending.values():
+            requirements.difference_update(ready)
+    return waves, skipped
+
+
+class ExtensionLoader:
+    """Load extensions in dependency order, running each wave with ``asyncio.gather``.
+
+    discord.py imports a module synchronously inside ``load_extension`` and
+    only yields while awaiting its ``setup()``, so concurrency pays off for
+    cogs whose setup performs I/O. Each timing covers import plus setup.
+    """
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        resolve: Callable[[str], str | None],
+        module_path: Callable[[str], Path],
+    ) -> None:
+        self.bot = bot
+        self.resolve = resolve
+        self.module_path = module_path
+
+    async def load_all(
+        self,
+        names: Iterable[str],
+        *,
+        preloaded: Iterable[str] = (),
+    ) -> StartupReport:
+        started = time.perf_counter()
+        report = StartupReport()
+        preloaded = set(preloaded)
+
+        dependencies: dict[str, tuple[str, ...]] = {}
+        for name in names:
+            if name in preloaded:
+                continue
+            if self.resolve(name) is None:
+                report.skipped[name] = "不在模組清單中"
+                continue
+            dependencies[name] = read_dependencies(self.module_path(name))
+
+        waves, skipped = plan_waves(dependencies, satisfied=preloaded)
+        report.skipped.update(skipped)
+        report.waves = len(waves)
+
+        failed: set[str] = set()
+        for wave_number, wave in enumerate(waves, start=1):
+            runnable = []
+            for name in wave:
+                blocked = set(dependencies[name]) & failed
+                if blocked:
+                    report.skipped[name] = f"相依模組載入失敗 {', '.join(sorted(blocked))}"
+                    failed.add(name)
+                else:
+                    runnable.append(name)
+
+            timings = await asyncio.gather(
+                *(self._load_one(name, wave_number) for name in runnable)
+            )
+            report.timings.extend(timings)
+            failed.update(timing.name for timing in timings if not timing.loaded)
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    async def _load_one(self, name: str, wave: int) -> ExtensionTiming:
+        full_path = self.resolve(name)
+        started = time.perf_counter()
+        try:
+            logger.info(f"[初始化] 載入 Extension: {name}")
+            await self.bot.load_extension(full_path)
+        except Exception as error:
+            logger.opt(exception=error).error(f"[初始化] Extension 載入失敗: {name}")
+            return ExtensionTiming(name, wave, time.perf_counter() - started, str(error))
+        return ExtensionTiming(name, wave, time.perf_counter() - started)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import discord
+from loguru import logger
+
+from .discord_compat import guild_payload, shard_registry, user_payload
+
+RESUME_MAX_AGE = 120.0
+
+
+@dataclass(frozen=True, slots=True)
+class ShardSession:
+    shard_id: int
+    session_id: str
+    sequence: int
+    resume_url: str
+
+
+@dataclass(slots=True)
+class ResumeSnapshot:
+    saved_at: float
+    application_id: int | None
+    shard_count: int
+    user: dict[str, Any]
+    sessions: dict[int, ShardSession] = field(default_factory=dict)
+    guilds: list[dict[str, Any]] = field(default_factory=list)
+
+    def ready_payload(self, session: ShardSession) -> dict[str, Any]:
+        """Build a synthetic READY for one shard from the cached guilds."""
+        shard_id = session.shard_id
+        return {
+            "v": 10,
+            "user": self.user,
+            "guilds": [
+                guild
+                for guild in self.guilds
+                if (int(guild["id"]) >> 22) % self.shard_count == shard_id
+            ],
+            "session_id": session.session_id,
+            "resume_gateway_url": session.resume_url,
+            "shard": [shard_id, self.shard_count],
+        }
+
+
+class ResumeStore:
+    """Persist gateway sessions and a cache snapshot across a planned restart.
+
+    The file is consumed on the next boot whether or not it is usable, so a
+    stale snapshot can never be replayed twice.
+    """
+
+    def __init__(self, path: Path, *, max_age: float = RESUME_MAX_AGE) -> None:
+        self.path = path
+        self.max_age = max_age
+
+    @staticmethod
+    def capture(client: discord.AutoShardedClient) -> ResumeSnapshot | None:
+        """Snapshot sessions and cache; shard readers must already be stopped."""
+        if client.user is None or client.shard_count is None:
+            return None
+
+        sessions = {
+            shard_id: ShardSession(
+                shard_id=shard_id,
+                session_id=shard.ws.session_id,
+                sequence=shard.ws.sequence,
+                resume_url=str(shard.ws.gateway),
+            )
+            for shard_id, shard in shard_registry(client).items()
+            if shard.ws.session_id is not None and shard.ws.sequence is not None
+        }
+        return ResumeSnapshot(
+            saved_at=time.time(),
+            application_id=client.application_id,
+            shard_count=client.shard_count,
+            user=user_payload(client.user),
+            sessions=sessions,
+            guilds=[guild_payload(guild) for guild in client.guilds],
+        )
+
+    def save(self, snapshot: ResumeSnapshot) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.path.with_suffix(".tmp")
+        temporary_path.write_text(
+            json.dumps(asdict(snapshot), ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        temporary_path.replace(self.path)
+
+    def load(
+        self,
+        *,
+        application_id: int | None,
+        shard_count: int | None,
+    ) -> ResumeSnapshot | None:
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            logger.warning(f"[工作階段恢復] 無法讀取快照，改為完整登入: {error}")
+            self.path.unlink(missing_ok=True)
+            return None
+        self.path.unlink(missing_ok=True)
+
+        try:
+            snapshot = ResumeSnapshot(
+                saved_at=raw["saved_at"],
+                application_id=raw["application_id"],
+                shard_count=raw["shard_count"],
+                user=raw["user"],
+                sessions={
+                    int(shard_id): ShardSession(**session)
+                    for shard_id, session in raw["sessions"].items()
+                },
+                guilds=raw["guilds"],
+            )
+        except (KeyError, TypeError, ValueError) as error:
+            logger.warning(f"[工作階段恢復] 快照格式錯誤，改為完整登入: {error}")
+            return None
+
+        age = time.time() - snapshot.saved_at
+        if age > self.max_age:
+            logger.info(f"[工作階段恢復] 快照已過期（{age:.0f} 秒），改為完整登入")
+            return None
+        if snapshot.application_id != application_id:
+            logger.info("[工作階段恢復] 應用程式 ID 不同，改為完整登入")
+            return None
+        if shard_count is not None and snapshot.shard_count != shard_count:
+            logger.info("[工作階段恢復] 分片數量已變更，改為完整登入")
+            return None
+        return snapshot
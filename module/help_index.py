@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from collections.abc import Callable, Collection, Iterable
+from dataclasses import dataclass
+
+import discord
+from discord.ext import commands
+from loguru import logger
+
+from .outbound import Priority, prioritize
+
+PAGE_SIZE = 10
+SEARCH_LIMIT = 10
+LINE_LIMIT = 200
+
+
+@dataclass(frozen=True, slots=True)
+class HelpEntry:
+    qualified_name: str
+    cog: str
+    short_doc: str
+    aliases: tuple[str, ...] = ()
+
+    def line(self, prefix: str) -> str:
+        line = f"`{prefix}{self.qualified_name}` - {self.short_doc or '（沒有說明）'}"
+        return line if len(line) <= LINE_LIMIT else f"{line[: LINE_LIMIT - 1]}…"
+
+
+@dataclass(frozen=True, slots=True)
+class HelpListing:
+    """The entries one kind of caller may see, already split into pages."""
+
+    pages: tuple[tuple[HelpEntry, ...], ...]
+    visible: frozenset[str]
+
+
+def _ngrams(text: str) -> set[str]:
+    # Bigrams with padding so one- or two-character queries (common for
+    # Chinese) still produce a gram to look up.
+    padded = f" {text.lower()} "
+    return {padded[index : index + 2] for index in range(len(padded) - 1)}
+
+
+class HelpIndex:
+    """Searchable snapshot of the prefix command set.
+
+    Built once per command-set generation. Search looks up the query's
+    bigrams in an inverted index, so it only touches commands that share a
+    gram with the query instead of scanning every command.
+    """
+
+    def __init__(self, entries: Iterable[HelpEntry], *, generation: int = 0) -> None:
+        self.generation = generation
+        self.entries = tuple(sorted(entries, key=lambda entry: (entry.cog, entry.qualified_name)))
+        self._by_name: dict[str, int] = {}
+        self._name_grams: defaultdict[str, list[int]] = defaultdict(list)
+        self._doc_grams: defaultdict[str, list[int]] = defaultdict(list)
+        for position, entry in enumerate(self.entries):
+            names = (entry.qualified_name, *entry.aliases)
+            for name in names:
+                self._by_name.setdefault(name.lower(), position)
+            for gram in set().union(*(_ngrams(name) for name in names)):
+                self._name_grams[gram].append(position)
+            for gram in _ngrams(entry.short_doc):
+                self._doc_grams[gram].append(position)
+
+    @classmethod
+    def build(cls, bot: commands.Bot, *, generation: int = 0) -> HelpIndex:
+        entries = [
+            HelpEntry(
+                qualified_name=command.qualified_name,
+                cog=command.cog.qualified_name if command.cog else "未分類",
+                short_doc=command.short_doc,
+                aliases=tuple(command.aliases),
+            )
+            for command in bot.walk_commands()
+            if not command.hidden
+        ]
+        index = cls(entries, generation=generation)
+        logger.debug(f"[說明] 已建立 {len(index)} 個指令的索引")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def listing(self, visible: Collection[str]) -> HelpListing:
+        entries = [entry for entry in self.entries if entry.qualified_name in visible]
+        return HelpListing(
+            pages=tuple(
+                tuple(entries[start : start + PAGE_SIZE])
+                for start in range(0, len(entries), PAGE_SIZE)
+            ),
+            visible=frozenset(visible),
+        )
+
+    def search(
+        self,
+        query: str,
+        *,
+        visible: Collection[str] | None = None,
+        limit: int = SEARCH_LIMIT,
+    ) -> list[HelpEntry]:
+        """Rank commands by shared bigrams; name matches weigh twice as much as docs."""
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        scores: Counter[int] = Counter()
+        exact = self._by_name.get(query)
+        if exact is not None:
+            scores[exact] += 1000
+        grams = _ngrams(query)
+        for gram in grams:
+            for position in self._name_grams.get(gram, ()):
+                scores[position] += 2
+            for position in self._doc_grams.get(gram, ()):
+                scores[position] += 1
+
+        # A full name match scores twice the gram count, so this keeps typos
+        # and substrings (whose padded edge gram cannot match) but drops
+        # commands sharing a single letter pair with the query.
+        minimum = max(2, len(grams) - 1)
+        results = []
+        for position, score in scores.most_common():
+            if score < minimum or len(results) >= limit:
+                break
+            entry = self.entries[position]
+            if visible is None or entry.qualified_name in visible:
+                results.append(entry)
+        return results
+
+
+def render_page(
+    page: Iterable[HelpEntry],
+    *,
+    prefix: str,
+    title: str = "指令總覽",
+    footer: str | None = None,
+) -> discord.Embed:
+    lines: list[str] = []
+    cog = None
+    for entry in page:
+        if entry.cog != cog:
+            cog = entry.cog
+            if lines:
+                lines.append("")
+            lines.append(f"**{cog}**")
+        lines.append(entry.line(prefix))
+    embed = discord.Embed(
+        title=title,
+        description="\n".join(lines) or "目前沒有可用的指令",
+        color=discord.Color.blue(),
+    )
+    if footer:
+        embed.set_footer(text=footer)
+    return embed
+
+
+class HelpPaginator(discord.ui.View):
+    """Previous/next buttons over a :class:`HelpListing`, usable only by its author."""
+
+    def __init__(
+        self,
+        listing: HelpListing,
+        *,
+        author_id: int,
+        prefix: str,
+        decorate: Callable[[discord.Embed], None] | None = None,
+        timeout: float = 180,
+    ) -> None:
+        super().__init__(timeout=timeout)
+        self.listing = listing
+        self.author_id = author_id
+        self.prefix = prefix
+        self.decorate = decorate
+        self.page = 0
+        self.message: discord.Message | None = None
+        self._sync_buttons()
+
+    def embed(self) -> discord.Embed:
+        embed = render_page(
+            self.listing.pages[self.page],
+            prefix=self.prefix,
+            footer=(
+                f"第 {self.page + 1}/{len(self.listing.pages)} 頁｜"
+                f"輸入 {self.prefix}help 指令名稱 查看說明，或 {self.prefix}help 關鍵字 搜尋"
+            ),
+        )
+        if self.decorate is not None:
+            self.decorate(embed)
+        return embed
+
+    def _sync_buttons(self) -> None:
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= len(self.listing.pages) - 1
+        self.page_label.label = f"{self.page + 1}/{len(self.listing.pages)}"
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id == self.author_id:
+            return True
+        await interaction.response.send_message("只有查詢的人可以翻頁。", ephemeral=True)
+        return False
+
+    async def _show(self, interaction: discord.Interaction, page: int) -> None:
+        self.page = page
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="上一頁", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="1/1", style=discord.ButtonStyle.secondary, disabled=True)
+    async def page_label(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
+        del interaction
+
+    @discord.ui.button(label="下一頁", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
+        await self._show(interaction, self.page + 1)
+
+    async def on_timeout(self) -> None:
+        if self.message is None:
+            return
+        try:
+            with prioritize(Priority.OPS):
+                await self.message.edit(view=None)
+        except discord.HTTPException as error:
+            logger.debug(f"[說明] 移除翻頁按鈕失敗：{error}")
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import inspect
+import sys
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any
+
+from discord.ext import commands
+from loguru import logger
+
+from .discord_compat import ExtensionInternals, extension_internals
+
+EXPORT_STATE = "export_state"
+IMPORT_STATE = "import_state"
+
+
+def _is_submodule(parent: str, child: str) -> bool:
+    return parent == child or child.startswith(f"{parent}.")
+
+
+@dataclass(frozen=True, slots=True)
+class ReloadReport:
+    extension: str
+    validate_elapsed: float
+    swap_elapsed: float
+    handed_off: tuple[str, ...] = ()
+
+    def describe(self) -> str:
+        handed_off = "、".join(self.handed_off) or "無"
+        return (
+            f"驗證 {self.validate_elapsed * 1000:.1f}ms，"
+            f"切換 {self.swap_elapsed * 1000:.1f}ms，交接狀態：{handed_off}"
+        )
+
+
+class HotReloader:
+    """Reload extensions by importing the new code before tearing down the old.
+
+    Cogs may define ``export_state()`` and ``import_state(state)``; the value
+    returned by the old instance is handed to the new instance with the same
+    ``qualified_name``. Command dispatch waits on :meth:`wait_idle` while the
+    swap runs, so no invocation sees a half-registered extension.
+    """
+
+    def __init__(self, bot: commands.Bot, *, gate_timeout: float = 5.0) -> None:
+        self.bot = bot
+        self.gate_timeout = gate_timeout
+        self._lock = asyncio.Lock()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def swapping(self) -> bool:
+        return not self._idle.is_set()
+
+    async def wait_idle(self) -> None:
+        if self._idle.is_set():
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=self.gate_timeout)
+        except TimeoutError:
+            logger.warning("[熱重載] 等待模組切換逾時，直接繼續處理指令")
+
+    @staticmethod
+    def prepare(name: str) -> tuple[ModuleType, dict[str, ModuleType]]:
+        """Import a fresh copy of ``name`` without replacing the live module.
+
+        The fresh module and any submodules it imports are executed under
+        their real names, then moved out of ``sys.modules`` again before
+        returning. No ``await`` happens in between, so other tasks never
+        observe the fresh copy.
+        """
+        importlib.invalidate_caches()
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            raise commands.ExtensionNotFound(name)
+
+        live_modules = {
+            module_name: sys.modules.pop(module_name)
+            for module_name in list(sys.modules)
+            if _is_submodule(name, module_name)
+        }
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception as error:
+            raise commands.ExtensionFailed(name, error) from error
+        finally:
+            fresh_modules = {
+                module_name: sys.modules.pop(module_name)
+                for module_name in list(sys.modules)
+                if _is_submodule(name, module_name)
+            }
+            sys.modules.update(live_modules)
+
+        if not inspect.iscoroutinefunction(getattr(module, "setup", None)):
+            raise commands.NoEntryPointError(name)
+        return module, fresh_modules
+
+    def _owned_cogs(self, name: str) -> list[commands.Cog]:
+        return [
+            cog
+            for cog in self.bot.cogs.values()
+            if _is_submodule(name, type(cog).__module__)
+        ]
+
+    def _export(self, name: str) -> dict[str, Any]:
+        return {
+            cog.qualified_name: getattr(cog, EXPORT_STATE)()
+            for cog in self._owned_cogs(name)
+            if hasattr(cog, EXPORT_STATE)
+        }
+
+    def _import(self, name: str, states: dict[str, Any]) -> tuple[str, ...]:
+        handed_off = []
+        for cog in self._owned_cogs(name):
+            if cog.qualified_name not in states or not hasattr(cog, IMPORT_STATE):
+                continue
+            try:
+                getattr(cog, IMPORT_STATE)(states[cog.qualified_name])
+            except Exception as error:
+                logger.opt(exception=error).warning(
+                    f"[熱重載] {cog.qualified_name} 無法匯入先前的狀態"
+                )
+            else:
+                handed_off.append(cog.qualified_name)
+        return tuple(handed_off)
+
+    async def _install(
+        self,
+        name: str,
+        module: ModuleType,
+        modules: dict[str, ModuleType],
+        internals: ExtensionInternals,
+    ) -> None:
+        sys.modules.update(modules)
+        await module.setup(self.bot)
+        internals.extensions[name] = module
+
+    async def reload(self, name: str) -> ReloadReport:
+        """Validate, then swap ``name`` for a freshly imported copy.
+
+        If the new ``setup()`` fails, the previous module is reinstalled
+        with its exported state and the error is re-raised.
+        """
+        async with self._lock:
+            previous = self.bot.extensions.get(name)
+            if previous is None:
+                raise commands.ExtensionNotLoaded(name)
+            internals = extension_internals(self.bot)
+
+            started = time.perf_counter()
+            module, fresh_modules = self.prepare(name)
+            validate_elapsed = time.perf_counter() - started
+
+            states = self._export(name)
+            previous_modules = {
+                module_name: module_object
+                for module_name, module_object in sys.modules.items()
+                if _is_submodule(name, module_name)
+            }
+
+            self._idle.clear()
+            swap_started = time.perf_counter()
+            try:
+                await internals.remove_module_references(previous.__name__)
+                await internals.call_module_finalizers(previous, name)
+                try:
+                    await self._install(name, module, fresh_modules, internals)
+                except Exception as error:
+                    await internals.remove_module_references(module.__name__)
+                    for module_name in list(sys.modules):
+                        if _is_submodule(name, module_name):
+                            del sys.modules[module_name]
+                    await self._install(name, previous, previous_modules, internals)
+                    self._import(name, states)
+                    raise commands.ExtensionFailed(name, error) from error
+                handed_off = self._import(name, states)
+            finally:
+                self._idle.set()
+
+            return ReloadReport(
+                extension=name,
+                validate_elapsed=validate_elapsed,
+                swap_elapsed=time.perf_counter() - swap_started,
+                handed_off=handed_off,
+            )
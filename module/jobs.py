@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import multiprocessing
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, TypeVar, get_type_hints
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from loguru import logger
+
+from .metrics import METRIC_PREFIX, CommandStats, histogram_lines
+
+T = TypeVar("T")
+
+JOB_ATTRIBUTE = "__job_spec__"
+JOB_QUEUE_ATTRIBUTE = "jobs"
+# Discord drops interactions that are not acknowledged within 3 seconds.
+DEFER_AFTER = 2.0
+
+
+@dataclass(frozen=True, slots=True)
+class JobSpec:
+    """How one command runs as a job; see :func:`job`."""
+
+    max_concurrency: int = 1
+    max_queue: int | None = None
+    defer_after: float | None = DEFER_AFTER
+    ephemeral: bool = False
+
+
+class JobRejected(commands.CommandError, app_commands.AppCommandError):
+    """Raised when a command's job queue already holds ``max_queue`` waiting calls."""
+
+    def __init__(self, command: str, waiting: int) -> None:
+        self.command = command
+        self.waiting = waiting
+        super().__init__(f"`{command}` 目前排隊人數已滿（{waiting} 人），請稍後再試。")
+
+
+class JobStats:
+    __slots__ = ("spec", "waiting", "running", "rejected", "deferred", "wait", "run")
+
+    def __init__(self, spec: JobSpec) -> None:
+        self.spec = spec
+        self.waiting = 0
+        self.running = 0
+        self.rejected = 0
+        self.deferred = 0
+        self.wait = CommandStats()
+        self.run = CommandStats()
+
+
+class _Job:
+    __slots__ = ("defer_task", "deferring")
+
+    def __init__(self) -> None:
+        self.defer_task: asyncio.Task[None] | None = None
+        self.deferring = False
+
+    async def settle(self) -> None:
+        """Cancel a pending auto-defer, or wait for one already being sent."""
+        if self.defer_task is None:
+            return
+        if self.deferring:
+            await self.defer_task
+        else:
+            self.defer_task.cancel()
+
+
+_current_job: contextvars.ContextVar[_Job | None] = contextvars.ContextVar(
+    "current_job",
+    default=None,
+)
+
+
+class JobQueue:
+    """Per-command concurrency slots plus thread and process pools for job commands.
+
+    Each command decorated with :func:`job` gets a semaphore of
+    ``max_concurrency`` slots; further calls wait in FIFO order, or are
+    rejected once ``max_queue`` are already waiting. Interactions still
+    unanswered ``defer_after`` seconds after the call arrived are deferred,
+    whether the job is queued or running. Queue wait and run time are kept
+    per command as latency histograms.
+
+    Blocking I/O belongs in :meth:`run_blocking` and CPU-bound work in
+    :meth:`run_cpu`, so neither holds the event loop. Both pools start on
+    first use.
+    """
+
+    def __init__(self, *, thread_workers: int = 4, process_workers: int = 2) -> None:
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.stats: dict[str, JobStats] = {}
+        self._slots: dict[str, asyncio.Semaphore] = {}
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+
+    @property
+    def waiting(self) -> int:
+        return sum(stats.waiting for stats in self.stats.values())
+
+    @property
+    def running(self) -> int:
+        return sum(stats.running for stats in self.stats.values())
+
+    @property
+    def rejected(self) -> int:
+        return sum(stats.rejected for stats in self.stats.values())
+
+    @property
+    def deferred(self) -> int:
+        return sum(stats.deferred for stats in self.stats.values())
+
+    def _prepare(self, name: str, spec: JobSpec) -> tuple[JobStats, asyncio.Semaphore]:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = JobStats(spec)
+        slots = self._slots.get(name)
+        if slots is None or stats.spec.max_concurrency != spec.max_concurrency:
+            # A reloaded cog may change the limit; calls already waiting keep
+            # the old semaphore and new calls use the new one.
+            slots = self._slots[name] = asyncio.Semaphore(spec.max_concurrency)
+        stats.spec = spec
+        return stats, slots
+
+    async def run(
+        self,
+        name: str,
+        spec: JobSpec,
+        call: Callable[[], Awaitable[T]],
+        *,
+        defer: Callable[[], Awaitable[bool]] | None = None,
+    ) -> T:
+        """Wait for a slot for ``name``, then await ``call()``.
+
+        ``defer`` acknowledges the interaction and returns whether it did; it
+        is called once the job has taken longer than ``spec.defer_after``.
+        """
+        stats, slots = self._prepare(name, spec)
+        if (
+            spec.max_queue is not None
+            and slots.locked()
+            and stats.waiting >= spec.max_queue
+        ):
+            stats.rejected += 1
+            raise JobRejected(name, stats.waiting)
+
+        job = _Job()
+        if defer is not None and spec.defer_after is not None:
+            job.defer_task = asyncio.create_task(
+                self._defer_later(job, spec.defer_after, defer, stats)
+            )
+        token = _current_job.set(job)
+        queued = time.perf_counter()
+        try:
+            stats.waiting += 1
+            try:
+                await slots.acquire()
+            finally:
+                stats.waiting -= 1
+            started = time.perf_counter()
+            stats.wait.observe(started - queued, failed=False)
+            stats.running += 1
+            failed = True
+            try:
+                result = await call()
+                failed = False
+                return result
+            finally:
+                stats.running -= 1
+                slots.release()
+                stats.run.observe(time.perf_counter() - started, failed=failed)
+        finally:
+            _current_job.reset(token)
+            await job.settle()
+
+    async def _defer_later(
+        self,
+        job: _Job,
+        delay: float,
+        defer: Callable[[], Awaitable[bool]],
+        stats: JobStats,
+    ) -> None:
+        await asyncio.sleep(delay)
+        job.deferring = True
+        try:
+            if await defer():
+                stats.deferred += 1
+        except discord.InteractionResponded:
+            pass
+        except discord.HTTPException as error:
+            logger.warning(f"[工作佇列] 自動延遲回應失敗: {error}")
+
+    # Pools ------------------------------------------------------------------
+
+    def _threads(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=max(1, self.thread_workers),
+                thread_name_prefix="job",
+            )
+        return self._thread_pool
+
+    def _processes(self) -> ProcessPoolExecutor | None:
+        if self._process_pool is None and self.process_workers > 0:
+            # spawn rather than fork: the bot process runs loguru's and the
+            # storage layer's threads, which fork would copy mid-operation.
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._process_pool
+
+    async def _offload(self, pool: Executor, call: Callable[[], T]) -> T:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, call)
+        finally:
+            # Let an auto-defer that is already on the wire land before the
+            # command sends its reply, or the reply would race the defer.
+            job = _current_job.get()
+            if job is not None and job.deferring and job.defer_task is not None:
+                await asyncio.shield(job.defer_task)
+
+    async def run_blocking(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run blocking I/O in the job thread pool, keeping context variables."""
+        context = contextvars.copy_context()
+        return await self._offload(
+            self._threads(),
+            functools.partial(context.run, func, *args, **kwargs),
+        )
+
+    async def run_cpu(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run CPU-bound work in the process pool.
+
+        ``func`` and its arguments must be picklable, so ``func`` has to be a
+        module-level function. With ``process_workers`` set to 0 the work
+        runs in the thread pool instead.
+        """
+        pool = self._processes()
+        if pool is None:
+            return await self.run_blocking(func, *args, **kwargs)
+        try:
+            return await self._offload(pool, functools.partial(func, *args, **kwargs))
+        except BrokenProcessPool:
+            logger.warning("[工作佇列] 行程池異常終止，下次呼叫時重新建立")
+            if self._process_pool is pool:
+                self._process_pool = None
+            raise
+
+    async def close(self) -> None:
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            await asyncio.to_thread(self._process_pool.shutdown, wait=True, cancel_futures=True)
+            self._process_pool = None
+
+    # Reporting --------------------------------------------------------------
+
+    def summary_lines(self) -> list[str]:
+        return [
+            f"`{name}` - 執行中 {stats.running}/{stats.spec.max_concurrency}，"
+            f"排隊 {stats.waiting}，等待 p99≤{stats.wait.quantile(0.99) * 1000:.0f}ms，"
+            f"執行 p50≤{stats.run.quantile(0.5) * 1000:.0f}ms，"
+            f"拒絕 {stats.rejected}，自動延遲 {stats.deferred}"
+            for name, stats in sorted(self.stats.items())
+        ]
+
+    def render_prometheus(self) -> list[str]:
+        lines: list[str] = []
+        for metric, description, attribute in (
+            ("job_wait_seconds", "Time jobs waited for a concurrency slot.", "wait"),
+            ("job_run_seconds", "Time jobs ran after getting a slot.", "run"),
+        ):
+            metric = f"{METRIC_PREFIX}_{metric}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, stats in self.stats.items():
+                lines.extend(histogram_lines(metric, {"command": name}, getattr(stats, attribute)))
+        return lines
+
+
+def _invocation_target(args: tuple[Any, ...]) -> commands.Context | discord.Interaction | None:
+    for argument in args:
+        if isinstance(argument, (commands.Context, discord.Interaction)):
+            return argument
+    return None
+
+
+def _deferrer(
+    target: commands.Context | discord.Interaction,
+    ephemeral: bool,
+) -> Callable[[], Awaitable[bool]] | None:
+    interaction = target.interaction if isinstance(target, commands.Context) else target
+    if interaction is None:
+        return None
+
+    async def defer() -> bool:
+        if interaction.response.is_done():
+            return False
+        await interaction.response.defer(ephemeral=ephemeral)
+        return True
+
+    return defer
+
+
+async def _run_job(
+    spec: JobSpec,
+    func: Callable[..., Awaitable[T]],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> T:
+    target = _invocation_target(args)
+    client = None
+    if isinstance(target, commands.Context):
+        client = target.bot
+    elif target is not None:
+        client = target.client
+    queue = getattr(client, JOB_QUEUE_ATTRIBUTE, None)
+    if target is None or not isinstance(queue, JobQueue):
+        return await func(*args, **kwargs)
+
+    command = target.command
+    name = command.qualified_name if command is not None else func.__qualname__
+    return await queue.run(
+        name,
+        spec,
+        functools.partial(func, *args, **kwargs),
+        defer=_deferrer(target, spec.ephemeral),
+    )
+
+
+def _wrap(func: Callable[..., Awaitable[T]], spec: JobSpec) -> Callable[..., Awaitable[T]]:
+    run = functools.partial(_run_job, spec, func)
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run(args, kwargs)
+
+    # discord.py evaluates string annotations in ``callback.__globals__``,
+    # which is this module for the wrapper, so resolve them against the
+    # command's module up front and publish them as the wrapper's signature.
+    hints = get_type_hints(func, include_extras=True)
+    signature = inspect.signature(func)
+    wrapper.__signature__ = signature.replace(
+        parameters=[
+            parameter.replace(annotation=hints.get(parameter.name, parameter.annotation))
+            for parameter in signature.parameters.values()
+        ],
+        return_annotation=hints.get("return", signature.return_annotation),
+    )
+    wrapper.__annotations__ = hints
+    setattr(wrapper, JOB_ATTRIBUTE, spec)
+    return wrapper
+
+
+def job(
+    *,
+    max_concurrency: int = 1,
+    max_queue: int | None = None,
+    defer_after: float | None = DEFER_AFTER,
+    ephemeral: bool = False,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Run a prefix, slash or hybrid command callback through ``bot.jobs``.
+
+    Place it below the command decorator. Checks and rate limits run before
+    the job is queued. ``defer_after=None`` turns auto-defer off; ``ephemeral``
+    applies to the deferred response.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency 必須至少為 1")
+    if max_queue is not None and max_queue < 0:
+        raise ValueError("max_queue 不可為負數")
+    spec = JobSpec(max_concurrency, max_queue, defer_after, ephemeral)
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError("@job 必須直接裝飾 async 指令函式，請放在指令裝飾器下方")
+        return _wrap(func, spec)
+
+    return decorator
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from loguru import logger
+
+from .command_sync import GLOBAL_SCOPE
+from .extension_loader import read_dependencies
+
+MANIFEST_VERSION = 1
+
+
+def _is_submodule(parent: str, child: str | None) -> bool:
+    return child is not None and (parent == child or child.startswith(f"{parent}."))
+
+
+def source_digest(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class LazyExtensionFailed(app_commands.AppCommandError):
+    """Raised when a lazy extension fails to load on first use; ``original`` holds the cause."""
+
+    def __init__(self, name: str, original: Exception) -> None:
+        self.name = name
+        self.original = original
+        super().__init__(f"延遲載入的擴充 {name} 載入失敗: {original}")
+
+
+class LazyPrefixCommand(commands.Command):
+    """Placeholder that keeps a lazy extension's prefix command resolvable and listed in help."""
+
+    def __init__(self, extension: str, entry: dict[str, Any]) -> None:
+        async def placeholder(ctx: commands.Context) -> None:
+            del ctx
+
+        super().__init__(
+            placeholder,
+            name=entry["name"],
+            aliases=entry.get("aliases", []),
+            help=entry.get("help"),
+            hidden=entry.get("hidden", False),
+        )
+        self.extension = extension
+
+
+class LazyExtensionRegistry:
+    """Register extensions from a manifest and import them on first use.
+
+    The manifest at ``manifest_path`` stores, per extension, a digest of its
+    source plus the application command payloads and prefix command names it
+    registered the last time it was really loaded. An extension is only
+    deferred when its source digest still matches; otherwise it loads eagerly
+    and the manifest entry is rebuilt.
+    """
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        manifest_path: Path,
+        extension_path: Callable[[str], str | None],
+        source_path: Callable[[str], Path],
+    ) -> None:
+        self.bot = bot
+        self.manifest_path = manifest_path
+        self.extension_path = extension_path
+        self.source_path = source_path
+        self.configured: frozenset[str] = frozenset()
+        self.pending: dict[str, dict[str, Any]] = {}
+        self.materialized: dict[str, float] = {}
+        self._manifest: dict[str, dict[str, Any]] | None = None
+        self._app_commands: dict[tuple[str, str], str] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @property
+    def manifest(self) -> dict[str, dict[str, Any]]:
+        if self._manifest is None:
+            try:
+                raw = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                raw = {}
+            except (OSError, ValueError) as error:
+                logger.warning(f"[延遲載入] 無法讀取 manifest，將全部立即載入: {error}")
+                raw = {}
+            self._manifest = (
+                raw.get("extensions", {}) if raw.get("version") == MANIFEST_VERSION else {}
+            )
+        return self._manifest
+
+    def save_manifest(self) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.manifest_path.with_suffix(".tmp")
+        temporary_path.write_text(
+            json.dumps(
+                {"version": MANIFEST_VERSION, "extensions": self.manifest},
+                ensure_ascii=False,
+                indent=4,
+                sort_keys=True,
+            ),
+            encoding="utf-8",
+        )
+        temporary_path.replace(self.manifest_path)
+
+    def is_fresh(self, name: str) -> bool:
+        entry = self.manifest.get(name)
+        return entry is not None and entry.get("source_digest") == source_digest(
+            self.source_path(name)
+        )
+
+    def plan(self, names: Iterable[str], configured: Iterable[str]) -> set[str]:
+        """Pick which of ``names`` can be deferred.
+
+        Extensions without a fresh manifest entry, and anything an eagerly
+        loaded extension depends on, stay eager.
+        """
+        names = set(names)
+        self.configured = frozenset(configured) & names
+        candidates = {name for name in self.configured if self.is_fresh(name)}
+        dependencies = {name: read_dependencies(self.source_path(name)) for name in names}
+        while True:
+            needed = {
+                dependency
+                for name in names - candidates
+                for dependency in dependencies[name]
+            } & candidates
+            if not needed:
+                return candidates
+            candidates -= needed
+
+    def register(self, name: str) -> bool:
+        entry = self.manifest[name]
+        placeholders = [LazyPrefixCommand(name, command) for command in entry["prefix_commands"]]
+        added: list[LazyPrefixCommand] = []
+        try:
+            for placeholder in placeholders:
+                self.bot.add_command(placeholder)
+                added.append(placeholder)
+        except commands.CommandRegistrationError as error:
+            logger.warning(f"[延遲載入] {name} 的指令名稱衝突，改為立即載入: {error}")
+            for placeholder in added:
+                self.bot.remove_command(placeholder.name)
+            return False
+
+        self.pending[name] = entry
+        for scope, payloads in entry["app_commands"].items():
+            for key in payloads:
+                self._app_commands[(scope, key)] = name
+        return True
+
+    def discard(self, name: str) -> bool:
+        """Forget a pending extension, as if it had been unloaded."""
+        if self.pending.pop(name, None) is None:
+            return False
+        for command in list(self.bot.commands):
+            if isinstance(command, LazyPrefixCommand) and command.extension == name:
+                self.bot.remove_command(command.name)
+        self._app_commands = {
+            key: owner for key, owner in self._app_commands.items() if owner != name
+        }
+        return True
+
+    def record(self, name: str) -> None:
+        """Rebuild the manifest entry for a loaded extension from the live registries."""
+        full_path = self.extension_path(name)
+        if full_path is None or full_path not in self.bot.extensions:
+            return
+
+        tree = self.bot.tree
+        scopes: list[tuple[str, discord.abc.Snowflake | None]] = [(GLOBAL_SCOPE, None)]
+        guild_ids = set(tree._guild_commands)
+        guild_ids.update(guild_id for (_, guild_id, _) in tree._context_menus if guild_id)
+        scopes.extend((str(guild_id), discord.Object(id=guild_id)) for guild_id in guild_ids)
+
+        app_commands: dict[str, dict[str, Any]] = {}
+        for scope, guild in scopes:
+            for command in tree._get_all_commands(guild=guild):
+                if not _is_submodule(full_path, command.module):
+                    continue
+                payload = command.to_dict(tree)
+                app_commands.setdefault(scope, {})[
+                    f"{payload.get('type', 1)}:{payload['name']}"
+                ] = payload
+
+        self.manifest[name] = {
+            "source_digest": source_digest(self.source_path(name)),
+            "app_commands": app_commands,
+            "prefix_commands": [
+                {
+                    "name": command.name,
+                    "aliases": list(command.aliases),
+                    "help": command.help,
+                    "hidden": command.hidden,
+                }
+                for command in self.bot.commands
+                if _is_submodule(full_path, command.module)
+            ],
+        }
+        try:
+            self.save_manifest()
+        except OSError as error:
+            logger.warning(f"[延遲載入] 無法寫入 manifest: {error}")
+
+    def app_command_payloads(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Payloads of pending extensions, merged into command sync."""
+        merged: dict[str, dict[str, dict[str, Any]]] = {}
+        for entry in self.pending.values():
+            for scope, payloads in entry["app_commands"].items():
+                merged.setdefault(scope, {}).update(payloads)
+        return merged
+
+    def extension_for(self, interaction: discord.Interaction) -> str | None:
+        data: dict[str, Any] = interaction.data or {}  # type: ignore[assignment]
+        if "name" not in data:
+            return None
+        key = f"{data.get('type', 1)}:{data['name']}"
+        scope = str(data["guild_id"]) if "guild_id" in data else GLOBAL_SCOPE
+        return self._app_commands.get((scope, key)) or self._app_commands.get(
+            (GLOBAL_SCOPE, key)
+        )
+
+    async def materialize(self, name: str) -> None:
+        """Import and set up a pending extension, and its pending dependencies first.
+
+        Any failure is raised as :class:`LazyExtensionFailed` so the command
+        tree's error handler can answer the interaction that triggered it.
+        """
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            entry = self.pending.get(name)
+            if entry is None:
+                return
+
+            for dependency in read_dependencies(self.source_path(name)):
+                await self.materialize(dependency)
+
+            full_path = self.extension_path(name)
+            if full_path is None:
+                raise LazyExtensionFailed(name, commands.ExtensionNotFound(name))
+
+            self.discard(name)
+            started = time.perf_counter()
+            try:
+                await self.bot.load_extension(full_path)
+            except Exception as error:
+                self.register(name)
+                raise LazyExtensionFailed(name, error) from error
+            elapsed = time.perf_counter() - started
+            self.materialized[name] = elapsed
+            logger.info(f"[延遲載入] 首次使用，已載入 {name}（{elapsed * 1000:.1f}ms）")
+            self.record(name)
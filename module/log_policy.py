@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import traceback
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from loguru import logger
+
+LOG_LEVELS = ("TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")
+LOG_FORMATS = ("text", "json")
+WARNING_NO = 30
+_RESERVED_EXTRA = frozenset(("cog", "command", "guild", "sampled", "started", "_keep", "_json"))
+
+
+def level_no(name: str) -> int:
+    try:
+        return logger.level(name.upper()).no
+    except ValueError:
+        raise ValueError(f"未知的日誌等級 {name!r}，可用 {', '.join(LOG_LEVELS)}") from None
+
+
+def log_source(name: str | None) -> str:
+    """``cogs.basic`` becomes ``basic``; other modules keep their dotted name."""
+    if not name:
+        return "unknown"
+    package, _, rest = name.partition(".")
+    return rest if package == "cogs" and rest else name
+
+
+@contextmanager
+def command_context(
+    command: str,
+    cog: str | None,
+    guild_id: int | None,
+) -> Iterator[None]:
+    """Attach command fields to every record logged while a command runs."""
+    with logger.contextualize(
+        command=command,
+        cog=cog,
+        guild=guild_id,
+        started=time.perf_counter(),
+    ):
+        yield
+
+
+class _CallSite:
+    __slots__ = ("window", "count", "dropped")
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.count = 0
+        self.dropped = 0
+
+
+class LogPolicy:
+    """Per-cog log levels, INFO sampling and the JSON record format.
+
+    :meth:`filter` is attached to every sink. It decides once per record,
+    so several sinks never sample the same call twice. WARNING and above
+    always pass, whatever the overrides or sample rate say. Below that, each
+    call site logs its first ``sample_burst`` records per second and then
+    only one in ``1 / sample_rate``. The next kept record carries the number
+    that were dropped.
+    """
+
+    def __init__(
+        self,
+        *,
+        level: str = "INFO",
+        overrides: dict[str, str] | None = None,
+        sample_rate: float = 1.0,
+        sample_burst: int = 20,
+        json_format: bool = False,
+    ) -> None:
+        self.level = level.upper()
+        self.overrides: dict[str, str] = {}
+        self.sample_every = max(1, round(1 / sample_rate)) if sample_rate > 0 else 0
+        self.sample_rate = sample_rate
+        self.sample_burst = sample_burst
+        self.json_format = json_format
+        self.dropped = 0
+        self._level_no = level_no(self.level)
+        self._thresholds: dict[str, int] = {}
+        self._call_sites: dict[tuple[str, str, int], _CallSite] = {}
+        self._sinks: list[dict[str, Any]] = []
+        self._handler_ids: list[int] = []
+        for source, override in (overrides or {}).items():
+            self.set_level(source, override)
+
+    @classmethod
+    def from_env(cls, *, debug: bool = False) -> LogPolicy:
+        log_format = os.getenv("LOG_FORMAT", "").strip().lower() or "text"
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"LOG_FORMAT 必須為 {' 或 '.join(LOG_FORMATS)}")
+
+        overrides = {}
+        for item in os.getenv("LOG_LEVELS", "").split(","):
+            if not item.strip():
+                continue
+            source, separator, level = item.partition("=")
+            if not separator or not source.strip():
+                raise ValueError(f"LOG_LEVELS 項目 {item.strip()!r} 應為「名稱=等級」")
+            overrides[source.strip()] = level.strip()
+
+        try:
+            sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "").strip() or 1.0)
+            sample_burst = int(os.getenv("LOG_SAMPLE_BURST", "").strip() or 20)
+        except ValueError as error:
+            raise ValueError("LOG_SAMPLE_RATE 與 LOG_SAMPLE_BURST 必須為數字") from error
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("LOG_SAMPLE_RATE 必須介於 0 與 1 之間")
+
+        return cls(
+            level="DEBUG" if debug else "INFO",
+            overrides=overrides,
+            sample_rate=sample_rate,
+            sample_burst=max(0, sample_burst),
+            json_format=log_format == "json",
+        )
+
+    # Levels -----------------------------------------------------------------
+
+    def min_level(self) -> int:
+        levels = [self._level_no, *(level_no(level) for level in self.overrides.values())]
+        return min(min(levels), WARNING_NO)
+
+    def threshold(self, name: str) -> int:
+        threshold = self._thresholds.get(name)
+        if threshold is None:
+            source = log_source(name)
+            level = self.overrides.get(source)
+            while level is None and "." in source:
+                source = source.rpartition(".")[0]
+                level = self.overrides.get(source)
+            threshold = min(self._level_no if level is None else level_no(level), WARNING_NO)
+            self._thresholds[name] = threshold
+        return threshold
+
+    def set_default_level(self, level: str) -> None:
+        self._level_no = level_no(level)
+        self.level = level.upper()
+        self._thresholds.clear()
+        self._reinstall()
+
+    def set_level(self, source: str, level: str | None) -> None:
+        """Override the level of one cog or module, or clear it with ``None``."""
+        if level is None:
+            self.overrides.pop(source, None)
+        else:
+            level_no(level)
+            self.overrides[source] = level.upper()
+        self._thresholds.clear()
+        self._reinstall()
+
+    def describe(self) -> str:
+        overrides = ", ".join(f"{source}={level}" for source, level in sorted(self.overrides.items()))
+        sampling = (
+            "不抽樣"
+            if self.sample_rate >= 1
+            else f"每秒前 {self.sample_burst} 筆後保留 {self.sample_rate:.0%}"
+        )
+        return (
+            f"預設 {self.level}，覆寫 {overrides or '無'}，{sampling}，"
+            f"格式 {'JSON' if self.json_format else '文字'}"
+        )
+
+    # Sinks ------------------------------------------------------------------
+
+    def install(self, sinks: list[dict[str, Any]]) -> None:
+        """Add ``sinks`` (``logger.add`` keyword arguments) governed by this policy.
+
+        A sink's ``level`` acts as a floor; the handler level is lowered to
+        the most verbose override so cheap level checks still reject
+        everything no sink wants.
+        """
+        self._sinks = sinks
+        self._reinstall()
+
+    def _reinstall(self) -> None:
+        if not self._sinks:
+            return
+        for handler_id in self._handler_ids:
+            logger.remove(handler_id)
+        minimum = self.min_level()
+        self._handler_ids = []
+        for sink in self._sinks:
+            options = dict(sink)
+            options["level"] = max(minimum, level_no(options.get("level", "TRACE")))
+            options["filter"] = self.filter
+            if self.json_format:
+                options["format"] = self.format_json
+                options.pop("colorize", None)
+            self._handler_ids.append(logger.add(**options))
+
+    # Records ----------------------------------------------------------------
+
+    def _sample(self, record: dict[str, Any]) -> bool:
+        if self.sample_every == 1:
+            return True
+        key = (record["name"], record["function"], record["line"])
+        window = int(time.monotonic())
+        site = self._call_sites.get(key)
+        if site is None:
+            if len(self._call_sites) >= 10_000:
+                self._call_sites.clear()
+            site = self._call_sites[key] = _CallSite(window)
+        elif site.window != window:
+            site.window, site.count = window, 0
+        site.count += 1
+        overflow = site.count - self.sample_burst
+        if overflow <= 0 or (self.sample_every and overflow % self.sample_every == 0):
+            if site.dropped:
+                record["extra"]["sampled"] = site.dropped
+                site.dropped = 0
+            return True
+        site.dropped += 1
+        self.dropped += 1
+        return False
+
+    def filter(self, record: dict[str, Any]) -> bool:
+        extra = record["extra"]
+        keep = extra.get("_keep")
+        if keep is None:
+            level = record["level"].no
+            if level >= WARNING_NO:
+                keep = True
+            else:
+                keep = level >= self.threshold(record["name"]) and self._sample(record)
+            extra["_keep"] = keep
+        return keep
+
+    def format_json(self, record: dict[str, Any]) -> str:
+        extra = record["extra"]
+        if "_json" not in extra:
+            # Stash the line in extra so braces in it are not parsed as a
+            # template, and so every sink writes the same line.
+            extra["_json"] = self._serialize(record)
+        return "{extra[_json]}\n"
+
+    def _serialize(self, record: dict[str, Any]) -> str:
+        extra = record["extra"]
+        payload: dict[str, Any] = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "logger": record["name"],
+            "cog": extra.get("cog") or log_source(record["name"]),
+            "function": record["function"],
+            "line": record["line"],
+        }
+        for field in ("command", "guild", "sampled"):
+            if extra.get(field) is not None:
+                payload[field] = extra[field]
+        started = extra.get("started")
+        if started is not None:
+            payload["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        for key, value in extra.items():
+            if key not in payload and key not in _RESERVED_EXTRA:
+                payload[key] = value
+        exception = record["exception"]
+        if exception is not None:
+            payload["exception"] = "".join(
+                traceback.format_exception(exception.type, exception.value, exception.traceback)
+            )
+        return json.dumps(payload, ensure_ascii=False, default=str)
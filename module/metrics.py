@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from typing import Literal
+
+from aiohttp import web
+from loguru import logger
+
+CommandKind = Literal["prefix", "slash", "hybrid"]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = "discord_bot"
+MAX_PENDING_INVOCATIONS = 10_000
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def histogram_lines(metric: str, labels: dict[str, str], stats: CommandStats) -> list[str]:
+    """Prometheus ``_bucket``/``_sum``/``_count`` lines for one labelled histogram."""
+    label_text = ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+    lines = []
+    cumulative = 0
+    for bound, count in zip((*LATENCY_BUCKETS, float("inf")), stats.buckets):
+        cumulative += count
+        lines.append(f'{metric}_bucket{{{label_text},le="{_format_bound(bound)}"}} {cumulative}')
+    lines.append(f"{metric}_sum{{{label_text}}} {stats.latency_sum}")
+    lines.append(f"{metric}_count{{{label_text}}} {stats.invocations}")
+    return lines
+
+
+class CommandStats:
+    """Fixed-bucket counters for one command; observing never allocates containers."""
+
+    __slots__ = ("invocations", "errors", "latency_sum", "buckets")
+
+    def __init__(self) -> None:
+        self.invocations = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, elapsed: float, *, failed: bool) -> None:
+        self.invocations += 1
+        if failed:
+            self.errors += 1
+        self.latency_sum += elapsed
+        self.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile as the upper bound of its bucket."""
+        if not self.invocations:
+            return 0.0
+
+        target = q * self.invocations
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, float("inf")), self.buckets):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Per-command invocation, error and latency metrics plus callback gauges and counters."""
+
+    def __init__(self) -> None:
+        self.commands: dict[tuple[CommandKind, str], CommandStats] = {}
+        self._gauges: dict[str, tuple[str, Callable[[], float]]] = {}
+        self._counters: dict[str, tuple[str, Callable[[], float]]] = {}
+        self._collectors: list[Callable[[], list[str]]] = []
+        self._pending: dict[int, float] = {}
+
+    def start(self, key: int) -> None:
+        """Remember when an invocation identified by ``key`` started."""
+        if len(self._pending) >= MAX_PENDING_INVOCATIONS:
+            del self._pending[next(iter(self._pending))]
+        self._pending[key] = time.perf_counter()
+
+    def finish(
+        self,
+        key: int,
+        kind: CommandKind,
+        command: str,
+        *,
+        failed: bool = False,
+    ) -> None:
+        started = self._pending.pop(key, None)
+        if started is not None:
+            self.observe(kind, command, time.perf_counter() - started, failed=failed)
+
+    def observe(
+        self,
+        kind: CommandKind,
+        command: str,
+        elapsed: float,
+        *,
+        failed: bool = False,
+    ) -> None:
+        key = (kind, command)
+        stats = self.commands.get(key)
+        if stats is None:
+            stats = self.commands[key] = CommandStats()
+        stats.observe(elapsed, failed=failed)
+
+    def register_gauge(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], float],
+    ) -> None:
+        """Export the current level returned by ``callback``, e.g. a queue depth."""
+        self._gauges[name] = (description, callback)
+
+    def register_counter(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], float],
+    ) -> None:
+        """Export a running total that only grows, so ``rate()`` can be used on it."""
+        if not name.endswith("_total"):
+            raise ValueError(f"counter 名稱必須以 _total 結尾: {name}")
+        self._counters[name] = (description, callback)
+
+    def register_collector(self, collector: Callable[[], list[str]]) -> None:
+        """Append the exposition lines returned by ``collector`` to every scrape."""
+        self._collectors.append(collector)
+
+    def top(self, limit: int = 10) -> list[tuple[CommandKind, str, CommandStats]]:
+        return [
+            (kind, command, stats)
+            for (kind, command), stats in sorted(
+                self.commands.items(),
+                key=lambda item: item[1].invocations,
+                reverse=True,
+            )[:limit]
+        ]
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+        invocations = f"{METRIC_PREFIX}_command_invocations_total"
+        errors = f"{METRIC_PREFIX}_command_errors_total"
+        latency = f"{METRIC_PREFIX}_command_latency_seconds"
+
+        lines.append(f"# HELP {invocations} Command invocations.")
+        lines.append(f"# TYPE {invocations} counter")
+        for (kind, command), stats in self.commands.items():
+            labels = f'command="{_escape_label(command)}",kind="{kind}"'
+            lines.append(f"{invocations}{{{labels}}} {stats.invocations}")
+
+        lines.append(f"# HELP {errors} Command invocations that failed.")
+        lines.append(f"# TYPE {errors} counter")
+        for (kind, command), stats in self.commands.items():
+            labels = f'command="{_escape_label(command)}",kind="{kind}"'
+            lines.append(f"{errors}{{{labels}}} {stats.errors}")
+
+        lines.append(f"# HELP {latency} Command latency in seconds.")
+        lines.append(f"# TYPE {latency} histogram")
+        for (kind, command), stats in self.commands.items():
+            lines.extend(histogram_lines(latency, {"command": command, "kind": kind}, stats))
+
+        for metric_type, series in (("gauge", self._gauges), ("counter", self._counters)):
+            for name, (description, callback) in series.items():
+                metric = f"{METRIC_PREFIX}_{name}"
+                try:
+                    value = float(callback())
+                except Exception as error:
+                    logger.warning(f"[效能指標] 讀取 {name} 失敗: {error}")
+                    continue
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} {metric_type}")
+                lines.append(f"{metric} {value}")
+
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as error:
+                logger.warning(f"[效能指標] 收集 {collector} 失敗: {error}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve ``/metrics`` in Prometheus text format on a local port."""
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: web.AppRunner | None = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        del request
+        return web.Response(
+            text=self.registry.render_prometheus(),
+            content_type="text/plain",
+            headers={"X-Content-Type-Options": "nosniff"},
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"[效能指標] Prometheus 端點: http://{self.host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import heapq
+import itertools
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any
+
+from discord.http import HTTPClient
+from discord.webhook.async_ import async_context
+
+
+class Priority(IntEnum):
+    """Outbound request classes; lower values are sent first."""
+
+    INTERACTION = 0
+    REPLY = 1
+    OPS = 2
+
+
+INTERACTION_CALLBACK_PATHS = frozenset({"/interactions/{webhook_id}/{webhook_token}/callback"})
+MESSAGE_EDIT_PATHS = frozenset(
+    {
+        "/channels/{channel_id}/messages/{message_id}",
+        "/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}",
+        "/webhooks/{webhook_id}/{webhook_token}/messages/@original",
+    }
+)
+
+# Keyword arguments that make discord.py send a multipart body instead of JSON.
+MULTIPART_ARGUMENTS = ("files", "form", "multipart")
+
+current_priority: ContextVar[Priority] = ContextVar("outbound_priority", default=Priority.REPLY)
+_holding_slot: ContextVar[bool] = ContextVar("outbound_holding_slot", default=False)
+
+
+@contextmanager
+def prioritize(priority: Priority) -> Iterator[None]:
+    """Send every REST request made inside the block with ``priority``."""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+@dataclass(slots=True)
+class _BucketGate:
+    lock: asyncio.Lock
+    users: int = 0
+
+
+@dataclass(slots=True)
+class _PendingEdit:
+    payload: dict[str, Any]
+    result: asyncio.Future[Any] | None = None
+
+
+class OutboundScheduler:
+    """Limit concurrent REST requests and hand free slots out by priority.
+
+    Interaction callbacks use :attr:`Priority.INTERACTION` and skip the
+    limit entirely, since Discord expects them within 3 seconds. Other
+    requests take the class set with :func:`prioritize` (``REPLY`` by
+    default). Requests to the same rate limit bucket (route and major
+    parameters) are sent one at a time and only take a slot when they reach
+    the front of their bucket. A channel stuck in a 429 back-off therefore
+    holds at most one slot, however many requests are queued for it. An edit to a message that is still queued is merged into the
+    queued JSON payload field by field instead of adding a second request,
+    and every caller receives the result of the merged edit.
+    """
+
+    def __init__(self, *, concurrency: int = 8) -> None:
+        self.concurrency = concurrency
+        self.coalesced = 0
+        self.active = 0
+        self._depth: Counter[Priority] = Counter()
+        self._waiting: list[tuple[Priority, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._edits: dict[str, _PendingEdit] = {}
+        self._buckets: dict[str, _BucketGate] = {}
+
+    def depth(self, priority: Priority | None = None) -> int:
+        """Requests waiting for a slot, optionally of a single priority."""
+        if priority is None:
+            return sum(self._depth.values())
+        return self._depth[priority]
+
+    async def _acquire(self, priority: Priority) -> None:
+        if self.active < self.concurrency and not self._waiting:
+            self.active += 1
+            return
+
+        granted = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._sequence), granted))
+        self._depth[priority] += 1
+        try:
+            await granted
+        except asyncio.CancelledError:
+            if granted.cancelled():
+                self._depth[priority] -= 1
+            else:
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self.active -= 1
+        while self._waiting and self.active < self.concurrency:
+            priority, _, granted = heapq.heappop(self._waiting)
+            if granted.cancelled():
+                continue
+            self._depth[priority] -= 1
+            self.active += 1
+            granted.set_result(None)
+
+    async def run(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        priority: Priority | None = None,
+        bucket: str | None = None,
+    ) -> Any:
+        """Await ``factory()`` once a slot is free.
+
+        With a ``bucket``, the request first waits for earlier requests to
+        the same bucket to finish, without holding a slot meanwhile.
+        """
+        if _holding_slot.get():
+            return await factory()
+        if priority is None:
+            priority = current_priority.get()
+        if priority is Priority.INTERACTION:
+            return await factory()
+
+        gate = None
+        if bucket is not None:
+            gate = self._buckets.get(bucket)
+            if gate is None:
+                gate = self._buckets[bucket] = _BucketGate(asyncio.Lock())
+            gate.users += 1
+        try:
+            if gate is not None:
+                await gate.lock.acquire()
+            try:
+                await self._acquire(priority)
+                token = _holding_slot.set(True)
+                try:
+                    return await factory()
+                finally:
+                    _holding_slot.reset(token)
+                    self._release()
+            finally:
+                if gate is not None:
+                    gate.lock.release()
+        finally:
+            if gate is not None:
+                gate.users -= 1
+                if not gate.users:
+                    del self._buckets[bucket]
+
+    async def edit(
+        self,
+        key: str,
+        payload: dict[str, Any],
+        send: Callable[[dict[str, Any]], Awaitable[Any]],
+        *,
+        priority: Priority | None = None,
+        bucket: str | None = None,
+    ) -> Any:
+        """Send a partial-update ``payload`` for ``key`` once a slot is free.
+
+        While an edit for the same ``key`` is still queued, later payloads
+        are merged into it (later fields win, untouched fields are kept) and
+        all callers get the result of the single merged request.
+        """
+        pending = self._edits.get(key)
+        if pending is not None:
+            pending.payload.update(payload)
+            if pending.result is None:
+                pending.result = asyncio.get_running_loop().create_future()
+            self.coalesced += 1
+            return await asyncio.shield(pending.result)
+        pending = self._edits[key] = _PendingEdit(dict(payload))
+
+        async def send_merged() -> Any:
+            # Later edits must queue again rather than join a request already in flight.
+            self.detach(key, pending)
+            return await send(pending.payload)
+
+        try:
+            result = await self.run(send_merged, priority=priority, bucket=bucket)
+        except asyncio.CancelledError:
+            self.detach(key, pending)
+            if pending.result is not None:
+                pending.result.cancel()
+            raise
+        except Exception as error:
+            if pending.result is not None:
+                pending.result.set_exception(error)
+            raise
+        if pending.result is not None:
+            pending.result.set_result(result)
+        return result
+
+    def detach(self, key: str, pending: _PendingEdit | None = None) -> None:
+        """Stop later edits for ``key`` from merging into the one already queued."""
+        if pending is None or self._edits.get(key) is pending:
+            self._edits.pop(key, None)
+
+    def wrap(self, request: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Route a discord.py ``request(route, ...)`` method through the scheduler."""
+
+        @functools.wraps(request)
+        async def scheduled(route: Any, *args: Any, **kwargs: Any) -> Any:
+            if route.path in INTERACTION_CALLBACK_PATHS:
+                return await self.run(
+                    lambda: request(route, *args, **kwargs),
+                    priority=Priority.INTERACTION,
+                )
+            bucket = f"{route.key}:{route.major_parameters}"
+            if route.method == "PATCH" and route.path in MESSAGE_EDIT_PATHS:
+                key = f"{route.url}?{kwargs.get('params') or ''}"
+                # HTTPClient passes the body as ``json``, the webhook adapter as ``payload``.
+                field = next(
+                    (name for name in ("json", "payload") if kwargs.get(name) is not None),
+                    None,
+                )
+                if field is None or any(kwargs.get(name) for name in MULTIPART_ARGUMENTS):
+                    # File uploads cannot be merged, and later edits must not overtake them.
+                    self.detach(key)
+                else:
+                    return await self.edit(
+                        key,
+                        kwargs[field],
+                        lambda payload: request(route, *args, **{**kwargs, field: payload}),
+                        bucket=bucket,
+                    )
+            return await self.run(lambda: request(route, *args, **kwargs), bucket=bucket)
+
+        scheduled.scheduler = self  # type: ignore[attr-defined]
+        return scheduled
+
+    def install(self, http: HTTPClient) -> None:
+        """Schedule the bot's HTTP client and the webhook adapter used by interactions.
+
+        The webhook adapter is shared by the whole process, so a wrapper left
+        by an earlier scheduler is peeled off instead of stacked under ours.
+        """
+        adapter = async_context.get()
+        for target in (http, adapter):
+            request = target.request
+            if getattr(request, "scheduler", None) is self:
+                continue
+            while getattr(request, "scheduler", None) is not None:
+                request = request.__wrapped__
+            target.request = self.wrap(request)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from discord import app_commands
+from discord.ext import commands
+from loguru import logger
+
+RATE_LIMIT_ATTRIBUTE = "rate_limits"
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """Allow ``capacity`` commands per ``per`` seconds, refilling continuously."""
+
+    capacity: int
+    per: float
+
+    @property
+    def interval(self) -> float:
+        """Seconds it takes to refill one token."""
+        return self.per / self.capacity
+
+    @classmethod
+    def parse(cls, value: str) -> RateLimit | None:
+        """Parse ``"count/seconds"``, e.g. ``"5/10"``; empty or invalid disables the limit."""
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            capacity, per = value.split("/", 1)
+            limit = cls(int(capacity), float(per))
+        except ValueError:
+            logger.warning(f"[限流] 無法解析限流設定 {value!r}，應為「次數/秒數」")
+            return None
+        if limit.capacity <= 0 or limit.per <= 0:
+            logger.warning(f"[限流] 限流設定 {value!r} 必須為正數")
+            return None
+        return limit
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitPolicy:
+    """Per-user and per-guild limits; ``None`` leaves that dimension unlimited.
+
+    Cogs opt in by setting a ``rate_limits`` class attribute; commands
+    without one use the bot-wide default.
+    """
+
+    user: RateLimit | None = None
+    guild: RateLimit | None = None
+
+
+class RateLimited(commands.CheckFailure, app_commands.CheckFailure):
+    """Raised by the rate limit checks; ``notify`` is only set on the first rejection."""
+
+    def __init__(self, retry_after: float, *, notify: bool) -> None:
+        self.retry_after = retry_after
+        self.notify = notify
+        super().__init__(f"指令使用過於頻繁，請在 {retry_after:.1f} 秒後再試。")
+
+
+BucketKey = tuple[str, int, str]
+
+
+class RateLimiter:
+    """Token buckets keyed by (user or guild, id, command).
+
+    Each bucket is stored as a single float: the monotonic time at which it
+    will be full again. A hit pushes that time forward by one refill
+    interval and is rejected if it would end up more than ``per`` seconds
+    ahead. Buckets whose time has passed are full, so the periodic sweep
+    simply drops them.
+    """
+
+    def __init__(
+        self,
+        default: RateLimitPolicy,
+        *,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.default = default
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.rejected = 0
+        self._full_at: dict[BucketKey, float] = {}
+        self._notified: set[BucketKey] = set()
+        self._next_sweep = clock() + sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._full_at)
+
+    def policy_for(self, cog: object | None) -> RateLimitPolicy:
+        policy = getattr(cog, RATE_LIMIT_ATTRIBUTE, None)
+        return policy if isinstance(policy, RateLimitPolicy) else self.default
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop buckets that have refilled completely; return how many were dropped."""
+        now = self.clock() if now is None else now
+        idle = [key for key, full_at in self._full_at.items() if full_at <= now]
+        for key in idle:
+            del self._full_at[key]
+            self._notified.discard(key)
+        self._next_sweep = now + self.sweep_interval
+        return len(idle)
+
+    def hit(
+        self,
+        command: str,
+        user_id: int,
+        guild_id: int | None,
+        policy: RateLimitPolicy,
+    ) -> None:
+        """Consume one token from each applicable bucket or raise :class:`RateLimited`.
+
+        Nothing is consumed unless every bucket has a token available.
+        """
+        now = self.clock()
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+        buckets: list[tuple[BucketKey, RateLimit]] = []
+        if policy.user is not None:
+            buckets.append((("user", user_id, command), policy.user))
+        if policy.guild is not None and guild_id is not None:
+            buckets.append((("guild", guild_id, command), policy.guild))
+
+        updates = []
+        exhausted = []
+        retry_after = 0.0
+        for key, limit in buckets:
+            full_at = max(self._full_at.get(key, now), now) + limit.interval
+            overflow = full_at - now - limit.per
+            if overflow > 1e-9:
+                exhausted.append(key)
+                retry_after = max(retry_after, overflow)
+            updates.append((key, full_at))
+
+        if exhausted:
+            self.rejected += 1
+            notify = not any(key in self._notified for key in exhausted)
+            self._notified.update(exhausted)
+            raise RateLimited(retry_after, notify=notify)
+
+        for key, full_at in updates:
+            self._full_at[key] = full_at
+            self._notified.discard(key)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from collections import Counter, OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+import discord
+from discord.ext import commands
+
+ResponseKey = tuple[str, Hashable]
+
+
+def interaction_key(interaction: discord.Interaction) -> tuple[str, int]:
+    """Locale and channel permission bits of the invoking user."""
+    return str(interaction.locale), interaction.permissions.value
+
+
+def context_key(ctx: commands.Context) -> tuple[str, int]:
+    if ctx.interaction is not None:
+        return interaction_key(ctx.interaction)
+    locale = "dm" if ctx.guild is None else str(ctx.guild.preferred_locale)
+    return locale, ctx.permissions.value
+
+
+class ResponseCache:
+    """LRU cache for rendered responses of idempotent commands.
+
+    Entries are keyed by command name plus a caller-supplied key, normally
+    locale and permission bits since those decide what a user may see.
+    Everything is dropped on :meth:`invalidate`, which the bot calls whenever
+    an extension is loaded, unloaded or reloaded.
+    """
+
+    def __init__(self, *, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self._entries: OrderedDict[ResponseKey, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, command: str, key: Hashable) -> Any | None:
+        entry_key = (command, key)
+        value = self._entries.get(entry_key)
+        if value is None:
+            self.misses[command] += 1
+            return None
+        self._entries.move_to_end(entry_key)
+        self.hits[command] += 1
+        return value
+
+    def put(self, command: str, key: Hashable, value: Any) -> None:
+        self._entries[(command, key)] = value
+        self._entries.move_to_end((command, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def hit_ratio(self, command: str | None = None) -> float:
+        if command is None:
+            hits, misses = self.hits.total(), self.misses.total()
+        else:
+            hits, misses = self.hits[command], self.misses[command]
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    def summary_lines(self) -> list[str]:
+        return [
+            f"`{command}` - 命中 {self.hits[command]} / "
+            f"{self.hits[command] + self.misses[command]}（{self.hit_ratio(command):.0%}）"
+            for command in sorted(self.hits.keys() | self.misses.keys())
+        ]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+import discord
+from loguru import logger
+
+T = TypeVar("T")
+
+EAGER_TASKS_SUPPORTED = sys.version_info >= (3, 12)
+RUNTIME_MODES = ("default", "performance")
+
+# discord.py already switches to orjson by itself when it is importable.
+_default_from_json = discord.utils._from_json
+_DEFAULT_JSON = "orjson" if discord.utils.HAS_ORJSON else "json"
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeMode:
+    """Which event loop and JSON optimisations to try before starting the bot."""
+
+    uvloop: bool = False
+    eager_tasks: bool = False
+    fast_json: bool = False
+
+    @classmethod
+    def named(cls, name: str) -> RuntimeMode:
+        match name:
+            case "default":
+                return cls()
+            case "performance":
+                return cls(uvloop=True, eager_tasks=True, fast_json=True)
+        raise ValueError(f"RUNTIME_MODE 必須為 {' 或 '.join(RUNTIME_MODES)}，收到 {name!r}")
+
+    @classmethod
+    def from_env(cls) -> RuntimeMode:
+        return cls.named(os.getenv("RUNTIME_MODE", "").strip().lower() or "default")
+
+
+def _uvloop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+def _fast_json_decoder() -> tuple[str, Callable[[str | bytes], Any]] | None:
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        return "orjson", orjson.loads
+    try:
+        import msgspec.json
+    except ImportError:
+        return None
+    return "msgspec", msgspec.json.decode
+
+
+def _eager_task_factory(
+    loop: asyncio.AbstractEventLoop,
+    coro: Coroutine[Any, Any, Any],
+    *,
+    eager_start: bool | None = None,
+    **kwargs: Any,
+) -> asyncio.Task[Any]:
+    # asyncio.eager_task_factory rejects the eager_start=None that uvloop
+    # passes to custom factories, so it cannot be combined with uvloop.
+    return asyncio.Task(
+        coro,
+        loop=loop,
+        eager_start=True if eager_start is None else eager_start,
+        **kwargs,
+    )
+
+
+@dataclass(slots=True)
+class Runtime:
+    """The optimisations that were actually available for a :class:`RuntimeMode`.
+
+    Anything requested but missing falls back to the standard library, so a
+    performance mode never prevents the bot from starting.
+    """
+
+    loop: str = "asyncio"
+    eager_tasks: bool = False
+    json: str = _DEFAULT_JSON
+    loop_factory: Callable[[], asyncio.AbstractEventLoop] | None = field(
+        default=None,
+        repr=False,
+    )
+
+    @classmethod
+    def prepare(cls, mode: RuntimeMode) -> Runtime:
+        runtime = cls()
+        if mode.uvloop:
+            factory = _uvloop_factory()
+            if factory is None:
+                logger.info("[執行環境] 未安裝 uvloop，使用 asyncio 事件迴圈")
+            else:
+                runtime.loop, runtime.loop_factory = "uvloop", factory
+        if mode.eager_tasks:
+            if EAGER_TASKS_SUPPORTED:
+                runtime.eager_tasks = True
+            else:
+                logger.info("[執行環境] eager task factory 需要 Python 3.12 以上，已略過")
+
+        decoder = _fast_json_decoder() if mode.fast_json else None
+        if mode.fast_json and decoder is None:
+            logger.info("[執行環境] 未安裝 orjson 或 msgspec，使用標準 json 解析")
+        if decoder is None:
+            discord.utils._from_json = _default_from_json
+        else:
+            runtime.json, discord.utils._from_json = decoder
+        return runtime
+
+    def describe(self) -> str:
+        return (
+            f"事件迴圈 {self.loop}，eager tasks {'開啟' if self.eager_tasks else '關閉'}，"
+            f"JSON 解析 {self.json}"
+        )
+
+    def run(self, main: Coroutine[Any, Any, T]) -> T:
+        """Run ``main`` like :func:`asyncio.run` on this runtime's event loop."""
+        with asyncio.Runner(loop_factory=self.loop_factory) as runner:
+            if self.eager_tasks:
+                runner.get_loop().set_task_factory(_eager_task_factory)
+            return runner.run(main)
+
+    def run_client(self, client: discord.Client, token: str) -> None:
+        """Equivalent of ``client.run(token)`` on this runtime's event loop."""
+        if self.loop_factory is None and not self.eager_tasks:
+            client.run(token)
+            return
+
+        async def runner() -> None:
+            async with client:
+                await client.start(token)
+
+        discord.utils.setup_logging()
+        try:
+            self.run(runner())
+        except KeyboardInterrupt:
+            return
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Literal
+
+ShardMode = Literal["single", "auto", "range"]
+SHARD_MODES: tuple[ShardMode, ...] = ("single", "auto", "range")
+
+
+def parse_shard_ids(value: str) -> list[int]:
+    """Parse ``"0-3,8"`` style shard ID lists into a sorted, de-duplicated list."""
+    shard_ids: set[int] = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, separator, end = part.partition("-")
+        first = int(start)
+        last = int(end) if separator else first
+        if first < 0 or last < first:
+            raise ValueError(f"無效的分片範圍: {part}")
+        shard_ids.update(range(first, last + 1))
+    return sorted(shard_ids)
+
+
+@dataclass(frozen=True, slots=True)
+class ShardConfig:
+    mode: ShardMode = "single"
+    shard_count: int | None = 1
+    shard_ids: list[int] | None = None
+
+    @classmethod
+    def from_env(cls) -> ShardConfig:
+        mode = os.getenv("SHARD_MODE", "single").strip().lower() or "single"
+        if mode not in SHARD_MODES:
+            raise ValueError(f"SHARD_MODE 必須是 {', '.join(SHARD_MODES)} 其中之一")
+
+        raw_count = os.getenv("SHARD_COUNT", "").strip()
+        raw_ids = os.getenv("SHARD_IDS", "").strip()
+        try:
+            shard_count = int(raw_count) if raw_count else None
+            shard_ids = parse_shard_ids(raw_ids) if raw_ids else None
+        except ValueError as error:
+            raise ValueError(f"SHARD_COUNT 或 SHARD_IDS 格式錯誤: {error}") from error
+
+        if shard_count is not None and shard_count < 1:
+            raise ValueError("SHARD_COUNT 必須大於 0")
+
+        match mode:
+            case "single":
+                return cls("single", 1, None)
+            case "auto":
+                return cls("auto", shard_count, None)
+            case _:
+                if shard_count is None or not shard_ids:
+                    raise ValueError("SHARD_MODE=range 需要同時設定 SHARD_COUNT 與 SHARD_IDS")
+                if shard_ids[-1] >= shard_count:
+                    raise ValueError("SHARD_IDS 不可大於或等於 SHARD_COUNT")
+                return cls("range", shard_count, shard_ids)
+
+    def describe(self) -> str:
+        if self.mode == "range":
+            return f"分片 {self.shard_ids} / 共 {self.shard_count} 個"
+        if self.shard_count is None:
+            return "自動分片（使用 Discord 建議數量）"
+        return f"{self.shard_count} 個分片"
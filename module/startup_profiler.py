@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def current_rss() -> int | None:
+    """Return the resident set size in bytes, or ``None`` if unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is a peak rather than current value: KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def process_age() -> float | None:
+    """Seconds since this process was created, from ``/proc`` when available."""
+    try:
+        with open("/proc/self/stat", "rb") as stat:
+            fields = stat.read().rsplit(b")", 1)[1].split()
+        with open("/proc/uptime", "rb") as uptime:
+            uptime_seconds = float(uptime.read().split()[0])
+        return uptime_seconds - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def parse_import_times(
+    text: str,
+    limit: int = 25,
+    *,
+    root: str | None = None,
+) -> list[dict[str, Any]]:
+    """Return the slowest top-level imports from ``-X importtime`` output.
+
+    With ``root``, return the modules imported directly by ``root`` instead,
+    e.g. ``root="main"`` for the output of ``python -X importtime -c "import main"``.
+    """
+    imports: list[dict[str, Any]] = []
+    children: list[dict[str, Any]] = []
+    for line in text.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match is None:
+            continue
+        item = {
+            "module": match.group(4),
+            "self_ms": int(match.group(1)) / 1000,
+            "cumulative_ms": int(match.group(2)) / 1000,
+        }
+        depth = len(match.group(3)) // 2
+        if root is None:
+            if not depth:
+                imports.append(item)
+        elif depth == 1:
+            children.append(item)
+        elif not depth:
+            # Output is post-order: a module's children are listed right before it.
+            if item["module"] == root:
+                imports = children
+            children = []
+    imports.sort(key=lambda item: item["cumulative_ms"], reverse=True)
+    return imports[:limit]
+
+
+@dataclass(slots=True)
+class Phase:
+    name: str
+    start_ms: float
+    elapsed_ms: float
+    rss_before: int | None
+    rss_after: int | None
+
+    @property
+    def rss_delta(self) -> int | None:
+        if self.rss_before is None or self.rss_after is None:
+            return None
+        return self.rss_after - self.rss_before
+
+
+class StartupProfiler:
+    """Record a wall-time and RSS timeline of the boot sequence.
+
+    Recording is only a few ``perf_counter`` calls and ``/proc`` reads per
+    phase, so it is always on; the caller decides whether to :meth:`write`
+    the report once the bot is ready.
+    """
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.phases: list[Phase] = []
+        self.finished = False
+        self._open: dict[str, tuple[float, int | None]] = {}
+
+        age = process_age()
+        if age is not None:
+            # Interpreter start-up plus every import up to this point.
+            self.phases.append(
+                Phase("interpreter+imports", -age * 1000, age * 1000, None, current_rss())
+            )
+
+    def _offset_ms(self, timestamp: float) -> float:
+        return (timestamp - self.origin) * 1000
+
+    def begin(self, name: str) -> None:
+        self._open[name] = (time.perf_counter(), current_rss())
+
+    def end(self, name: str) -> None:
+        opened = self._open.pop(name, None)
+        if opened is None:
+            return
+        started, rss_before = opened
+        ended = time.perf_counter()
+        self.phases.append(
+            Phase(
+                name,
+                self._offset_ms(started),
+                (ended - started) * 1000,
+                rss_before,
+                current_rss(),
+            )
+        )
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def report(self, **extra: Any) -> dict[str, Any]:
+        return {
+            "recorded_at": datetime.now(UTC).isoformat(),
+            "python": sys.version.split()[0],
+            "total_ms": self._offset_ms(time.perf_counter()),
+            "rss": current_rss(),
+            "phases": [
+                asdict(phase) | {"rss_delta": phase.rss_delta}
+                for phase in sorted(self.phases, key=lambda item: item.start_ms)
+            ],
+            **extra,
+        }
+
+    @staticmethod
+    def summary_lines(report: dict[str, Any]) -> list[str]:
+        lines = []
+        for phase in report["phases"]:
+            delta = phase["rss_delta"]
+            if delta is not None:
+                rss = f"  RSS {delta / 1048576:+.1f}MB"
+            elif phase["rss_after"] is not None:
+                rss = f"  RSS {phase['rss_after'] / 1048576:.1f}MB"
+            else:
+                rss = ""
+            lines.append(
+                f"{phase['name']:<28} @{phase['start_ms']:9.1f}ms "
+                f"{phase['elapsed_ms']:9.1f}ms{rss}"
+            )
+        lines.append(f"{'total':<28} {report['total_ms']:21.1f}ms")
+        return lines
+
+    def write(self, directory: Path, **extra: Any) -> tuple[Path, dict[str, Any]]:
+        """Write the report as ``startup-profile-<timestamp>.json`` under ``directory``."""
+        report = self.report(**extra)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"startup-profile-{datetime.now(UTC):%Y%m%dT%H%M%SZ}.json"
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=4), encoding="utf-8")
+        self.finished = True
+        return path, report
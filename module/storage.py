@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+Parameters = Sequence[Any] | dict[str, Any]
+
+KV_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class WriteResult:
+    rowcount: int
+    lastrowid: int | None
+
+
+@dataclass(slots=True)
+class _Statement:
+    sql: str
+    parameters: Parameters | Iterable[Parameters] = ()
+    many: bool = False
+
+
+@dataclass(slots=True)
+class _WriteOp:
+    statements: list[_Statement]
+    future: asyncio.Future[WriteResult]
+    script: str | None = None
+
+
+@dataclass(slots=True)
+class Transaction:
+    """Statements collected inside :meth:`Storage.transaction`, committed together."""
+
+    statements: list[_Statement] = field(default_factory=list)
+
+    def execute(self, sql: str, parameters: Parameters = ()) -> None:
+        self.statements.append(_Statement(sql, parameters))
+
+    def executemany(self, sql: str, parameters: Iterable[Parameters]) -> None:
+        self.statements.append(_Statement(sql, list(parameters), many=True))
+
+
+class Storage:
+    """SQLite storage in WAL mode behind an async API.
+
+    Reads run on a small thread pool where every thread keeps its own
+    connection. Writes go through a single writer thread: whatever is queued
+    while the previous commit runs is applied as one transaction (group
+    commit), each operation inside its own savepoint so one failing write
+    does not take the rest of the batch down. Connections keep sqlite3's
+    statement cache, so repeated SQL is only prepared once per connection.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        readers: int = 4,
+        max_batch: int = 256,
+        statement_cache: int = 256,
+    ) -> None:
+        self.path = path
+        self.readers = readers
+        self.max_batch = max_batch
+        self.statement_cache = statement_cache
+        self.batches = 0
+        self.writes = 0
+        self._pending: deque[_WriteOp] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._writer_task: asyncio.Task[None] | None = None
+        self._write_executor: ThreadPoolExecutor | None = None
+        self._read_executor: ThreadPoolExecutor | None = None
+        self._write_connection: sqlite3.Connection | None = None
+        self._read_connections: list[sqlite3.Connection] = []
+        self._local = threading.local()
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer_task is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.statement_cache,
+        )
+        connection.execute("PRAGMA busy_timeout = 5000")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _open_writer(self) -> None:
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.executescript(KV_SCHEMA)
+        self._write_connection = connection
+
+    def _open_reader(self) -> None:
+        connection = self._connect()
+        connection.execute("PRAGMA query_only = ON")
+        self._local.connection = connection
+        self._read_connections.append(connection)
+
+    async def open(self) -> None:
+        if self.is_open:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="storage-writer")
+        self._read_executor = ThreadPoolExecutor(
+            self.readers,
+            thread_name_prefix="storage-reader",
+            initializer=self._open_reader,
+        )
+        await loop.run_in_executor(self._write_executor, self._open_writer)
+        self._wakeup = asyncio.Event()
+        self._writer_task = asyncio.create_task(self._run_writer(), name="storage-writer")
+
+    async def close(self) -> None:
+        """Flush queued writes, then close every connection."""
+        if self._writer_task is None:
+            return
+        # Writes are applied in order, so once an empty write commits every
+        # earlier one has too.
+        await self._submit([])
+        while self._pending:
+            await self._submit([])
+        self._writer_task.cancel()
+        self._writer_task = None
+        # Joining the worker threads waits out in-flight reads and the WAL
+        # checkpoint on the last close, so keep it off the event loop.
+        await asyncio.to_thread(self._shutdown)
+
+    def _shutdown(self) -> None:
+        self._read_executor.shutdown(wait=True)
+        for connection in self._read_connections:
+            connection.close()
+        self._read_connections.clear()
+        self._write_executor.submit(self._write_connection.close).result()
+        self._write_executor.shutdown(wait=True)
+        self._write_connection = None
+
+    async def __aenter__(self) -> Storage:
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    # Writes -----------------------------------------------------------------
+
+    def _apply_batch(self, batch: list[_WriteOp]) -> list[WriteResult | BaseException]:
+        connection = self._write_connection
+        if len(batch) == 1 and batch[0].script is not None:
+            try:
+                connection.executescript(batch[0].script)
+            except sqlite3.Error as error:
+                return [error]
+            return [WriteResult(0, None)]
+
+        results: list[WriteResult | BaseException] = []
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for op in batch:
+                connection.execute("SAVEPOINT op")
+                try:
+                    cursor = None
+                    for statement in op.statements:
+                        if statement.many:
+                            cursor = connection.executemany(statement.sql, statement.parameters)
+                        else:
+                            cursor = connection.execute(statement.sql, statement.parameters)
+                except sqlite3.Error as error:
+                    connection.execute("ROLLBACK TO op")
+                    results.append(error)
+                else:
+                    results.append(
+                        WriteResult(
+                            0 if cursor is None else cursor.rowcount,
+                            None if cursor is None else cursor.lastrowid,
+                        )
+                    )
+                connection.execute("RELEASE op")
+            connection.execute("COMMIT")
+        except BaseException as error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            return [error] * len(batch)
+        return results
+
+    def _next_batch(self) -> list[_WriteOp]:
+        first = self._pending.popleft()
+        # Scripts may commit on their own, so they always run alone.
+        if first.script is not None:
+            return [first]
+        batch = [first]
+        while (
+            len(batch) < self.max_batch
+            and self._pending
+            and self._pending[0].script is None
+        ):
+            batch.append(self._pending.popleft())
+        return batch
+
+    async def _run_writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            batch = self._next_batch()
+            try:
+                results = await loop.run_in_executor(
+                    self._write_executor, self._apply_batch, batch
+                )
+            except Exception as error:
+                logger.opt(exception=error).error("[儲存] 寫入批次失敗")
+                results = [error] * len(batch)
+            self.batches += 1
+            self.writes += len(batch)
+            for op, result in zip(batch, results):
+                if not op.future.done():
+                    if isinstance(result, BaseException):
+                        op.future.set_exception(result)
+                    else:
+                        op.future.set_result(result)
+
+    async def _submit(self, statements: list[_Statement], script: str | None = None) -> WriteResult:
+        if self._writer_task is None:
+            raise RuntimeError("Storage 尚未開啟")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_WriteOp(statements, future, script))
+        self._wakeup.set()
+        return await future
+
+    async def execute(self, sql: str, parameters: Parameters = ()) -> WriteResult:
+        return await self._submit([_Statement(sql, parameters)])
+
+    async def executemany(self, sql: str, parameters: Iterable[Parameters]) -> WriteResult:
+        return await self._submit([_Statement(sql, list(parameters), many=True)])
+
+    async def executescript(self, script: str) -> None:
+        """Run DDL such as ``CREATE TABLE IF NOT EXISTS`` on the writer connection."""
+        await self._submit([], script)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Transaction]:
+        """Collect statements and commit them atomically when the block exits cleanly."""
+        transaction = Transaction()
+        yield transaction
+        if transaction.statements:
+            await self._submit(transaction.statements)
+
+    # Reads ------------------------------------------------------------------
+
+    def _read(self, sql: str, parameters: Parameters, one: bool) -> Any:
+        cursor = self._local.connection.execute(sql, parameters)
+        return cursor.fetchone() if one else cursor.fetchall()
+
+    async def _run_read(self, sql: str, parameters: Parameters, one: bool) -> Any:
+        if self._read_executor is None or not self.is_open:
+            raise RuntimeError("Storage 尚未開啟")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self._read, sql, parameters, one)
+
+    async def fetchone(self, sql: str, parameters: Parameters = ()) -> tuple[Any, ...] | None:
+        return await self._run_read(sql, parameters, True)
+
+    async def fetchall(self, sql: str, parameters: Parameters = ()) -> list[tuple[Any, ...]]:
+        return await self._run_read(sql, parameters, False)
+
+    # Key-value --------------------------------------------------------------
+
+    async def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        row = await self.fetchone(
+            "SELECT value FROM kv WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        )
+        return default if row is None else json.loads(row[0])
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        await self.execute(
+            "INSERT INTO kv (namespace, key, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value",
+            (namespace, key, json.dumps(value, ensure_ascii=False)),
+        )
+
+    async def delete(self, namespace: str, key: str) -> bool:
+        result = await self.execute(
+            "DELETE FROM kv WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        )
+        return result.rowcount > 0
+
+    async def items(self, namespace: str) -> dict[str, Any]:
+        rows = await self.fetchall(
+            "SELECT key, value FROM kv WHERE namespace = ? ORDER BY key",
+            (namespace,),
+        )
+        return {key: json.loads(value) for key, value in rows}
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+
+import discord
+from loguru import logger
+
+
+class UserResolver:
+    """Resolve users through a TTL cache with negative caching and reusable DM channels.
+
+    Default intents leave ``members`` off, so ``get_user`` often misses and
+    ``fetch_user`` costs a REST request; this keeps the result (or the
+    failure) around so repeated lookups stay local. At most ``max_size``
+    users are kept, evicting the least recently used.
+    """
+
+    def __init__(
+        self,
+        client: discord.Client,
+        *,
+        ttl: float = 3600.0,
+        negative_ttl: float = 300.0,
+        max_size: int = 1000,
+    ) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self._users: dict[int, tuple[float, discord.User | None]] = {}
+        self._dm_channels: dict[int, discord.DMChannel] = {}
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _store(self, user_id: int, expires_at: float, user: discord.User | None) -> None:
+        self._users.pop(user_id, None)
+        self._users[user_id] = (expires_at, user)
+        while len(self._users) > self.max_size:
+            evicted = next(iter(self._users))
+            del self._users[evicted]
+            self._dm_channels.pop(evicted, None)
+
+    def invalidate(self, user_id: int) -> None:
+        self._users.pop(user_id, None)
+        self._dm_channels.pop(user_id, None)
+
+    def prime(self, user: discord.abc.User) -> None:
+        """Seed the cache with a user object that is already at hand."""
+        if isinstance(user, discord.User):
+            self._store(user.id, time.monotonic() + self.ttl, user)
+
+    async def get(self, user_id: int) -> discord.User | None:
+        now = time.monotonic()
+        cached = self._users.get(user_id)
+        if cached is not None and cached[0] > now:
+            self._store(user_id, *cached)
+            return cached[1]
+
+        user = self.client.get_user(user_id)
+        if user is None:
+            try:
+                user = await self.client.fetch_user(user_id)
+            except discord.HTTPException as error:
+                logger.warning(f"[使用者快取] 無法取得使用者 {user_id}: {error}")
+                self._store(user_id, now + self.negative_ttl, None)
+                return None
+
+        self._store(user_id, now + self.ttl, user)
+        return user
+
+    async def dm_channel(self, user_id: int) -> discord.DMChannel | None:
+        """Return a cached DM channel so a report costs a single message send."""
+        channel = self._dm_channels.get(user_id)
+        if channel is not None:
+            return channel
+
+        user = await self.get(user_id)
+        if user is None:
+            return None
+
+        channel = user.dm_channel
+        if channel is None:
+            try:
+                channel = await user.create_dm()
+            except discord.HTTPException as error:
+                logger.warning(f"[使用者快取] 無法建立私訊頻道 {user_id}: {error}")
+                self._store(user_id, time.monotonic() + self.negative_ttl, None)
+                return None
+
+        self._dm_channels[user_id] = channel
+        return channel
+
+    async def warm(self, *user_ids: int | None, dm: bool = False) -> None:
+        for user_id in dict.fromkeys(user_ids):
+            if user_id is None:
+                continue
+            if dm:
+                await self.dm_channel(user_id)
+            else:
+                await self.get(user_id)
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+import os
+import unittest
+
+import discord
+
+from main import DiscordBot
+from module.cache_policy import CachePolicy, CacheSweeper, cache_usage, deep_sizeof
+
+GUILD_ID = 4194304 * 5 + 1
+
+
+def _guild_payload(members: int) -> dict:
+    return {
+        "id": str(GUILD_ID),
+        "name": "快取測試",
+        "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0}],
+        "channels": [{"id": "30", "type": 0, "name": "一般", "position": 0}],
+        "members": [
+            {
+                "user": {
+                    "id": str(1000 + index),
+                    "username": f"user{index}",
+                    "discriminator": "0",
+                    "avatar": None,
+                },
+                "roles": [],
+                "flags": 0,
+                "joined_at": "2024-01-01T00:00:00+00:00",
+            }
+            for index in range(members)
+        ],
+    }
+
+
+class CachePolicyEnvTests(unittest.TestCase):
+    def test_defaults_match_discord_py(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            policy = CachePolicy.from_env()
+
+        self.assertEqual(policy, CachePolicy())
+        self.assertEqual(
+            policy.member_cache_flags(discord.Intents.default()),
+            discord.MemberCacheFlags.from_intents(discord.Intents.default()),
+        )
+
+    def test_parses_limits_and_flags(self) -> None:
+        environment = {
+            "CACHE_MAX_MESSAGES": "0",
+            "CACHE_MESSAGE_TTL": "300",
+            "CACHE_MEMBER_FLAGS": "none",
+            "CACHE_USER_MAX": "50",
+        }
+        with patch.dict(os.environ, environment, clear=True):
+            policy = CachePolicy.from_env()
+
+        self.assertIsNone(policy.max_messages)
+        self.assertEqual(policy.message_ttl, 300.0)
+        self.assertEqual(policy.member_flags, ())
+        self.assertEqual(policy.user_max, 50)
+        flags = policy.member_cache_flags(discord.Intents.default())
+        self.assertFalse(flags.voice or flags.joined)
+
+    def test_rejects_settings_that_need_the_members_intent(self) -> None:
+        for environment in ({"CACHE_CHUNK_GUILDS": "true"}, {"CACHE_MEMBER_FLAGS": "joined"}):
+            with self.subTest(environment=environment):
+                with patch.dict(os.environ, environment, clear=True):
+                    with self.assertRaises(ValueError):
+                        CachePolicy.from_env()
+
+    def test_rejects_unknown_flags(self) -> None:
+        with patch.dict(os.environ, {"CACHE_MEMBER_FLAGS": "voice,online"}, clear=True):
+            with self.assertRaises(ValueError):
+                CachePolicy.from_env()
+
+
+class ApplyCachePolicyTests(unittest.TestCase):
+    def test_policy_is_passed_to_the_client(self) -> None:
+        policy = CachePolicy(
+            max_messages=10,
+            member_flags=("voice", "joined"),
+            members_intent=True,
+            chunk_guilds=True,
+            user_max=5,
+        )
+
+        bot = DiscordBot(cache_policy=policy)
+
+        state = bot._connection
+        self.assertTrue(bot.intents.members)
+        self.assertTrue(state.member_cache_flags.joined)
+        self.assertTrue(state._chunk_guilds)
+        self.assertEqual(state._messages.maxlen, 10)
+        self.assertEqual(bot.user_resolver.max_size, 5)
+        self.assertIs(bot.cache_policy, policy)
+
+        unbounded = DiscordBot(cache_policy=CachePolicy(max_messages=None))
+        self.assertIsNone(unbounded._connection._messages)
+
+
+class CacheSweeperTests(unittest.TestCase):
+    def test_drops_only_expired_messages_from_the_left(self) -> None:
+        client = discord.Client(intents=discord.Intents.none(), max_messages=10)
+        now = discord.utils.utcnow()
+        for age in (600, 400, 10, 5):
+            client._connection._messages.append(
+                SimpleNamespace(created_at=now - timedelta(seconds=age))
+            )
+        sweeper = CacheSweeper(client, ttl=300)
+
+        self.assertEqual(sweeper.sweep(), 2)
+        self.assertEqual(len(client._connection._messages), 2)
+        self.assertEqual(sweeper.expired, 2)
+
+
+class CacheUsageTests(unittest.TestCase):
+    def test_reports_counts_per_category(self) -> None:
+        intents = discord.Intents(guilds=True, members=True)
+        client = discord.Client(intents=intents)
+        guild = discord.Guild(data=_guild_payload(3), state=client._connection)
+        client._connection._add_guild(guild)
+
+        usage = {item.category: item for item in cache_usage(client)}
+
+        self.assertEqual(usage["guilds"].count, 1)
+        self.assertEqual(usage["members"].count, 3)
+        self.assertEqual(usage["channels"].count, 1)
+        self.assertEqual(usage["roles"].count, 1)
+        self.assertGreater(usage["members"].approximate_bytes, 0)
+        self.assertEqual(usage["messages"].approximate_bytes, 0)
+
+    def test_size_walk_stops_at_other_cached_entities(self) -> None:
+        intents = discord.Intents(guilds=True, members=True)
+        client = discord.Client(intents=intents)
+        small = discord.Guild(data=_guild_payload(1), state=client._connection)
+        large = discord.Guild(data=_guild_payload(200), state=client._connection)
+        member = next(iter(small._members.values()))
+
+        self.assertLess(deep_sizeof(member), deep_sizeof(large))
+        self.assertLess(deep_sizeof(member), 4096)
+
+
+if __name__ == "__main__":
+    unittest.main()
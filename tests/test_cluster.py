@@ -0,0 +1,66 @@
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import unittest
+from unittest import mock
+
+from module.cluster import ClusterSupervisor, read_cluster_status, split_shards
+
+
+class ClusterTests(unittest.IsolatedAsyncioTestCase):
+    def test_split_shards(self) -> None:
+        self.assertEqual(split_shards(10, 3), [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]])
+        self.assertEqual(split_shards(2, 8), [[0], [1]])
+        self.assertEqual(split_shards(1, 1), [[0]])
+
+    async def test_aggregate_reads_worker_status(self) -> None:
+        with TemporaryDirectory() as directory:
+            status_directory = Path(directory)
+            supervisor = ClusterSupervisor(Path("main.py"), 4, 2, status_directory)
+            (status_directory / "cluster-1.json").write_text(
+                json.dumps(
+                    {
+                        "pid": 123,
+                        "ready": True,
+                        "shards": {"2": {"latency": 0.05, "guilds": 7}},
+                    }
+                ),
+                encoding="utf-8",
+            )
+
+            aggregate = supervisor.aggregate()
+            (status_directory / "status.json").write_text(
+                json.dumps(aggregate),
+                encoding="utf-8",
+            )
+
+            self.assertEqual(read_cluster_status(status_directory), aggregate)
+
+        first, second = aggregate["clusters"]
+        self.assertEqual((first["shard_ids"], first["shards"]), ("0-1", {}))
+        self.assertEqual(second["shard_ids"], "2-3")
+        self.assertEqual(second["shards"]["2"]["guilds"], 7)
+        self.assertFalse(second["ready"])
+
+    async def test_close_cancels_a_running_rolling_restart(self) -> None:
+        started = asyncio.Event()
+
+        async def rolling_restart(*, first=None) -> None:
+            started.set()
+            await asyncio.Event().wait()
+
+        with TemporaryDirectory() as directory:
+            supervisor = ClusterSupervisor(Path("main.py"), 2, 2, Path(directory))
+            with mock.patch.object(supervisor, "rolling_restart", rolling_restart):
+                supervisor.start_rolling_restart()
+                task = supervisor._rolling_task
+                await started.wait()
+                await supervisor.close()
+
+        self.assertTrue(task.cancelled())
+        self.assertIsNone(supervisor._rolling_task)
+
+
+if __name__ == "__main__":
+    unittest.main()
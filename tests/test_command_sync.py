@@ -0,0 +1,102 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import AsyncMock, patch
+import unittest
+
+import discord
+from discord import app_commands
+
+from module.command_sync import GLOBAL_SCOPE, CommandSyncManager
+
+
+async def _noop(interaction: discord.Interaction) -> None:
+    del interaction
+
+
+class CommandSyncManagerTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temporary_directory = TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+
+        self.tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+        self.tree.add_command(app_commands.Command(name="ping", description="ping", callback=_noop))
+        self.tree.sync = AsyncMock(return_value=[object()])
+        self.manager = CommandSyncManager(
+            self.tree,
+            Path(self.temporary_directory.name) / "command_sync.json",
+        )
+
+    async def test_unchanged_tree_skips_sync(self) -> None:
+        first = await self.manager.sync(1)
+        second = await self.manager.sync(1)
+
+        self.assertEqual(first.synced, {GLOBAL_SCOPE: 1})
+        self.assertEqual(first.changes[0].added, ("1:ping",))
+        self.assertEqual(second.changes, [])
+        self.assertEqual(second.skipped, [GLOBAL_SCOPE])
+        self.tree.sync.assert_awaited_once_with(guild=None)
+
+    async def test_state_file_is_read_once_per_sync(self) -> None:
+        await self.manager.sync(1)
+
+        with patch.object(self.manager, "load_state", wraps=self.manager.load_state) as load_state:
+            await self.manager.sync(1, force=True)
+
+        load_state.assert_called_once_with(1)
+
+    async def test_changed_guild_scope_is_synced_alone(self) -> None:
+        await self.manager.sync(1)
+        self.tree.add_command(
+            app_commands.Command(name="guild_ping", description="ping", callback=_noop),
+            guild=discord.Object(id=42),
+        )
+
+        result = await self.manager.sync(1)
+
+        self.assertEqual([change.scope for change in result.changes], ["42"])
+        self.assertEqual(self.tree.sync.await_args.kwargs["guild"].id, 42)
+
+    async def test_dry_run_and_force(self) -> None:
+        await self.manager.sync(1)
+
+        dry_run = await self.manager.sync(1, force=True, dry_run=True)
+        forced = await self.manager.sync(1, force=True)
+
+        self.assertEqual(len(dry_run.changes), 1)
+        self.assertEqual(forced.synced, {GLOBAL_SCOPE: 1})
+        self.assertEqual(self.tree.sync.await_count, 2)
+
+    async def test_force_marker_applies_once(self) -> None:
+        await self.manager.sync(1)
+        self.manager.request_force()
+
+        forced = await self.manager.sync(1)
+        after = await self.manager.sync(1)
+
+        self.assertEqual(forced.synced, {GLOBAL_SCOPE: 1})
+        self.assertEqual(after.changes, [])
+        self.assertFalse(self.manager.force_marker.exists())
+
+    async def test_extra_payloads_are_uploaded_with_tree_commands(self) -> None:
+        lazy_payload = {"name": "lazy", "description": "lazy", "type": 1}
+        self.manager.extra_payloads = lambda: {GLOBAL_SCOPE: {"1:lazy": lazy_payload}}
+        http = self.tree.client.http
+        http.bulk_upsert_global_commands = AsyncMock(return_value=[{}, {}])
+
+        result = await self.manager.sync(1)
+
+        self.assertEqual(result.synced, {GLOBAL_SCOPE: 2})
+        uploaded = http.bulk_upsert_global_commands.await_args.kwargs["payload"]
+        self.assertEqual(sorted(command["name"] for command in uploaded), ["lazy", "ping"])
+        self.tree.sync.assert_not_awaited()
+
+    async def test_application_change_invalidates_state(self) -> None:
+        await self.manager.sync(1)
+
+        result = await self.manager.sync(2)
+
+        self.assertEqual(len(result.changes), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
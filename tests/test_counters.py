@@ -0,0 +1,68 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import sqlite3
+import unittest
+
+from module.counters import CounterBuffer
+from module.storage import Storage
+
+
+class CounterBufferTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "bot.sqlite3"
+        self.storage = Storage(self.path, readers=1)
+        await self.storage.open()
+        self.addAsyncCleanup(self.storage.close)
+        self.counters = CounterBuffer(self.storage, interval=3600)
+        await self.counters.start()
+        self.addAsyncCleanup(self.counters.close)
+
+    async def test_increments_are_aggregated_before_flush(self) -> None:
+        for _ in range(50):
+            self.counters.increment("pings", 1)
+        self.counters.increment("pings", 2, 3)
+
+        self.assertEqual(self.counters.pending, 2)
+        self.assertEqual(self.storage.writes, 1)
+        self.assertEqual(await self.counters.get("pings", 1), 50)
+
+        self.assertEqual(await self.counters.flush(), 2)
+        self.counters.increment("pings", 1)
+
+        self.assertEqual(self.counters.flushes, 1)
+        self.assertEqual(await self.counters.get("pings", 1), 51)
+        self.assertEqual(await self.counters.top("pings"), [(1, 51), (2, 3)])
+
+    async def test_close_flushes_pending_deltas(self) -> None:
+        self.counters.increment("guild_commands", 42, 7)
+
+        await self.counters.close()
+        await self.storage.close()
+
+        connection = sqlite3.connect(self.path)
+        self.addCleanup(connection.close)
+        self.assertEqual(
+            connection.execute("SELECT subject, value FROM counters").fetchall(),
+            [(42, 7)],
+        )
+
+    async def test_failed_flush_keeps_deltas(self) -> None:
+        self.counters.increment("pings", 1, 2)
+        await self.storage.executescript("DROP TABLE counters")
+
+        self.assertEqual(await self.counters.flush(), 0)
+        self.assertEqual(self.counters.flush_failures, 1)
+        self.assertEqual(self.counters.pending, 1)
+
+        await self.storage.executescript(
+            "CREATE TABLE counters (name TEXT, subject INTEGER, value INTEGER, "
+            "PRIMARY KEY (name, subject))"
+        )
+        self.assertEqual(await self.counters.flush(), 1)
+        self.assertEqual(await self.counters.get("pings", 1), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import re
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import discord
+from discord.ext import commands
+
+from module.discord_compat import (
+    TESTED_DISCORD_VERSION,
+    extension_internals,
+    extension_registry,
+    shard_registry,
+    user_payload,
+    version_mismatch,
+)
+
+REQUIREMENTS = Path(__file__).resolve().parent.parent / "requirements.txt"
+
+
+class DiscordCompatTests(unittest.TestCase):
+    def test_tested_version_matches_the_pin(self) -> None:
+        pin = re.search(r"^discord\.py==(\S+)$", REQUIREMENTS.read_text(), re.MULTILINE)
+
+        self.assertIsNotNone(pin)
+        self.assertEqual(pin.group(1), TESTED_DISCORD_VERSION)
+        self.assertEqual(discord.__version__, TESTED_DISCORD_VERSION)
+        self.assertIsNone(version_mismatch())
+
+    def test_extension_registry_backs_bot_extensions(self) -> None:
+        bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+        module = object()
+
+        extension_registry(bot)["cogs.example"] = module
+
+        self.assertIs(bot.extensions["cogs.example"], module)
+        internals = extension_internals(bot)
+        self.assertIs(internals.extensions, extension_registry(bot))
+        self.assertEqual(internals.call_module_finalizers.__name__, "_call_module_finalizers")
+
+    def test_shard_registry_backs_client_shards(self) -> None:
+        client = discord.AutoShardedClient(intents=discord.Intents.none(), shard_count=1)
+
+        self.assertEqual(shard_registry(client), {})
+        self.assertEqual(client.shards, {})
+        # The event queue only exists once connect() runs; check that it
+        # still creates the attribute this module reads.
+        self.assertIn("_AutoShardedClient__queue", discord.AutoShardedClient.connect.__code__.co_names)
+
+    def test_missing_attribute_names_the_tested_version(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, TESTED_DISCORD_VERSION):
+            extension_registry(object())
+
+    def test_payload_builders_report_missing_private_fields(self) -> None:
+        user = SimpleNamespace(
+            id=1, name="bot", discriminator="0", global_name=None, bot=True, system=False
+        )
+
+        with self.assertRaisesRegex(RuntimeError, "_avatar"):
+            user_payload(user)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import time
+import unittest
+
+from loguru import logger
+
+from module.dispatch_trace import DispatchTracer
+
+
+async def blocking_handler(seconds: float) -> str:
+    await asyncio.sleep(0)
+    time.sleep(seconds)
+    await asyncio.sleep(0.01)
+    return "done"
+
+
+class DispatchTracerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        logger.disable("module.dispatch_trace")
+        self.addCleanup(logger.enable, "module.dispatch_trace")
+        self.tracer = DispatchTracer(threshold=0.05)
+
+    async def test_only_time_holding_the_loop_is_counted(self) -> None:
+        result = await self.tracer.run("on_message:Basic.listener", blocking_handler(0.06))
+
+        stats = self.tracer.stats["on_message:Basic.listener"]
+        self.assertEqual(result, "done")
+        self.assertGreaterEqual(stats.longest, 0.06)
+        self.assertLess(stats.held, 0.07 + 0.01)
+        self.assertEqual([finding.kind for finding in self.tracer.findings], ["handler"])
+
+    async def test_nested_trace_is_charged_to_the_inner_handler(self) -> None:
+        async def on_message() -> None:
+            await self.tracer.run("!ping", blocking_handler(0.06))
+
+        await self.tracer.run("on_message", on_message())
+
+        self.assertLess(self.tracer.stats["on_message"].longest, 0.05)
+        self.assertEqual([finding.name for finding in self.tracer.findings], ["!ping"])
+
+    async def test_exceptions_and_cancellation_propagate(self) -> None:
+        async def failing() -> None:
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            await self.tracer.run("failing", failing())
+
+        task = asyncio.create_task(self.tracer.run("sleeper", asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(self.tracer.stats["sleeper"].calls, 1)
+
+    async def test_watchdog_captures_blocking_stack(self) -> None:
+        self.tracer.start(interval=0.01)
+        self.addAsyncCleanup(self.tracer.close)
+        await asyncio.sleep(0.05)
+
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+
+        stalls = [finding for finding in self.tracer.findings if finding.kind == "stall"]
+        self.assertEqual(len(stalls), 1)
+        self.assertIn("test_dispatch_trace.py", stalls[0].name)
+        self.assertIn("time.sleep(0.2)", stalls[0].stack)
+        self.assertGreaterEqual(stalls[0].seconds, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+from unittest.mock import patch
+import os
+import unittest
+
+from module.env import env_flag, env_number
+
+
+class EnvTests(unittest.TestCase):
+    def test_flag_accepts_common_truthy_values(self) -> None:
+        with patch.dict(os.environ, {"A": "Yes", "B": "0"}, clear=True):
+            self.assertTrue(env_flag("A"))
+            self.assertFalse(env_flag("B"))
+            self.assertTrue(env_flag("MISSING", "true"))
+
+    def test_invalid_number_falls_back_unless_strict(self) -> None:
+        with patch.dict(os.environ, {"N": "abc", "M": " 2.5 "}, clear=True):
+            self.assertEqual(env_number("N", 3), 3)
+            self.assertEqual(env_number("M", 3), 2.5)
+            self.assertEqual(env_number("MISSING", 3, strict=True), 3)
+            with self.assertRaises(ValueError):
+                env_number("N", 3, strict=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+
+import discord
+
+from module.error_reporter import ErrorReporter, fingerprint
+
+
+def _raise(message: str) -> ValueError:
+    try:
+        raise ValueError(message)
+    except ValueError as error:
+        return error
+
+
+class ErrorReporterTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.sent: list[discord.Embed] = []
+
+        async def send(embed: discord.Embed) -> None:
+            self.sent.append(embed)
+
+        self.send = send
+
+    def test_fingerprint_ignores_message(self) -> None:
+        self.assertEqual(fingerprint(_raise("a")), fingerprint(_raise("b")))
+        self.assertNotEqual(fingerprint(_raise("a")), fingerprint(KeyError("a")))
+
+    async def test_duplicates_are_coalesced_into_one_summary(self) -> None:
+        reporter = ErrorReporter(self.send, window=60)
+        for channel in ("g/a", "g/b", "g/a", "g/c", "g/d"):
+            reporter.report(_raise("boom"), discord.Embed(title="錯誤"), channel)
+        reporter.report(KeyError("x"), discord.Embed(title="其他"), "g/a")
+
+        await reporter.close()
+
+        self.assertEqual(len(self.sent), 2)
+        fields = {field.name: field.value for field in self.sent[0].fields}
+        self.assertEqual(fields["發生次數"], "5")
+        self.assertEqual(fields["頻道樣本"], "g/a\ng/b\ng/c")
+        self.assertEqual(self.sent[1].fields, [])
+
+    async def test_full_queue_counts_drops(self) -> None:
+        reporter = ErrorReporter(self.send, max_queue=2)
+        results = [
+            reporter.report(_raise("boom"), discord.Embed(), "g/a") for _ in range(4)
+        ]
+
+        await reporter.close()
+
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(reporter.dropped, 2)
+        fields = {field.name: field.value for field in self.sent[0].fields}
+        self.assertEqual(fields["佇列已滿而丟棄"], "2")
+
+    async def test_worker_flushes_after_window(self) -> None:
+        reporter = ErrorReporter(self.send, window=0.01)
+        reporter.start()
+        reporter.report(_raise("boom"), discord.Embed(), "g/a")
+        reporter.report(_raise("boom"), discord.Embed(), "g/a")
+
+        for _ in range(50):
+            if self.sent:
+                break
+            await asyncio.sleep(0.01)
+        await reporter.close()
+
+        self.assertEqual(len(self.sent), 1)
+
+    async def test_close_waits_for_a_flush_in_progress(self) -> None:
+        started = asyncio.Event()
+
+        async def slow_send(embed: discord.Embed) -> None:
+            started.set()
+            await asyncio.sleep(0.02)
+            self.sent.append(embed)
+
+        reporter = ErrorReporter(slow_send, window=0)
+        reporter.start()
+        reporter.report(_raise("a"), discord.Embed(title="a"), "g/a")
+        reporter.report(KeyError("b"), discord.Embed(title="b"), "g/a")
+        await started.wait()
+
+        await reporter.close()
+
+        self.assertEqual([embed.title for embed in self.sent], ["a", "b"])
+
+    def test_queue_must_be_bounded(self) -> None:
+        with self.assertRaises(ValueError):
+            ErrorReporter(self.send, max_queue=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
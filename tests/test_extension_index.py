@@ -0,0 +1,44 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import os
+import unittest
+
+from module.extension_index import ExtensionIndex
+
+
+class ExtensionIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temporary_directory = TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = Path(temporary_directory.name)
+        for name in ("__init__", "Music", "admin_tools", "basic", "not-valid"):
+            (self.directory / f"{name}.py").touch()
+        self.index = ExtensionIndex(self.directory, "cogs", poll_interval=0)
+
+    def test_names_and_resolve_use_allowlist(self) -> None:
+        self.assertEqual(self.index.names(), ("admin_tools", "basic", "Music"))
+        self.assertEqual(self.index.resolve(" basic "), "cogs.basic")
+        self.assertIsNone(self.index.resolve("__init__"))
+        self.assertIsNone(self.index.resolve("../main"))
+
+    def test_search_orders_prefix_before_substring(self) -> None:
+        self.assertEqual(self.index.search("MU"), ("Music",))
+        self.assertEqual(self.index.search("s"), ("admin_tools", "basic", "Music"))
+        self.assertEqual(
+            self.index.search("", exclude=frozenset({"basic"})),
+            ("admin_tools", "Music"),
+        )
+
+    def test_directory_change_invalidates_cache(self) -> None:
+        self.assertIsNone(self.index.resolve("stats"))
+
+        (self.directory / "stats.py").touch()
+        stat = self.directory.stat()
+        os.utime(self.directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(self.index.resolve("stats"), "cogs.stats")
+        self.assertIn("stats", self.index.search("sta"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+from module.extension_loader import ExtensionLoader, plan_waves, read_dependencies
+
+
+class PlanWavesTests(unittest.TestCase):
+    def test_independent_extensions_share_a_wave(self) -> None:
+        waves, skipped = plan_waves(
+            {"basic": (), "music": (), "stats": ("basic", "music")},
+            satisfied={"management"},
+        )
+
+        self.assertEqual(waves, [["basic", "music"], ["stats"]])
+        self.assertEqual(skipped, {})
+
+    def test_missing_and_cyclic_dependencies_are_skipped(self) -> None:
+        waves, skipped = plan_waves(
+            {"a": ("b",), "b": ("a",), "c": ("missing",), "d": ("c",), "e": ("management",)},
+            satisfied={"management"},
+        )
+
+        self.assertEqual(waves, [["e"]])
+        self.assertEqual(set(skipped), {"a", "b", "c", "d"})
+
+
+class ReadDependenciesTests(unittest.TestCase):
+    def test_reads_literal_without_import(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "stats.py"
+            path.write_text(
+                'import does_not_exist\nDEPENDENCIES = ("music", "basic")\n',
+                encoding="utf-8",
+            )
+
+            self.assertEqual(read_dependencies(path), ("basic", "music"))
+
+    def test_repository_cogs_parse(self) -> None:
+        cogs_directory = Path(__file__).resolve().parent.parent / "cogs"
+
+        self.assertEqual(read_dependencies(cogs_directory / "basic.py"), ())
+
+
+class ExtensionLoaderTests(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_dependency_skips_dependents(self) -> None:
+        loaded: list[str] = []
+
+        async def load_extension(full_path: str) -> None:
+            if full_path == "cogs.broken":
+                raise RuntimeError("boom")
+            loaded.append(full_path)
+
+        dependencies = {"broken": (), "child": ("broken",), "basic": ()}
+        loader = ExtensionLoader(
+            SimpleNamespace(load_extension=load_extension),
+            lambda name: f"cogs.{name}",
+            lambda name: Path(name),
+        )
+        with patch(
+            "module.extension_loader.read_dependencies",
+            side_effect=lambda path: dependencies[str(path)],
+        ):
+            report = await loader.load_all(dependencies)
+
+        self.assertEqual(loaded, ["cogs.basic"])
+        self.assertIn("child", report.skipped)
+        self.assertEqual({timing.name for timing in report.timings}, {"basic", "broken"})
+
+
+if __name__ == "__main__":
+    unittest.main()
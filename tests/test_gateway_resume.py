@@ -0,0 +1,212 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import json
+import time
+import unittest
+
+import discord
+
+from main import DiscordBot
+from module.discord_compat import inject_ready
+from module.gateway_resume import ResumeSnapshot, ResumeStore, ShardSession, guild_payload
+
+GUILD_ID = 4194304 * 3 + 1
+BOT_ID = 100000000000000002
+
+
+def _user(user_id: int, name: str) -> dict:
+    return {"id": str(user_id), "username": name, "discriminator": "0", "avatar": None}
+
+
+def _guild() -> dict:
+    overwrite = {"id": str(GUILD_ID), "type": 0, "allow": "0", "deny": "1024"}
+    return {
+        "id": str(GUILD_ID),
+        "name": "喵喵伺服器",
+        "owner_id": "7",
+        "member_count": 42,
+        "features": ["COMMUNITY"],
+        "roles": [
+            {"id": str(GUILD_ID), "name": "@everyone", "permissions": "1024", "position": 0},
+            {
+                "id": "11",
+                "name": "Bot",
+                "permissions": "8",
+                "position": 1,
+                "tags": {"bot_id": str(BOT_ID)},
+            },
+        ],
+        "channels": [
+            {"id": "20", "type": 4, "name": "頻道", "position": 0},
+            {
+                "id": "21",
+                "type": 0,
+                "name": "一般",
+                "position": 1,
+                "parent_id": "20",
+                "topic": "hello",
+                "rate_limit_per_user": 5,
+                "permission_overwrites": [overwrite],
+            },
+            {"id": "22", "type": 2, "name": "語音", "position": 2, "bitrate": 64000, "user_limit": 5},
+        ],
+        "members": [
+            {
+                "user": _user(BOT_ID, "bot"),
+                "roles": ["11"],
+                "flags": 0,
+                "joined_at": "2024-01-01T00:00:00+00:00",
+            }
+        ],
+        "threads": [],
+        "stage_instances": [],
+        "guild_scheduled_events": [],
+        "soundboard_sounds": [],
+    }
+
+
+class GuildPayloadTests(unittest.TestCase):
+    def test_guild_round_trips_through_payload(self) -> None:
+        intents = discord.Intents(guilds=True, members=True)
+        original = discord.Guild(data=_guild(), state=discord.Client(intents=intents)._connection)
+
+        restored = discord.Guild(
+            data=guild_payload(original),
+            state=discord.Client(intents=intents)._connection,
+        )
+
+        self.assertEqual(
+            (restored.name, restored.member_count, restored.features),
+            ("喵喵伺服器", 42, ["COMMUNITY"]),
+        )
+        self.assertEqual([role.name for role in restored.roles], ["@everyone", "Bot"])
+        self.assertEqual(restored.get_role(11).tags.bot_id, BOT_ID)
+        text_channel = restored.get_channel(21)
+        self.assertEqual(
+            (text_channel.topic, text_channel.slowmode_delay, text_channel.category_id),
+            ("hello", 5, 20),
+        )
+        self.assertIs(text_channel.overwrites_for(restored.default_role).view_channel, False)
+        self.assertEqual(restored.get_channel(22).bitrate, 64000)
+        self.assertEqual(restored.get_member(BOT_ID).roles[-1].id, 11)
+
+
+class ReadyReplayTests(unittest.IsolatedAsyncioTestCase):
+    async def test_serialized_guild_replays_through_parse_ready(self) -> None:
+        intents = discord.Intents(guilds=True, members=True)
+        original = discord.Guild(data=_guild(), state=discord.Client(intents=intents)._connection)
+        snapshot = ResumeSnapshot(
+            saved_at=time.time(),
+            application_id=None,
+            shard_count=1,
+            user=_user(BOT_ID, "bot"),
+            sessions={0: ShardSession(0, "session", 1, "wss://resume.example")},
+            guilds=[json.loads(json.dumps(guild_payload(original)))],
+        )
+        client = discord.AutoShardedClient(intents=intents, shard_count=1)
+        self.addAsyncCleanup(client.http.close)
+        client._connection.shard_ids = [0]
+
+        inject_ready(client, snapshot.ready_payload(snapshot.sessions[0]))
+        for task in client._connection._ready_tasks.values():
+            task.cancel()
+
+        restored = client.get_guild(GUILD_ID)
+        self.assertEqual(client.user.id, BOT_ID)
+        self.assertEqual((restored.name, restored.member_count), ("喵喵伺服器", 42))
+        self.assertEqual([role.name for role in restored.roles], ["@everyone", "Bot"])
+        self.assertEqual(restored.get_channel(21).category, restored.get_channel(20))
+        self.assertIs(
+            restored.get_channel(21).overwrites_for(restored.default_role).view_channel,
+            False,
+        )
+        self.assertEqual([role.id for role in restored.get_member(BOT_ID).roles], [GUILD_ID, 11])
+
+
+class ResumeStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temporary_directory = TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.store = ResumeStore(Path(self.temporary_directory.name) / "gateway_resume.json")
+
+    def snapshot(self, *, saved_at: float | None = None) -> ResumeSnapshot:
+        return ResumeSnapshot(
+            saved_at=time.time() if saved_at is None else saved_at,
+            application_id=1,
+            shard_count=2,
+            user=_user(BOT_ID, "bot"),
+            sessions={1: ShardSession(1, "session", 99, "wss://resume.example")},
+            guilds=[_guild(), {**_guild(), "id": str(GUILD_ID + 4194304)}],
+        )
+
+    def test_snapshot_is_consumed_once(self) -> None:
+        self.store.save(self.snapshot())
+
+        loaded = self.store.load(application_id=1, shard_count=2)
+
+        self.assertEqual(loaded.sessions[1].sequence, 99)
+        self.assertIsNone(self.store.load(application_id=1, shard_count=2))
+
+    def test_stale_or_mismatched_snapshot_is_ignored(self) -> None:
+        for snapshot, application_id, shard_count in (
+            (self.snapshot(saved_at=0), 1, 2),
+            (self.snapshot(), 2, 2),
+            (self.snapshot(), 1, 3),
+        ):
+            self.store.save(snapshot)
+            self.assertIsNone(
+                self.store.load(application_id=application_id, shard_count=shard_count)
+            )
+            self.assertFalse(self.store.path.exists())
+
+    def test_ready_payload_only_includes_shard_guilds(self) -> None:
+        snapshot = self.snapshot()
+
+        ready = snapshot.ready_payload(snapshot.sessions[1])
+
+        self.assertEqual(ready["shard"], [1, 2])
+        self.assertEqual([guild["id"] for guild in ready["guilds"]], [str(GUILD_ID)])
+
+
+class LaunchShardResumeTests(unittest.IsolatedAsyncioTestCase):
+    async def test_resumed_shard_uses_session_and_warm_cache(self) -> None:
+        bot = DiscordBot()
+        self.addAsyncCleanup(bot.http.close)
+        bot.shard_count = 2
+        bot._connection.shard_count = 2
+        bot._connection.shard_ids = [1]
+        bot._AutoShardedClient__queue = asyncio.PriorityQueue()
+        bot._resume_snapshot = ResumeSnapshot(
+            saved_at=time.time(),
+            application_id=None,
+            shard_count=2,
+            user=_user(BOT_ID, "bot"),
+            sessions={1: ShardSession(1, "session", 99, "wss://resume.example")},
+            guilds=[_guild()],
+        )
+
+        with (
+            patch(
+                "module.discord_compat.DiscordWebSocket.from_client",
+                AsyncMock(return_value=MagicMock()),
+            ) as from_client,
+            patch("module.discord_compat.Shard") as shard_class,
+        ):
+            await bot.launch_shard(discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY, 1)
+
+        for task in bot._connection._ready_tasks.values():
+            task.cancel()
+        kwargs = from_client.await_args.kwargs
+        self.assertEqual(
+            (kwargs["session"], kwargs["sequence"], kwargs["resume"]),
+            ("session", 99, True),
+        )
+        self.assertEqual(str(kwargs["gateway"]), "wss://resume.example")
+        self.assertEqual(bot.get_guild(GUILD_ID).name, "喵喵伺服器")
+        shard_class.return_value.launch.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from loguru import logger
+
+from benchmarks.harness import SCENARIOS, run_benchmark
+
+
+class OfflineHarnessTests(unittest.IsolatedAsyncioTestCase):
+    async def test_every_scenario_gets_a_reply(self) -> None:
+        logger.disable("cogs")
+        self.addCleanup(logger.enable, "cogs")
+
+        results = await run_benchmark(SCENARIOS, events=20, concurrency=5, memory_events=5)
+
+        self.assertEqual([result.scenario for result in results], list(SCENARIOS))
+        for result in results:
+            self.assertEqual(result.events, 20)
+            self.assertGreater(result.events_per_second, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
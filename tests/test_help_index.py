@@ -0,0 +1,73 @@
+import unittest
+
+from module.help_index import PAGE_SIZE, HelpEntry, HelpIndex, HelpPaginator, render_page
+
+
+def _entries() -> list[HelpEntry]:
+    entries = [
+        HelpEntry(f"command{number:03}", f"Cog{number % 7}", f"Generated command number {number}")
+        for number in range(300)
+    ]
+    entries += [
+        HelpEntry("ping", "Basic", "Ping Pong (前綴指令)", aliases=("p",)),
+        HelpEntry("restart", "Management", "重新啟動機器人"),
+        HelpEntry("reload", "Management", "重新載入指定的模組"),
+    ]
+    return entries
+
+
+class HelpIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = HelpIndex(_entries())
+
+    def test_fuzzy_search_over_names_and_docs(self) -> None:
+        self.assertEqual(self.index.search("pign")[0].qualified_name, "ping")
+        self.assertEqual(self.index.search("P")[0].qualified_name, "ping")
+        self.assertEqual(
+            [entry.qualified_name for entry in self.index.search("重新")],
+            ["reload", "restart"],
+        )
+        self.assertEqual(self.index.search("zzzz"), [])
+
+    def test_search_respects_visibility(self) -> None:
+        results = self.index.search("re", visible={"reload"})
+
+        self.assertEqual([entry.qualified_name for entry in results], ["reload"])
+
+    def test_listing_is_paginated_by_visibility(self) -> None:
+        visible = {f"command{number:03}" for number in range(25)} | {"ping"}
+
+        listing = self.index.listing(visible)
+
+        self.assertEqual([len(page) for page in listing.pages], [PAGE_SIZE, PAGE_SIZE, 6])
+        self.assertEqual(sum(map(len, listing.pages)), 26)
+        self.assertNotIn("restart", {entry.qualified_name for page in listing.pages for entry in page})
+
+    def test_render_page_groups_by_cog(self) -> None:
+        embed = render_page(self.index.search("re", limit=2), prefix="!")
+
+        self.assertEqual(
+            embed.description,
+            "**Management**\n`!reload` - 重新載入指定的模組\n`!restart` - 重新啟動機器人",
+        )
+
+
+class HelpPaginatorTests(unittest.IsolatedAsyncioTestCase):
+    async def test_buttons_follow_the_current_page(self) -> None:
+        index = HelpIndex(_entries())
+        listing = index.listing({entry.qualified_name for entry in index.entries})
+        view = HelpPaginator(listing, author_id=1, prefix="!")
+
+        self.assertTrue(view.previous_page.disabled)
+        self.assertFalse(view.next_page.disabled)
+        self.assertEqual(view.page_label.label, f"1/{len(listing.pages)}")
+
+        view.page = len(listing.pages) - 1
+        view._sync_buttons()
+        self.assertTrue(view.next_page.disabled)
+        self.assertIn(f"第 {len(listing.pages)}/{len(listing.pages)} 頁", view.embed().footer.text)
+        view.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+import sys
+import unittest
+
+import discord
+from discord.ext import commands
+
+from module.hot_reload import HotReloader
+
+COG_SOURCE = '''
+from discord.ext import commands
+
+
+class Counter(commands.Cog):
+    VERSION = {version}
+
+    def __init__(self):
+        self.count = 0
+
+    @commands.command()
+    async def count(self, ctx):
+        self.count += 1
+
+    def export_state(self):
+        return self.count
+
+    def import_state(self, state):
+        self.count = state
+
+
+async def setup(bot):
+    {setup_body}
+'''
+
+
+class HotReloaderTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temporary_directory = TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.path = Path(self.temporary_directory.name) / "hot_reload_counter.py"
+        self.write(1)
+
+        patcher = patch.object(sys, "path", [self.temporary_directory.name, *sys.path])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(sys.modules.pop, "hot_reload_counter", None)
+        patcher = patch.object(sys, "dont_write_bytecode", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+        self.reloader = HotReloader(self.bot)
+
+    def write(self, version: int, setup_body: str = "await bot.add_cog(Counter())") -> None:
+        self.path.write_text(
+            COG_SOURCE.format(version=version, setup_body=setup_body),
+            encoding="utf-8",
+        )
+
+    async def test_state_is_handed_to_new_module(self) -> None:
+        await self.bot.load_extension("hot_reload_counter")
+        self.bot.get_cog("Counter").count = 5
+        self.write(2)
+
+        report = await self.reloader.reload("hot_reload_counter")
+
+        cog = self.bot.get_cog("Counter")
+        self.assertEqual((cog.VERSION, cog.count), (2, 5))
+        self.assertEqual(report.handed_off, ("Counter",))
+        self.assertIs(self.bot.get_command("count").cog, cog)
+        self.assertFalse(self.reloader.swapping)
+
+    async def test_invalid_module_is_rejected_before_unload(self) -> None:
+        await self.bot.load_extension("hot_reload_counter")
+        cog = self.bot.get_cog("Counter")
+        self.path.write_text("def broken(:\n", encoding="utf-8")
+
+        with self.assertRaises(commands.ExtensionFailed):
+            await self.reloader.reload("hot_reload_counter")
+
+        self.assertIs(self.bot.get_cog("Counter"), cog)
+        self.assertEqual(sys.modules["hot_reload_counter"].Counter.VERSION, 1)
+
+    async def test_failed_setup_restores_previous_module(self) -> None:
+        await self.bot.load_extension("hot_reload_counter")
+        self.bot.get_cog("Counter").count = 3
+        self.write(2, setup_body='raise RuntimeError("boom")')
+
+        with self.assertRaises(commands.ExtensionFailed):
+            await self.reloader.reload("hot_reload_counter")
+
+        cog = self.bot.get_cog("Counter")
+        self.assertEqual((cog.VERSION, cog.count), (1, 3))
+        self.assertIn("hot_reload_counter", self.bot.extensions)
+        self.assertIsNotNone(self.bot.get_command("count"))
+
+    async def test_missing_internals_fail_before_unload(self) -> None:
+        await self.bot.load_extension("hot_reload_counter")
+        cog = self.bot.get_cog("Counter")
+        self.write(2)
+        finalizers = commands.bot.BotBase._call_module_finalizers
+        del commands.bot.BotBase._call_module_finalizers
+        self.addCleanup(setattr, commands.bot.BotBase, "_call_module_finalizers", finalizers)
+
+        with self.assertRaisesRegex(RuntimeError, "_call_module_finalizers"):
+            await self.reloader.reload("hot_reload_counter")
+
+        self.assertIs(self.bot.get_cog("Counter"), cog)
+        self.assertFalse(self.reloader.swapping)
+
+
+if __name__ == "__main__":
+    unittest.main()
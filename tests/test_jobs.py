@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+import threading
+import unittest
+from typing import Literal
+from unittest import mock
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from loguru import logger
+
+from module.jobs import JOB_ATTRIBUTE, JobQueue, JobRejected, JobSpec, job
+
+Mode = Literal["fast", "slow"]
+request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="")
+
+
+def _interaction(queue: JobQueue) -> mock.Mock:
+    interaction = mock.Mock(spec=discord.Interaction)
+    interaction.client.jobs = queue
+    interaction.command.qualified_name = "report"
+    interaction.response.is_done.return_value = False
+    interaction.response.defer = mock.AsyncMock()
+    return interaction
+
+
+class JobQueueTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.queue = JobQueue(process_workers=0)
+
+    async def asyncTearDown(self) -> None:
+        await self.queue.close()
+
+    async def test_max_concurrency_queues_extra_calls(self) -> None:
+        spec = JobSpec(max_concurrency=2, defer_after=None)
+        active = 0
+        peak = 0
+
+        async def work() -> None:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        await asyncio.gather(*(self.queue.run("report", spec, work) for _ in range(5)))
+
+        stats = self.queue.stats["report"]
+        self.assertEqual(peak, 2)
+        self.assertEqual((stats.wait.invocations, stats.run.invocations), (5, 5))
+        self.assertGreater(stats.wait.latency_sum, 0)
+        self.assertEqual((stats.waiting, stats.running), (0, 0))
+
+    async def test_full_queue_rejects(self) -> None:
+        spec = JobSpec(max_concurrency=1, max_queue=1, defer_after=None)
+        release = asyncio.Event()
+
+        running = asyncio.create_task(self.queue.run("report", spec, release.wait))
+        waiting = asyncio.create_task(self.queue.run("report", spec, release.wait))
+        await asyncio.sleep(0)
+
+        with self.assertRaises(JobRejected):
+            await self.queue.run("report", spec, release.wait)
+        release.set()
+        await asyncio.gather(running, waiting)
+        self.assertEqual(self.queue.rejected, 1)
+
+    async def test_slow_jobs_are_deferred_once(self) -> None:
+        spec = JobSpec(defer_after=0.01)
+        defer = mock.AsyncMock(return_value=True)
+
+        await self.queue.run("slow", spec, lambda: asyncio.sleep(0.05), defer=defer)
+        await self.queue.run("fast", spec, lambda: asyncio.sleep(0), defer=defer)
+        await asyncio.sleep(0.02)
+
+        defer.assert_awaited_once()
+        self.assertEqual(self.queue.stats["slow"].deferred, 1)
+
+    async def test_run_blocking_keeps_context(self) -> None:
+        request_id.set("abc")
+
+        thread, value = await self.queue.run_blocking(
+            lambda: (threading.current_thread().name, request_id.get())
+        )
+
+        self.assertTrue(thread.startswith("job"))
+        self.assertEqual(value, "abc")
+        self.assertEqual(await self.queue.run_cpu(math.factorial, 5), 120)
+
+    async def test_run_cpu_uses_a_process_pool(self) -> None:
+        queue = JobQueue(process_workers=1)
+        self.addAsyncCleanup(queue.close)
+
+        self.assertEqual(await queue.run_cpu(math.factorial, 20), math.factorial(20))
+
+    async def test_prometheus_histograms(self) -> None:
+        with self.assertRaises(RuntimeError):
+            await self.queue.run("report", JobSpec(), mock.AsyncMock(side_effect=RuntimeError))
+
+        text = "\n".join(self.queue.render_prometheus())
+
+        self.assertIn('discord_bot_job_wait_seconds_count{command="report"} 1', text)
+        self.assertIn('discord_bot_job_run_seconds_count{command="report"} 1', text)
+        self.assertEqual(self.queue.stats["report"].run.errors, 1)
+
+
+class JobDecoratorTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.queue = JobQueue(process_workers=0)
+        logger.disable("module.jobs")
+        self.addCleanup(logger.enable, "module.jobs")
+
+    async def asyncTearDown(self) -> None:
+        await self.queue.close()
+
+    def test_app_command_parameters_survive_the_wrapper(self) -> None:
+        @job(max_concurrency=3)
+        async def report(interaction: discord.Interaction, mode: Mode) -> None:
+            """Build a report."""
+
+        command = app_commands.Command(name="report", description="Build", callback=report)
+        prefix = commands.Command(report, name="report")
+
+        self.assertEqual([choice.value for choice in command._params["mode"].choices], ["fast", "slow"])
+        self.assertEqual(prefix.clean_params["mode"].annotation, Mode)
+        self.assertEqual(getattr(report, JOB_ATTRIBUTE).max_concurrency, 3)
+        self.assertEqual(report.__doc__, "Build a report.")
+
+    async def test_interaction_is_deferred_while_job_runs(self) -> None:
+        @job(defer_after=0.01, ephemeral=True)
+        async def report(interaction: discord.Interaction, mode: Mode) -> str:
+            await asyncio.sleep(0.05)
+            return mode
+
+        interaction = _interaction(self.queue)
+
+        self.assertEqual(await report(interaction, "slow"), "slow")
+        interaction.response.defer.assert_awaited_once_with(ephemeral=True)
+        self.assertEqual(self.queue.stats["report"].run.invocations, 1)
+
+    def test_rejects_non_coroutines(self) -> None:
+        with self.assertRaises(TypeError):
+            job()(lambda interaction: None)
+        with self.assertRaises(ValueError):
+            job(max_concurrency=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
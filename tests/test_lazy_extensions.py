@@ -0,0 +1,136 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from unittest.mock import patch
+import sys
+import unittest
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from module.command_sync import GLOBAL_SCOPE
+from module.lazy_extensions import (
+    LazyExtensionFailed,
+    LazyExtensionRegistry,
+    LazyPrefixCommand,
+)
+
+COG_SOURCE = '''
+import discord
+from discord.ext import commands
+
+
+class Lazy(commands.Cog):
+    @commands.command(aliases=["lz"])
+    async def lazy(self, ctx):
+        """Lazy prefix command"""
+
+    @discord.app_commands.command(name="lazy_slash", description="lazy")
+    async def lazy_slash(self, interaction):
+        pass
+
+
+async def setup(bot):
+    await bot.add_cog(Lazy())
+'''
+
+
+class LazyExtensionRegistryTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temporary_directory = TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.directory = Path(self.temporary_directory.name)
+        (self.directory / "lazy_cog.py").write_text(COG_SOURCE, encoding="utf-8")
+        (self.directory / "eager_cog.py").write_text(
+            'DEPENDENCIES = ("lazy_cog",)\n\nasync def setup(bot):\n    pass\n',
+            encoding="utf-8",
+        )
+
+        patcher = patch.object(sys, "path", [self.temporary_directory.name, *sys.path])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(sys.modules.pop, "lazy_cog", None)
+
+    def registry(self) -> tuple[commands.Bot, LazyExtensionRegistry]:
+        bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+        return bot, LazyExtensionRegistry(
+            bot,
+            self.directory / "extension_manifest.json",
+            lambda name: name,
+            lambda name: self.directory / f"{name}.py",
+        )
+
+    async def booted_registry(self) -> tuple[commands.Bot, LazyExtensionRegistry]:
+        """Simulate a first boot that loads eagerly and writes the manifest."""
+        bot, registry = self.registry()
+        self.assertEqual(registry.plan(["lazy_cog"], ["lazy_cog"]), set())
+        await bot.load_extension("lazy_cog")
+        registry.record("lazy_cog")
+        sys.modules.pop("lazy_cog")
+        return self.registry()
+
+    async def test_manifest_registers_placeholders_and_payloads(self) -> None:
+        bot, registry = await self.booted_registry()
+
+        self.assertEqual(registry.plan(["lazy_cog"], ["lazy_cog"]), {"lazy_cog"})
+        self.assertTrue(registry.register("lazy_cog"))
+
+        self.assertIsInstance(bot.get_command("lz"), LazyPrefixCommand)
+        self.assertEqual(bot.get_command("lazy").help, "Lazy prefix command")
+        self.assertIn("1:lazy_slash", registry.app_command_payloads()[GLOBAL_SCOPE])
+        self.assertNotIn("lazy_cog", sys.modules)
+
+    async def test_first_interaction_materializes_extension(self) -> None:
+        bot, registry = await self.booted_registry()
+        registry.plan(["lazy_cog"], ["lazy_cog"])
+        registry.register("lazy_cog")
+        interaction = SimpleNamespace(data={"type": 1, "name": "lazy_slash"})
+
+        await registry.materialize(registry.extension_for(interaction))
+
+        self.assertIn("lazy_cog", bot.extensions)
+        self.assertNotIsInstance(bot.get_command("lazy"), LazyPrefixCommand)
+        self.assertIsNotNone(bot.tree.get_command("lazy_slash"))
+        self.assertEqual(registry.pending, {})
+        self.assertIn("lazy_cog", registry.materialized)
+        self.assertIsNone(registry.extension_for(interaction))
+
+    async def test_import_failure_is_an_app_command_error(self) -> None:
+        bot, registry = await self.booted_registry()
+        registry.plan(["lazy_cog"], ["lazy_cog"])
+        registry.register("lazy_cog")
+        (self.directory / "lazy_cog.py").write_text("import missing_dependency\n", encoding="utf-8")
+        interaction = SimpleNamespace(data={"type": 1, "name": "lazy_slash"})
+
+        with self.assertRaises(LazyExtensionFailed) as raised:
+            await registry.materialize(registry.extension_for(interaction))
+
+        self.assertIsInstance(raised.exception, app_commands.AppCommandError)
+        self.assertIsInstance(raised.exception.original, commands.ExtensionFailed)
+        self.assertNotIn("lazy_cog", bot.extensions)
+        self.assertIn("lazy_cog", registry.pending)
+        self.assertEqual(registry.extension_for(interaction), "lazy_cog")
+
+    async def test_changed_source_or_eager_dependent_stays_eager(self) -> None:
+        _, registry = await self.booted_registry()
+
+        self.assertEqual(registry.plan(["lazy_cog", "eager_cog"], ["lazy_cog"]), set())
+
+        with (self.directory / "lazy_cog.py").open("a", encoding="utf-8") as file:
+            file.write("\n# changed\n")
+        self.assertEqual(registry.plan(["lazy_cog"], ["lazy_cog"]), set())
+
+    async def test_discard_removes_placeholders(self) -> None:
+        bot, registry = await self.booted_registry()
+        registry.plan(["lazy_cog"], ["lazy_cog"])
+        registry.register("lazy_cog")
+
+        self.assertTrue(registry.discard("lazy_cog"))
+
+        self.assertIsNone(bot.get_command("lazy"))
+        self.assertEqual(registry.app_command_payloads(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
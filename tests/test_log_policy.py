@@ -0,0 +1,107 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from loguru import logger
+
+from module.log_policy import LogPolicy, command_context
+
+
+def _logger_for(name: str):
+    return logger.patch(lambda record: record.update(name=name))
+
+
+class LogPolicyTests(unittest.TestCase):
+    def install(self, policy: LogPolicy, format: str = "{message}") -> list[str]:
+        lines: list[str] = []
+        policy.install([{"sink": lines.append, "level": "TRACE", "format": format}])
+        self.addCleanup(lambda: [logger.remove(handler) for handler in policy._handler_ids])
+        return lines
+
+    def test_per_cog_levels(self) -> None:
+        policy = LogPolicy(overrides={"basic": "WARNING", "module": "DEBUG"})
+        lines = self.install(policy)
+
+        _logger_for("cogs.basic").info("basic info")
+        _logger_for("cogs.basic").warning("basic warning")
+        _logger_for("module.outbound").debug("outbound debug")
+        _logger_for("main").debug("main debug")
+        _logger_for("main").info("main info")
+        policy.set_level("basic", None)
+        _logger_for("cogs.basic").info("basic info again")
+
+        self.assertEqual(
+            [line.strip() for line in lines],
+            ["basic warning", "outbound debug", "main info", "basic info again"],
+        )
+
+    def test_overrides_never_hide_warnings(self) -> None:
+        policy = LogPolicy(overrides={"basic": "CRITICAL"}, sample_rate=0, sample_burst=0)
+        lines = self.install(policy)
+
+        for _ in range(3):
+            _logger_for("cogs.basic").warning("still here")
+
+        self.assertEqual(len(lines), 3)
+
+    def test_info_is_sampled_after_burst(self) -> None:
+        policy = LogPolicy(sample_rate=0.25, sample_burst=2)
+        lines = self.install(policy, "{extra}")
+
+        with mock.patch("module.log_policy.time.monotonic", return_value=100.0):
+            for _ in range(10):
+                logger.info("ping")
+
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(policy.dropped, 6)
+        self.assertIn("'sampled': 3", lines[-1])
+
+    def test_json_records_carry_command_fields(self) -> None:
+        policy = LogPolicy(json_format=True)
+        lines = self.install(policy)
+
+        with command_context("ping", "basic", 123):
+            _logger_for("cogs.basic").bind(shard=0).info("收到 {braces}")
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("failed")
+
+        record = json.loads(lines[0])
+        self.assertEqual(record["message"], "收到 {braces}")
+        self.assertEqual(
+            (record["cog"], record["command"], record["guild"], record["shard"]),
+            ("basic", "ping", 123, 0),
+        )
+        self.assertGreaterEqual(record["latency_ms"], 0)
+        self.assertNotIn("started", record)
+        self.assertIn("RuntimeError: boom", json.loads(lines[1])["exception"])
+
+    def test_from_env(self) -> None:
+        environment = {
+            "LOG_FORMAT": "json",
+            "LOG_LEVELS": "basic=debug, module.outbound=ERROR",
+            "LOG_SAMPLE_RATE": "0.1",
+            "LOG_SAMPLE_BURST": "5",
+        }
+        with mock.patch.dict(os.environ, environment):
+            policy = LogPolicy.from_env()
+
+        self.assertTrue(policy.json_format)
+        self.assertEqual(policy.overrides, {"basic": "DEBUG", "module.outbound": "ERROR"})
+        self.assertEqual((policy.sample_every, policy.sample_burst), (10, 5))
+
+        for name, value in (
+            ("LOG_FORMAT", "xml"),
+            ("LOG_LEVELS", "basic"),
+            ("LOG_LEVELS", "basic=LOUD"),
+            ("LOG_SAMPLE_RATE", "2"),
+        ):
+            with self.subTest(name=name), mock.patch.dict(os.environ, {name: value}):
+                with self.assertRaises(ValueError):
+                    LogPolicy.from_env()
+
+
+if __name__ == "__main__":
+    unittest.main()
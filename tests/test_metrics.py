@@ -0,0 +1,75 @@
+import unittest
+
+from discord import app_commands
+from discord.ext import commands
+
+from main import _command_kind
+from module.metrics import CommandStats, MetricsRegistry
+
+
+class MetricsTests(unittest.TestCase):
+    def test_histogram_buckets_and_quantiles(self) -> None:
+        stats = CommandStats()
+        for elapsed in (0.001, 0.002, 0.02, 0.2, 30.0):
+            stats.observe(elapsed, failed=elapsed > 1)
+
+        self.assertEqual(stats.invocations, 5)
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(stats.buckets[0], 2)
+        self.assertEqual(stats.buckets[-1], 1)
+        self.assertEqual(stats.quantile(0.5), 0.025)
+        self.assertEqual(stats.quantile(0.99), float("inf"))
+
+    def test_prometheus_rendering(self) -> None:
+        registry = MetricsRegistry()
+        registry.observe("prefix", 'pi"ng', 0.003)
+        registry.register_gauge("queue_depth", "Queue depth.", lambda: 7)
+
+        text = registry.render_prometheus()
+
+        self.assertIn(
+            'discord_bot_command_invocations_total{command="pi\\"ng",kind="prefix"} 1',
+            text,
+        )
+        self.assertIn(
+            'discord_bot_command_latency_seconds_bucket{command="pi\\"ng",kind="prefix",le="+Inf"} 1',
+            text,
+        )
+        self.assertIn("# TYPE discord_bot_queue_depth gauge\ndiscord_bot_queue_depth 7.0", text)
+
+    def test_counters_are_typed_and_suffixed(self) -> None:
+        registry = MetricsRegistry()
+        registry.register_counter("drops_total", "Drops.", lambda: 3)
+
+        text = registry.render_prometheus()
+
+        self.assertIn("# TYPE discord_bot_drops_total counter\ndiscord_bot_drops_total 3.0", text)
+        with self.assertRaises(ValueError):
+            registry.register_counter("drops", "Drops.", lambda: 3)
+
+    def test_interaction_start_and_finish(self) -> None:
+        registry = MetricsRegistry()
+        registry.start(1)
+        registry.finish(1, "slash", "ping_slash", failed=True)
+        registry.finish(2, "slash", "ping_slash")
+
+        stats = registry.commands[("slash", "ping_slash")]
+        self.assertEqual((stats.invocations, stats.errors), (1, 1))
+
+    def test_command_kind(self) -> None:
+        async def callback(ctx) -> None:
+            del ctx
+
+        async def app_callback(interaction) -> None:
+            del interaction
+
+        self.assertEqual(_command_kind(commands.Command(callback, name="a")), "prefix")
+        self.assertEqual(_command_kind(commands.HybridCommand(callback, name="b")), "hybrid")
+        self.assertEqual(
+            _command_kind(app_commands.Command(name="c", description="c", callback=app_callback)),
+            "slash",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
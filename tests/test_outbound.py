@@ -0,0 +1,250 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+import asyncio
+import unittest
+
+from discord.http import Route
+
+from module.outbound import OutboundScheduler, Priority, prioritize
+
+
+class OutboundSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_free_slots_go_to_the_highest_priority(self) -> None:
+        scheduler = OutboundScheduler(concurrency=1)
+        release = asyncio.Event()
+        order: list[str] = []
+
+        async def blocker() -> None:
+            await release.wait()
+
+        async def send(name: str) -> None:
+            order.append(name)
+
+        first = asyncio.create_task(scheduler.run(blocker))
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.create_task(scheduler.run(lambda: send("ops"), priority=Priority.OPS)),
+            asyncio.create_task(scheduler.run(lambda: send("reply"))),
+            asyncio.create_task(
+                scheduler.run(lambda: send("interaction"), priority=Priority.INTERACTION)
+            ),
+        ]
+        await asyncio.sleep(0)
+        # Interaction callbacks bypass the limit, so only two requests wait.
+        self.assertEqual(scheduler.depth(), 2)
+        self.assertEqual(order, ["interaction"])
+        self.assertEqual(scheduler.depth(Priority.OPS), 1)
+
+        release.set()
+        await asyncio.gather(first, *waiting)
+
+        self.assertEqual(order, ["interaction", "reply", "ops"])
+        self.assertEqual(scheduler.depth(), 0)
+        self.assertEqual(scheduler.active, 0)
+
+    async def test_prioritize_sets_the_default_class(self) -> None:
+        scheduler = OutboundScheduler(concurrency=1)
+        release = asyncio.Event()
+        order: list[str] = []
+
+        async def send(name: str) -> None:
+            order.append(name)
+
+        async def ops() -> None:
+            with prioritize(Priority.OPS):
+                await scheduler.run(lambda: send("ops"))
+
+        first = asyncio.create_task(scheduler.run(release.wait))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(ops()),
+            asyncio.create_task(scheduler.run(lambda: send("reply"))),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *tasks)
+
+        self.assertEqual(order, ["reply", "ops"])
+
+    async def test_queued_edits_to_one_message_are_merged(self) -> None:
+        scheduler = OutboundScheduler(concurrency=1)
+        release = asyncio.Event()
+        sent: list[dict[str, object]] = []
+
+        async def send(payload: dict[str, object]) -> dict[str, object]:
+            sent.append(payload)
+            return payload
+
+        first = asyncio.create_task(scheduler.run(release.wait))
+        await asyncio.sleep(0)
+        edits = [
+            asyncio.create_task(scheduler.edit("message", payload, send))
+            for payload in ({"content": "a"}, {"components": []}, {"content": "c"})
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*edits)
+        await first
+
+        self.assertEqual(sent, [{"content": "c", "components": []}])
+        self.assertEqual(results, [sent[0]] * 3)
+        self.assertEqual(scheduler.coalesced, 2)
+
+    async def test_rate_limited_bucket_holds_at_most_one_slot(self) -> None:
+        scheduler = OutboundScheduler(concurrency=2)
+        retry_after = asyncio.Event()
+        sent: list[str] = []
+
+        async def request(route: Route, **kwargs: object) -> None:
+            if route.channel_id == 1:
+                # Stands in for discord.py sleeping on a 429 inside HTTPClient.request.
+                await retry_after.wait()
+            sent.append(f"{route.method} {route.channel_id}")
+
+        wrapped = scheduler.wrap(request)
+        limited = Route("POST", "/channels/{channel_id}/messages", channel_id=1)
+        other = Route("POST", "/channels/{channel_id}/messages", channel_id=2)
+        callback = Route(
+            "POST",
+            "/interactions/{webhook_id}/{webhook_token}/callback",
+            webhook_id=1,
+            webhook_token="token",
+        )
+
+        stuck = [asyncio.create_task(wrapped(limited, json={})) for _ in range(5)]
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.active, 1)
+
+        await asyncio.wait_for(wrapped(other, json={}), timeout=1)
+        await asyncio.wait_for(wrapped(callback, json={}), timeout=1)
+        self.assertEqual(sent, ["POST 2", "POST None"])
+
+        retry_after.set()
+        await asyncio.gather(*stuck)
+        self.assertEqual(sent.count("POST 1"), 5)
+        self.assertEqual((scheduler.active, len(scheduler._buckets)), (0, 0))
+
+    async def test_cancelled_waiter_does_not_leak_a_slot(self) -> None:
+        scheduler = OutboundScheduler(concurrency=1)
+        release = asyncio.Event()
+
+        first = asyncio.create_task(scheduler.run(release.wait))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(scheduler.run(asyncio.sleep, priority=Priority.OPS))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.depth(), 0)
+
+        release.set()
+        await first
+        self.assertEqual(scheduler.active, 0)
+        self.assertIsNone(await scheduler.run(lambda: asyncio.sleep(0)))
+
+    async def test_wrapped_request_sends_interaction_callbacks_first(self) -> None:
+        scheduler = OutboundScheduler(concurrency=1)
+        release = asyncio.Event()
+        sent: list[str] = []
+
+        async def request(route: Route, **kwargs: object) -> str:
+            sent.append(f"{route.method} {route.path}")
+            return "ok"
+
+        wrapped = scheduler.wrap(request)
+        message = Route("POST", "/channels/{channel_id}/messages", channel_id=1)
+        callback = Route(
+            "POST",
+            "/interactions/{webhook_id}/{webhook_token}/callback",
+            webhook_id=1,
+            webhook_token="token",
+        )
+        edit = Route(
+            "PATCH",
+            "/channels/{channel_id}/messages/{message_id}",
+            channel_id=1,
+            message_id=2,
+        )
+
+        first = asyncio.create_task(scheduler.run(release.wait))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(wrapped(message, json={})),
+            asyncio.create_task(wrapped(edit, json={"content": "a"})),
+            asyncio.create_task(wrapped(edit, json={"content": "b"})),
+            asyncio.create_task(wrapped(callback, json={})),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await first
+
+        self.assertEqual(await asyncio.gather(*tasks), ["ok"] * 4)
+        self.assertEqual(
+            sent,
+            [
+                f"POST {callback.path}",
+                f"POST {message.path}",
+                f"PATCH {edit.path}",
+            ],
+        )
+        self.assertEqual(scheduler.coalesced, 1)
+        self.assertIs(wrapped.scheduler, scheduler)
+
+    async def test_install_replaces_a_previous_schedulers_wrapper(self) -> None:
+        async def request(route: Route, **kwargs: object) -> None:
+            pass
+
+        http = SimpleNamespace(request=request)
+        adapter = SimpleNamespace(request=request)
+        first = OutboundScheduler()
+        second = OutboundScheduler()
+
+        context = SimpleNamespace(get=lambda: adapter)
+        with patch("module.outbound.async_context", context):
+            first.install(http)
+            second.install(SimpleNamespace(request=request))
+            second.install(SimpleNamespace(request=request))
+
+        self.assertIs(http.request.scheduler, first)
+        self.assertIs(adapter.request.scheduler, second)
+        self.assertIs(adapter.request.__wrapped__, request)
+
+    async def test_file_edits_are_never_merged(self) -> None:
+        scheduler = OutboundScheduler(concurrency=1)
+        release = asyncio.Event()
+        sent: list[dict[str, object]] = []
+
+        async def request(route: Route, **kwargs: object) -> None:
+            sent.append(kwargs)
+
+        wrapped = scheduler.wrap(request)
+        edit = Route(
+            "PATCH",
+            "/channels/{channel_id}/messages/{message_id}",
+            channel_id=1,
+            message_id=2,
+        )
+
+        first = asyncio.create_task(scheduler.run(release.wait))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(wrapped(edit, json={"content": "a"})),
+            asyncio.create_task(wrapped(edit, files=["file"], form=[{"name": "payload_json"}])),
+            asyncio.create_task(wrapped(edit, json={"embeds": []})),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *tasks)
+
+        self.assertEqual(
+            sent,
+            [
+                {"json": {"content": "a"}},
+                {"files": ["file"], "form": [{"name": "payload_json"}]},
+                {"json": {"embeds": []}},
+            ],
+        )
+        self.assertEqual(scheduler.coalesced, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
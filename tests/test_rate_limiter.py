@@ -0,0 +1,117 @@
+import unittest
+
+from discord import app_commands
+from discord.ext import commands
+
+from cogs.management import ManagementCommand
+from main import DiscordBot
+from module.rate_limiter import RateLimit, RateLimited, RateLimiter, RateLimitPolicy
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RateLimitParseTests(unittest.TestCase):
+    def test_parses_count_per_seconds(self) -> None:
+        self.assertEqual(RateLimit.parse(" 5/10 "), RateLimit(5, 10.0))
+
+    def test_empty_or_invalid_disables_limit(self) -> None:
+        for value in ("", "five/10", "5", "0/10", "5/-1"):
+            with self.subTest(value=value):
+                self.assertIsNone(RateLimit.parse(value))
+
+
+class RateLimiterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.policy = RateLimitPolicy(user=RateLimit(3, 3.0), guild=RateLimit(5, 10.0))
+        self.limiter = RateLimiter(self.policy, sweep_interval=60.0, clock=self.clock)
+
+    def test_burst_then_refill(self) -> None:
+        for _ in range(3):
+            self.limiter.hit("ping", 1, None, self.policy)
+        with self.assertRaises(RateLimited) as caught:
+            self.limiter.hit("ping", 1, None, self.policy)
+        self.assertAlmostEqual(caught.exception.retry_after, 1.0)
+
+        self.clock.now += 1.0
+        self.limiter.hit("ping", 1, None, self.policy)
+
+    def test_buckets_are_per_user_and_command(self) -> None:
+        for _ in range(3):
+            self.limiter.hit("ping", 1, None, self.policy)
+
+        self.limiter.hit("ping", 2, None, self.policy)
+        self.limiter.hit("help", 1, None, self.policy)
+
+    def test_guild_bucket_is_shared_and_rejection_consumes_nothing(self) -> None:
+        for user_id in range(5):
+            self.limiter.hit("ping", user_id, 10, self.policy)
+        with self.assertRaises(RateLimited):
+            self.limiter.hit("ping", 99, 10, self.policy)
+
+        # The rejected call must not have drained user 99's own bucket.
+        for _ in range(3):
+            self.limiter.hit("ping", 99, None, self.policy)
+
+    def test_only_first_rejection_notifies(self) -> None:
+        for _ in range(3):
+            self.limiter.hit("ping", 1, None, self.policy)
+
+        notices = []
+        for _ in range(3):
+            with self.assertRaises(RateLimited) as caught:
+                self.limiter.hit("ping", 1, None, self.policy)
+            notices.append(caught.exception.notify)
+
+        self.assertEqual(notices, [True, False, False])
+        self.assertEqual(self.limiter.rejected, 3)
+
+        self.clock.now += 1.0
+        self.limiter.hit("ping", 1, None, self.policy)
+        with self.assertRaises(RateLimited) as caught:
+            self.limiter.hit("ping", 1, None, self.policy)
+        self.assertTrue(caught.exception.notify)
+
+    def test_sweep_drops_refilled_buckets(self) -> None:
+        self.limiter.hit("ping", 1, 10, self.policy)
+        self.limiter.hit("ping", 2, None, self.policy)
+        self.assertEqual(len(self.limiter), 3)
+
+        self.clock.now += 1.5
+        self.assertEqual(self.limiter.sweep(), 2)
+        self.assertEqual(len(self.limiter), 1)
+
+        self.clock.now += 60.0
+        self.limiter.hit("ping", 3, None, self.policy)
+        self.assertEqual(len(self.limiter), 1)
+
+    def test_exception_is_a_check_failure_for_both_command_types(self) -> None:
+        error = RateLimited(2.0, notify=True)
+
+        self.assertIsInstance(error, commands.CheckFailure)
+        self.assertIsInstance(error, app_commands.CheckFailure)
+        self.assertIn("2.0", str(error))
+
+
+class CogPolicyTests(unittest.TestCase):
+    def test_cog_attribute_overrides_default(self) -> None:
+        limiter = RateLimiter(RateLimitPolicy(user=RateLimit(1, 1.0)))
+
+        self.assertEqual(limiter.policy_for(ManagementCommand), RateLimitPolicy())
+        self.assertIs(limiter.policy_for(None), limiter.default)
+
+    def test_prefix_rate_limit_is_a_call_once_check(self) -> None:
+        bot = DiscordBot()
+
+        self.assertIn(bot._check_prefix_rate_limit, bot._check_once)
+        self.assertNotIn(bot._check_prefix_rate_limit, bot._checks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from loguru import logger
+
+from benchmarks.harness import build_offline_bot
+from module.response_cache import ResponseCache
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_hits_misses_and_ratio(self) -> None:
+        cache = ResponseCache()
+
+        self.assertIsNone(cache.get("help", ("zh-TW", 0)))
+        cache.put("help", ("zh-TW", 0), "embed")
+        self.assertEqual(cache.get("help", ("zh-TW", 0)), "embed")
+        self.assertIsNone(cache.get("help", ("en-US", 0)))
+
+        self.assertEqual((cache.hits["help"], cache.misses["help"]), (1, 2))
+        self.assertAlmostEqual(cache.hit_ratio("help"), 1 / 3)
+        self.assertEqual(cache.hit_ratio("status"), 0.0)
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        cache = ResponseCache(max_entries=2)
+        cache.put("help", 1, "a")
+        cache.put("help", 2, "b")
+        cache.get("help", 1)
+        cache.put("help", 3, "c")
+
+        self.assertEqual(cache.get("help", 1), "a")
+        self.assertIsNone(cache.get("help", 2))
+
+    def test_invalidate_drops_everything(self) -> None:
+        cache = ResponseCache()
+        cache.put("help", 1, "a")
+
+        cache.invalidate()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.generation, 1)
+
+
+class HelpResponseCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        logger.disable("cogs")
+        self.addCleanup(logger.enable, "cogs")
+        self.bot, self.gateway = await build_offline_bot()
+        self.addAsyncCleanup(self.bot.close)
+
+    async def test_help_is_rendered_once_per_command_set(self) -> None:
+        cache = self.bot.response_cache
+
+        await self.gateway.replay("help", 3, 1)
+        self.assertEqual((cache.misses["help"], cache.hits["help"]), (1, 2))
+
+        await self.bot.unload_extension("cogs.basic")
+        self.assertEqual(len(cache), 0)
+
+        await self.gateway.replay("help", 1, 1)
+        self.assertEqual(cache.misses["help"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
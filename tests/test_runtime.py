@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+import unittest
+from unittest import mock
+
+import discord.utils
+from loguru import logger
+
+from module.runtime import EAGER_TASKS_SUPPORTED, Runtime, RuntimeMode
+
+
+class RuntimeModeTests(unittest.TestCase):
+    def test_from_env(self) -> None:
+        with mock.patch.dict(os.environ, {"RUNTIME_MODE": ""}):
+            self.assertEqual(RuntimeMode.from_env(), RuntimeMode())
+        with mock.patch.dict(os.environ, {"RUNTIME_MODE": "Performance"}):
+            self.assertEqual(
+                RuntimeMode.from_env(),
+                RuntimeMode(uvloop=True, eager_tasks=True, fast_json=True),
+            )
+        with mock.patch.dict(os.environ, {"RUNTIME_MODE": "turbo"}):
+            with self.assertRaises(ValueError):
+                RuntimeMode.from_env()
+
+
+class RuntimeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.disable("module.runtime")
+        self.addCleanup(logger.enable, "module.runtime")
+        self.addCleanup(Runtime.prepare, RuntimeMode())
+        self.default_from_json = discord.utils._from_json
+
+    def test_missing_optimisations_fall_back(self) -> None:
+        with (
+            mock.patch("module.runtime._uvloop_factory", return_value=None),
+            mock.patch("module.runtime._fast_json_decoder", return_value=None),
+        ):
+            runtime = Runtime.prepare(RuntimeMode.named("performance"))
+
+        self.assertEqual(runtime.loop, "asyncio")
+        self.assertIsNone(runtime.loop_factory)
+        self.assertEqual(runtime.eager_tasks, EAGER_TASKS_SUPPORTED)
+        self.assertIs(discord.utils._from_json, self.default_from_json)
+        self.assertEqual(runtime.run(asyncio.sleep(0, "done")), "done")
+
+    def test_fast_json_decoder_is_installed_and_restored(self) -> None:
+        decoder = mock.Mock(side_effect=json.loads)
+        with mock.patch("module.runtime._fast_json_decoder", return_value=("fake", decoder)):
+            runtime = Runtime.prepare(RuntimeMode(fast_json=True))
+
+        self.assertEqual(runtime.json, "fake")
+        self.assertEqual(discord.utils._from_json('{"op": 0}'), {"op": 0})
+        decoder.assert_called_once()
+
+        Runtime.prepare(RuntimeMode())
+        self.assertIs(discord.utils._from_json, self.default_from_json)
+
+    @unittest.skipUnless(EAGER_TASKS_SUPPORTED, "eager tasks require Python 3.12+")
+    def test_eager_tasks_start_synchronously(self) -> None:
+        runtime = Runtime.prepare(RuntimeMode(eager_tasks=True))
+        started = []
+
+        async def child() -> None:
+            started.append(True)
+
+        async def main() -> bool:
+            task = asyncio.create_task(child())
+            ran_eagerly = bool(started)
+            await task
+            return ran_eagerly
+
+        self.assertTrue(runtime.run(main()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+from unittest.mock import AsyncMock, patch
+import unittest
+
+import discord
+from discord.gateway import DiscordWebSocket
+
+from main import DiscordBot
+from module.sharding import ShardConfig, parse_shard_ids
+
+
+class ShardConfigTests(unittest.TestCase):
+    def test_parse_shard_ids(self) -> None:
+        self.assertEqual(parse_shard_ids("4-6, 0,5"), [0, 4, 5, 6])
+        with self.assertRaises(ValueError):
+            parse_shard_ids("3-1")
+
+    def test_defaults_to_single_shard(self) -> None:
+        with patch.dict("os.environ", {}, clear=True):
+            config = ShardConfig.from_env()
+
+        self.assertEqual((config.mode, config.shard_count, config.shard_ids), ("single", 1, None))
+
+    def test_auto_and_range_modes(self) -> None:
+        with patch.dict("os.environ", {"SHARD_MODE": "auto"}, clear=True):
+            self.assertIsNone(ShardConfig.from_env().shard_count)
+
+        environment = {"SHARD_MODE": "range", "SHARD_COUNT": "8", "SHARD_IDS": "4-7"}
+        with patch.dict("os.environ", environment, clear=True):
+            config = ShardConfig.from_env()
+
+        self.assertEqual((config.shard_count, config.shard_ids), (8, [4, 5, 6, 7]))
+
+    def test_invalid_range_is_rejected(self) -> None:
+        for environment in (
+            {"SHARD_MODE": "range", "SHARD_COUNT": "4"},
+            {"SHARD_MODE": "range", "SHARD_COUNT": "4", "SHARD_IDS": "2-4"},
+            {"SHARD_MODE": "sideways"},
+        ):
+            with patch.dict("os.environ", environment, clear=True), self.assertRaises(ValueError):
+                ShardConfig.from_env()
+
+
+class SingleShardStartupTests(unittest.IsolatedAsyncioTestCase):
+    async def test_default_mode_identifies_one_shard_without_asking_discord(self) -> None:
+        bot = DiscordBot()
+        with patch.dict("os.environ", {}, clear=True):
+            bot.apply_shard_config(ShardConfig.from_env())
+
+        with (
+            patch.object(bot.gateway_resume, "load", return_value=None),
+            patch.object(bot.http, "get_bot_gateway", AsyncMock()) as get_bot_gateway,
+            patch.object(discord.AutoShardedClient, "launch_shard", AsyncMock()) as launch_shard,
+        ):
+            await bot.launch_shards()
+
+        get_bot_gateway.assert_not_awaited()
+        launch_shard.assert_awaited_once_with(DiscordWebSocket.DEFAULT_GATEWAY, 0, initial=True)
+        self.assertEqual(bot._connection.shard_count, 1)
+        self.assertEqual(list(bot._connection.shard_ids), [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
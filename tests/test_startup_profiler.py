@@ -0,0 +1,59 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import unittest
+
+from module.startup_profiler import StartupProfiler, parse_import_times
+
+IMPORT_TIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      1500 |       2100 | encodings
+import time:       300 |        300 |     aiohttp.helpers
+import time:      9000 |      42000 | discord
+import time:        50 |         50 | loguru
+"""
+
+
+class StartupProfilerTests(unittest.TestCase):
+    def test_phases_are_written_in_start_order(self) -> None:
+        profiler = StartupProfiler()
+        profiler.begin("gateway")
+        with profiler.phase("load_dotenv"):
+            pass
+        profiler.end("gateway")
+        profiler.end("never_started")
+
+        with TemporaryDirectory() as directory:
+            path, report = profiler.write(Path(directory), guilds=3)
+            written = json.loads(path.read_text(encoding="utf-8"))
+
+        names = [phase["name"] for phase in written["phases"]]
+        self.assertEqual(names[-2:], ["gateway", "load_dotenv"])
+        self.assertEqual(written["guilds"], 3)
+        self.assertTrue(profiler.finished)
+        self.assertEqual(len(profiler.summary_lines(report)), len(names) + 1)
+
+    def test_parse_import_times_keeps_top_level_imports(self) -> None:
+        imports = parse_import_times(IMPORT_TIME_OUTPUT, limit=2)
+
+        self.assertEqual([item["module"] for item in imports], ["discord", "encodings"])
+        self.assertEqual(imports[0]["cumulative_ms"], 42.0)
+
+    def test_parse_import_times_under_a_root_module(self) -> None:
+        output = IMPORT_TIME_OUTPUT + (
+            "import time:       400 |        400 |   dotenv\n"
+            "import time:      8000 |      30000 |   discord.ext.commands\n"
+            "import time:      2000 |      33000 | main\n"
+        )
+
+        imports = parse_import_times(output, root="main")
+
+        self.assertEqual(
+            [item["module"] for item in imports],
+            ["discord.ext.commands", "dotenv"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
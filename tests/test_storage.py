@@ -0,0 +1,108 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import asyncio
+import sqlite3
+import threading
+import time
+import unittest
+
+from module.storage import Storage
+
+
+class StorageTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "bot.sqlite3"
+        self.storage = Storage(self.path, readers=2)
+        await self.storage.open()
+        self.addAsyncCleanup(self.storage.close)
+
+    async def test_key_value_round_trip(self) -> None:
+        await self.storage.set("settings", "prefix", {"value": "!", "名稱": "喵"})
+
+        self.assertEqual(
+            await self.storage.get("settings", "prefix"),
+            {"value": "!", "名稱": "喵"},
+        )
+        self.assertEqual(await self.storage.get("settings", "missing", 0), 0)
+        self.assertEqual(list(await self.storage.items("settings")), ["prefix"])
+        self.assertTrue(await self.storage.delete("settings", "prefix"))
+        self.assertFalse(await self.storage.delete("settings", "prefix"))
+
+    async def test_concurrent_writes_are_group_committed(self) -> None:
+        await asyncio.gather(
+            *(self.storage.set("counter", str(index), index) for index in range(100))
+        )
+
+        self.assertEqual(len(await self.storage.items("counter")), 100)
+        self.assertEqual(self.storage.writes, 100)
+        self.assertLess(self.storage.batches, 100)
+
+    async def test_failing_write_does_not_abort_its_batch(self) -> None:
+        await self.storage.executescript(
+            "CREATE TABLE IF NOT EXISTS scores (user_id INTEGER PRIMARY KEY, score INTEGER)"
+        )
+
+        results = await asyncio.gather(
+            self.storage.execute("INSERT INTO scores VALUES (?, ?)", (1, 10)),
+            self.storage.execute("INSERT INTO scores VALUES (?, ?)", (1, 20)),
+            self.storage.execute("INSERT INTO scores VALUES (?, ?)", (2, 30)),
+            return_exceptions=True,
+        )
+
+        self.assertIsInstance(results[1], sqlite3.IntegrityError)
+        self.assertEqual(
+            await self.storage.fetchall("SELECT user_id, score FROM scores ORDER BY user_id"),
+            [(1, 10), (2, 30)],
+        )
+
+    async def test_transaction_is_atomic(self) -> None:
+        await self.storage.executescript(
+            "CREATE TABLE IF NOT EXISTS ledger (id INTEGER PRIMARY KEY, amount INTEGER NOT NULL)"
+        )
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            async with self.storage.transaction() as transaction:
+                transaction.execute("INSERT INTO ledger (amount) VALUES (?)", (5,))
+                transaction.execute("INSERT INTO ledger (amount) VALUES (?)", (None,))
+
+        async with self.storage.transaction() as transaction:
+            transaction.executemany("INSERT INTO ledger (amount) VALUES (?)", [(1,), (2,)])
+
+        self.assertEqual(await self.storage.fetchone("SELECT SUM(amount) FROM ledger"), (3,))
+
+    async def test_wal_mode_and_flush_on_close(self) -> None:
+        pending = asyncio.ensure_future(self.storage.set("flush", "key", True))
+        await self.storage.close()
+
+        self.assertTrue(pending.done())
+        connection = sqlite3.connect(self.path)
+        self.addCleanup(connection.close)
+        self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone(), ("wal",))
+        self.assertEqual(
+            connection.execute("SELECT value FROM kv WHERE namespace = 'flush'").fetchone(),
+            ("true",),
+        )
+
+    async def test_close_waits_for_readers_off_the_event_loop(self) -> None:
+        release = threading.Event()
+        self.storage._read_executor.submit(release.wait, 1)
+
+        closing = asyncio.create_task(self.storage.close())
+        started = time.monotonic()
+        await asyncio.sleep(0.05)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertFalse(closing.done())
+        release.set()
+        await closing
+
+        self.assertFalse(self.storage.is_open)
+
+    async def test_reads_are_read_only(self) -> None:
+        with self.assertRaises(sqlite3.OperationalError):
+            await self.storage.fetchall("DELETE FROM kv")
+
+
+if __name__ == "__main__":
+    unittest.main()
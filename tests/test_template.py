@@ -2,31 +2,65 @@ from types import SimpleNamespace
 import unittest
 
 from cogs.management import ManagementCommand
-from main import bot
+from main import OFFLOAD_TRACEBACK_FRAMES, DiscordBot, _traceback_frames
 
 
 class TemplateConfigurationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.bot = DiscordBot()
+
     def test_discovers_expected_extensions(self) -> None:
-        names = bot.discover_extension_names()
+        names = self.bot.discover_extension_names()
 
         self.assertIn("basic", names)
         self.assertIn("management", names)
         self.assertNotIn("__init__", names)
 
     def test_extension_path_uses_discovered_allowlist(self) -> None:
-        self.assertEqual(bot.extension_path("basic"), "cogs.basic")
-        self.assertIsNone(bot.extension_path("../main"))
-        self.assertIsNone(bot.extension_path("missing"))
+        self.assertEqual(self.bot.extension_path("basic"), "cogs.basic")
+        self.assertIsNone(self.bot.extension_path("../main"))
+        self.assertIsNone(self.bot.extension_path("missing"))
 
     def test_privileged_intents_are_minimized(self) -> None:
-        self.assertTrue(bot.intents.message_content)
-        self.assertFalse(bot.intents.members)
+        self.assertTrue(self.bot.intents.message_content)
+        self.assertFalse(self.bot.intents.members)
 
     def test_direct_messages_do_not_receive_admin_access(self) -> None:
         interaction = SimpleNamespace(guild=None, user=object())
 
         self.assertFalse(ManagementCommand._is_admin(interaction))
 
+    def test_optional_subsystems_are_opt_in(self) -> None:
+        self.assertIsNone(self.bot.storage)
+        self.assertIsNone(self.bot.counters)
+        self.assertIsNone(self.bot.dispatch_tracer)
+        self.bot.record_usage(1, None)
+
+    def test_importing_main_does_not_build_a_bot(self) -> None:
+        import main
+
+        self.assertFalse(hasattr(main, "bot"))
+
+    def test_traceback_depth_follows_the_exception_chain(self) -> None:
+        def fail(depth: int) -> None:
+            if depth == 0:
+                raise ValueError("deep")
+            fail(depth - 1)
+
+        try:
+            try:
+                fail(OFFLOAD_TRACEBACK_FRAMES)
+            except ValueError as error:
+                raise RuntimeError("wrapped") from error
+        except RuntimeError as error:
+            chained = error
+
+        self.assertEqual(_traceback_frames(ValueError("no traceback"), 10), 0)
+        self.assertGreater(
+            _traceback_frames(chained, OFFLOAD_TRACEBACK_FRAMES), OFFLOAD_TRACEBACK_FRAMES
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+import unittest
+
+import discord
+
+from module.user_resolver import UserResolver
+
+
+def _not_found() -> discord.NotFound:
+    return discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "unknown user")
+
+
+class UserResolverTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.user = MagicMock(spec=discord.User)
+        self.user.id = 1
+        self.user.dm_channel = None
+        self.channel = object()
+        self.user.create_dm = AsyncMock(return_value=self.channel)
+        self.client = SimpleNamespace(
+            get_user=MagicMock(return_value=None),
+            fetch_user=AsyncMock(return_value=self.user),
+        )
+        self.resolver = UserResolver(self.client)
+
+    async def test_fetch_result_and_dm_channel_are_reused(self) -> None:
+        first = await self.resolver.dm_channel(1)
+        second = await self.resolver.dm_channel(1)
+
+        self.assertIs(first, self.channel)
+        self.assertIs(second, self.channel)
+        self.client.fetch_user.assert_awaited_once_with(1)
+        self.user.create_dm.assert_awaited_once()
+
+    async def test_failures_are_negatively_cached(self) -> None:
+        self.client.fetch_user.side_effect = _not_found()
+
+        self.assertIsNone(await self.resolver.get(2))
+        self.assertIsNone(await self.resolver.get(2))
+        self.client.fetch_user.assert_awaited_once_with(2)
+
+    async def test_expired_entries_are_refetched(self) -> None:
+        resolver = UserResolver(self.client, ttl=0)
+
+        await resolver.get(1)
+        await resolver.get(1)
+
+        self.assertEqual(self.client.fetch_user.await_count, 2)
+
+    async def test_primed_user_skips_fetch(self) -> None:
+        self.resolver.prime(self.user)
+
+        self.assertIs(await self.resolver.get(1), self.user)
+        self.client.fetch_user.assert_not_awaited()
+
+    async def test_least_recently_used_entry_is_evicted(self) -> None:
+        resolver = UserResolver(self.client, max_size=2)
+
+        await resolver.get(1)
+        await resolver.get(2)
+        await resolver.get(1)
+        await resolver.get(3)
+
+        self.assertEqual(len(resolver), 2)
+        self.assertEqual(list(resolver._users), [1, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()